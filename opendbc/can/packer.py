@@ -1,6 +1,8 @@
 import math
+import time
 
 from opendbc.car.carlog import carlog
+from opendbc.car.profiler import PROFILER
 from opendbc.can.dbc import DBC, Signal, SignalType
 
 
@@ -41,6 +43,14 @@ class CANPacker:
     return dat
 
   def make_can_msg(self, name_or_addr, bus: int, values: dict[str, float]):
+    if PROFILER.enabled:
+      t = time.perf_counter_ns()
+      msg = self._make_can_msg(name_or_addr, bus, values)
+      PROFILER.record("CANPacker.make_can_msg", time.perf_counter_ns() - t)
+      return msg
+    return self._make_can_msg(name_or_addr, bus, values)
+
+  def _make_can_msg(self, name_or_addr, bus: int, values: dict[str, float]):
     if isinstance(name_or_addr, int):
       addr = name_or_addr
     else:
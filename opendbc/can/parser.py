@@ -1,9 +1,11 @@
 import math
 import numbers
+import time
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
 
 from opendbc.car.carlog import carlog
+from opendbc.car.profiler import PROFILER
 from opendbc.can.dbc import DBC, Signal
 
 
@@ -214,6 +216,14 @@ class CANParser:
     return self.can_invalid_cnt < CAN_INVALID_CNT and counters_valid
 
   def update(self, strings, sendcan: bool = False):
+    if PROFILER.enabled:
+      t = time.perf_counter_ns()
+      updated_addrs = self._update(strings)
+      PROFILER.record("CANParser.update", time.perf_counter_ns() - t)
+      return updated_addrs
+    return self._update(strings)
+
+  def _update(self, strings):
     if strings and not isinstance(strings[0], list | tuple):
       strings = [strings]
 
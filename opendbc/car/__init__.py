@@ -1,11 +1,11 @@
 # functions common among cars
-import numpy as np
 from dataclasses import dataclass, field
 from enum import ReprEnum, StrEnum, EnumType, auto
 from dataclasses import replace
 
-from opendbc.car import structs, uds
+from opendbc.car import mirrors, structs, uds
 from opendbc.car.can_definitions import CanData
+from opendbc.car.common.fastmath import clip
 from opendbc.car.docs_definitions import CarDocs, ExtraCarDocs
 
 DT_CTRL = 0.01  # car state and control loop timestep (s)
@@ -27,8 +27,8 @@ def apply_hysteresis(val: float, val_steady: float, hyst_gap: float) -> float:
 
 
 def create_button_events(cur_btn: int, prev_btn: int, buttons_dict: dict[int, structs.CarState.ButtonEvent.Type],
-                         unpressed_btn: int = 0) -> list[structs.CarState.ButtonEvent]:
-  events: list[structs.CarState.ButtonEvent] = []
+                         unpressed_btn: int = 0) -> list[mirrors.CarState.ButtonEvent]:
+  events: list[mirrors.CarState.ButtonEvent] = []
 
   if cur_btn == prev_btn:
     return events
@@ -36,7 +36,7 @@ def create_button_events(cur_btn: int, prev_btn: int, buttons_dict: dict[int, st
   # Add events for button presses, multiple when a button switches without going to unpressed
   for pressed, btn in ((False, prev_btn), (True, cur_btn)):
     if btn != unpressed_btn:
-      events.append(structs.CarState.ButtonEvent(pressed=pressed,
+      events.append(mirrors.CarState.ButtonEvent(pressed=pressed,
                                                  type=buttons_dict.get(btn, ButtonType.unknown)))
   return events
 
@@ -93,7 +93,7 @@ class Bus(StrEnum):
 
 
 def rate_limit(new_value, last_value, dw_step, up_step):
-  return float(np.clip(new_value, last_value + dw_step, last_value + up_step))
+  return float(clip(new_value, last_value + dw_step, last_value + up_step))
 
 
 def make_tester_present_msg(addr, bus, subaddr=None, suppress_response=False):
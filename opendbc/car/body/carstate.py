@@ -1,13 +1,13 @@
 from opendbc.can import CANParser
-from opendbc.car import Bus, structs
+from opendbc.car import Bus, mirrors, structs
 from opendbc.car.interfaces import CarStateBase
 from opendbc.car.body.values import DBC
 
 
 class CarState(CarStateBase):
-  def update(self, can_parsers) -> structs.CarState:
+  def update(self, can_parsers) -> mirrors.CarState:
     cp = can_parsers[Bus.main]
-    ret = structs.CarState()
+    ret = mirrors.CarState()
 
     ret.wheelSpeeds.fl = cp.vl['MOTORS_DATA']['SPEED_L']
     ret.wheelSpeeds.fr = cp.vl['MOTORS_DATA']['SPEED_R']
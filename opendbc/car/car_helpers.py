@@ -1,5 +1,6 @@
 import os
 import time
+from collections.abc import Iterable, Iterator, Mapping
 
 from openpilot.common.params import Params
 from opendbc.car import gen_empty_fingerprint
@@ -9,23 +10,52 @@ from opendbc.car.structs import CarParams, CarParamsT
 from opendbc.car.fingerprints import eliminate_incompatible_cars, all_legacy_fingerprint_cars
 from opendbc.car.fw_versions import ObdCallback, get_fw_versions_ordered, get_present_ecus, match_fw_to_car
 from opendbc.car.mock.values import CAR as MOCK
-from opendbc.car.values import BRANDS
+from opendbc.car.values import BRANDS, PLATFORMS
 from opendbc.car.vin import get_vin, is_valid_vin, VIN_UNKNOWN
 from opendbc.car.fingerprints import MIGRATION
 
 FRAME_FINGERPRINT = 100  # 1s
 
 
+def load_interface(brand_name: str):
+  return __import__(f'opendbc.car.{brand_name}.interface', fromlist=['CarInterface']).CarInterface
+
+
 def load_interfaces(brand_names):
   ret = {}
   for brand_name in brand_names:
-    path = f'opendbc.car.{brand_name}'
-    CarInterface = __import__(path + '.interface', fromlist=['CarInterface']).CarInterface
+    CarInterface = load_interface(brand_name)
     for model_name in brand_names[brand_name]:
       ret[model_name] = CarInterface
   return ret
 
 
+class LazyInterfaces(Mapping):
+  """Maps platform to CarInterface, importing a brand's interface module on first access.
+
+  A car process only uses one brand, so this avoids importing every brand at startup.
+  """
+  def __init__(self, brand_names: dict[str, list[str]]):
+    self._brands = {model_name: brand_name for brand_name, model_names in brand_names.items() for model_name in model_names}
+    self._loaded: dict[str, type] = {}
+
+  def __getitem__(self, model_name: str):
+    brand_name = self._brands[model_name]
+    CarInterface = self._loaded.get(brand_name)
+    if CarInterface is None:
+      CarInterface = self._loaded[brand_name] = load_interface(brand_name)
+    return CarInterface
+
+  def __contains__(self, model_name) -> bool:
+    return model_name in self._brands
+
+  def __iter__(self) -> Iterator[str]:
+    return iter(self._brands)
+
+  def __len__(self) -> int:
+    return len(self._brands)
+
+
 def _get_interface_names() -> dict[str, list[str]]:
   # returns a dict of brand name and its respective models
   brand_names = {}
@@ -36,9 +66,9 @@ def _get_interface_names() -> dict[str, list[str]]:
   return brand_names
 
 
-# imports from directory opendbc/car/<name>/
+# imports from directory opendbc/car/<name>/ on first access
 interface_names = _get_interface_names()
-interfaces = load_interfaces(interface_names)
+interfaces = LazyInterfaces(interface_names)
 
 
 def can_fingerprint(can_recv: CanRecvCallable) -> tuple[str | None, dict[int, dict]]:
@@ -185,3 +215,10 @@ def get_demo_car_params():
   CarInterface = interfaces[platform]
   CP = CarInterface.get_non_essential_params(platform)
   return CP
+
+
+def get_all_car_params(platforms: Iterable[str] | None = None, alpha_long: bool = False, is_release: bool = False,
+                       docs: bool = False) -> dict[str, CarParams]:
+  """CarParams without fingerprints or FW versions for every platform (or the given ones), from CarInterfaceBase.get_template_params"""
+  return {str(platform): interfaces[platform].get_template_params(platform, alpha_long, is_release, docs)
+          for platform in (PLATFORMS if platforms is None else platforms)}
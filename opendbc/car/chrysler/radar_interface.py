@@ -2,6 +2,7 @@
 from opendbc.can import CANParser
 from opendbc.car import Bus, structs
 from opendbc.car.interfaces import RadarInterfaceBase
+from opendbc.car.radar_tracks import set_points
 from opendbc.car.chrysler.values import DBC
 
 RADAR_MSGS_C = list(range(0x2c2, 0x2d4+2, 2))  # c_ messages 706,...,724
@@ -64,8 +65,7 @@ class RadarInterface(RadarInterfaceBase):
       trackId = _address_to_track(ii)
 
       if trackId not in self.pts:
-        self.pts[trackId] = structs.RadarData.RadarPoint()
-        self.pts[trackId].trackId = trackId
+        self._new_point(trackId, trackId)
 
       if 'LONG_DIST' in cpt:  # c_* message
         self.pts[trackId].dRel = cpt['LONG_DIST']  # from front of car
@@ -76,7 +76,7 @@ class RadarInterface(RadarInterfaceBase):
         self.pts[trackId].vRel = cpt['REL_SPEED']
 
     # We want a list, not a dictionary. Filter out LONG_DIST==0 because that means it's not valid.
-    ret.points = [x for x in self.pts.values() if x.dRel != 0]
+    set_points(ret, [x for x in self.pts.values() if x.dRel != 0])
 
     self.updated_messages.clear()
     return ret
@@ -0,0 +1,53 @@
+from bisect import bisect_right
+from collections.abc import Sequence
+
+# Scalar replacements for np.interp and np.clip. The control path calls these on Python floats every frame, where
+# NumPy's array dispatch costs microseconds per call, and these return the same values as plain floats.
+
+
+def clip(x, lo, hi):
+  """np.clip for scalars, hi wins if lo > hi and NaN passes through"""
+  if x < lo:
+    x = lo
+  if x > hi:
+    x = hi
+  return x
+
+
+def interp(x: float, xp: Sequence[float], fp: Sequence[float]) -> float:
+  """np.interp for a scalar x. xp must be increasing, values outside it are clamped to fp's ends."""
+  if x != x:
+    return x
+  i = bisect_right(xp, x)
+  if i == 0:
+    return fp[0]
+  if i == len(xp):
+    return fp[-1]
+  # same operation order as np.interp, so results match to the last bit
+  return (fp[i] - fp[i - 1]) / (xp[i] - xp[i - 1]) * (x - xp[i - 1]) + fp[i - 1]
+
+
+class Interp:
+  """np.interp with its breakpoints and slopes precompiled, for tables looked up every frame"""
+  __slots__ = ("xp", "fp", "slopes")
+
+  def __init__(self, xp: Sequence[float], fp: Sequence[float]):
+    assert len(xp) == len(fp) and len(xp) > 0, "breakpoints and values must be the same non-zero length"
+    assert all(a <= b for a, b in zip(xp[:-1], xp[1:], strict=True)), "breakpoints must be increasing"
+    self.xp = tuple(float(v) for v in xp)
+    self.fp = tuple(float(v) for v in fp)
+    self.slopes = tuple((f1 - f0) / (x1 - x0) if x1 != x0 else 0. for x0, x1, f0, f1 in
+                        zip(self.xp[:-1], self.xp[1:], self.fp[:-1], self.fp[1:], strict=True))
+
+  def __call__(self, x: float) -> float:
+    if x != x:
+      return x
+    i = bisect_right(self.xp, x)
+    if i == 0:
+      return self.fp[0]
+    if i == len(self.xp):
+      return self.fp[-1]
+    return self.slopes[i - 1] * (x - self.xp[i - 1]) + self.fp[i - 1]
+
+  def __repr__(self) -> str:
+    return f"Interp({list(self.xp)}, {list(self.fp)})"
@@ -1,6 +1,9 @@
-import numpy as np
 from numbers import Number
 
+import numpy as np
+
+from opendbc.car.common.fastmath import Interp, clip
+
 
 class PIDController:
   def __init__(self, k_p, k_i, k_f=0., k_d=0., pos_limit=1e308, neg_limit=-1e308, rate=100):
@@ -14,6 +17,12 @@ class PIDController:
       self._k_i = [[0], [self._k_i]]
     if isinstance(self._k_d, Number):
       self._k_d = [[0], [self._k_d]]
+    # gain schedules are compiled once, and looked up again only when the speed changes
+    self._k_p_interp = Interp(*self._k_p)
+    self._k_i_interp = Interp(*self._k_i)
+    self._k_d_interp = Interp(*self._k_d)
+    self._gains_speed: float | None = None
+    self._gains = (0., 0., 0.)
 
     self.pos_limit = pos_limit
     self.neg_limit = neg_limit
@@ -24,17 +33,24 @@ class PIDController:
 
     self.reset()
 
+  def gains(self) -> tuple[float, float, float]:
+    """k_p, k_i and k_d at the current speed"""
+    if self.speed != self._gains_speed:
+      self._gains_speed = self.speed
+      self._gains = (self._k_p_interp(self.speed), self._k_i_interp(self.speed), self._k_d_interp(self.speed))
+    return self._gains
+
   @property
   def k_p(self):
-    return np.interp(self.speed, self._k_p[0], self._k_p[1])
+    return self.gains()[0]
 
   @property
   def k_i(self):
-    return np.interp(self.speed, self._k_i[0], self._k_i[1])
+    return self.gains()[1]
 
   @property
   def k_d(self):
-    return np.interp(self.speed, self._k_d[0], self._k_d[1])
+    return self.gains()[2]
 
   @property
   def error_integral(self):
@@ -49,23 +65,69 @@ class PIDController:
 
   def update(self, error, error_rate=0.0, speed=0.0, override=False, feedforward=0., freeze_integrator=False):
     self.speed = speed
+    k_p, k_i, k_d = self.gains()
 
-    self.p = float(error) * self.k_p
+    self.p = float(error) * k_p
     self.f = feedforward * self.k_f
-    self.d = error_rate * self.k_d
+    self.d = error_rate * k_d
 
     if override:
-      self.i -= self.i_unwind_rate * float(np.sign(self.i))
+      self.i -= self.i_unwind_rate * float((self.i > 0) - (self.i < 0))
     else:
       if not freeze_integrator:
-        self.i = self.i + error * self.k_i * self.i_rate
+        self.i = self.i + error * k_i * self.i_rate
 
         # Clip i to prevent exceeding control limits
         control_no_i = self.p + self.d + self.f
-        control_no_i = np.clip(control_no_i, self.neg_limit, self.pos_limit)
-        self.i = np.clip(self.i, self.neg_limit - control_no_i, self.pos_limit - control_no_i)
+        control_no_i = clip(control_no_i, self.neg_limit, self.pos_limit)
+        self.i = clip(self.i, self.neg_limit - control_no_i, self.pos_limit - control_no_i)
 
     control = self.p + self.i + self.d + self.f
 
-    self.control = np.clip(control, self.neg_limit, self.pos_limit)
+    self.control = clip(control, self.neg_limit, self.pos_limit)
     return self.control
+
+  def update_many(self, errors, speeds, error_rates=0.0, overrides=False, feedforwards=0., freeze_integrators=False) -> np.ndarray:
+    """Runs update() over arrays of samples, e.g. a logged drive for offline tuning, and returns the control of each.
+    Arguments broadcast to the length of errors, and the controller ends in the state the last sample left it in.
+    """
+    errors = np.asarray(errors, dtype=np.float64)
+    n = len(errors)
+    speeds = np.broadcast_to(np.asarray(speeds, dtype=np.float64), n)
+    error_rates = np.broadcast_to(np.asarray(error_rates, dtype=np.float64), n)
+    feedforwards = np.broadcast_to(np.asarray(feedforwards, dtype=np.float64), n)
+    overrides = np.broadcast_to(np.asarray(overrides, dtype=bool), n)
+    freeze_integrators = np.broadcast_to(np.asarray(freeze_integrators, dtype=bool), n)
+    if n == 0:
+      return np.empty(0)
+
+    # everything but the integrator is per sample, the same operations update() does element-wise
+    p = errors * np.interp(speeds, self._k_p_interp.xp, self._k_p_interp.fp)
+    f = feedforwards * self.k_f
+    d = error_rates * np.interp(speeds, self._k_d_interp.xp, self._k_d_interp.fp)
+    i_step = errors * np.interp(speeds, self._k_i_interp.xp, self._k_i_interp.fp) * self.i_rate
+    integrating = ~overrides & ~freeze_integrators
+
+    if not overrides.any() and self.neg_limit <= -1e308 and self.pos_limit >= 1e308:
+      # unlimited and never unwinding, the integrator is a running sum
+      i = np.cumsum(np.concatenate(([self.i], np.where(integrating, i_step, 0.))))[1:]
+    else:
+      i = np.empty(n)
+      i_last = self.i
+      neg_limit, pos_limit, unwind_rate = self.neg_limit, self.pos_limit, self.i_unwind_rate
+      for k, (p_k, d_k, f_k, i_step_k, override, integrate) in enumerate(zip(p.tolist(), d.tolist(), f.tolist(), i_step.tolist(),
+                                                                                overrides.tolist(), integrating.tolist(), strict=True)):
+        if override:
+          i_last -= unwind_rate * float((i_last > 0) - (i_last < 0))
+        elif integrate:
+          i_last = i_last + i_step_k
+          control_no_i = clip(p_k + d_k + f_k, neg_limit, pos_limit)
+          i_last = clip(i_last, neg_limit - control_no_i, pos_limit - control_no_i)
+        i[k] = i_last
+
+    control = np.clip(p + i + d + f, self.neg_limit, self.pos_limit)
+
+    self.speed = float(speeds[-1])
+    self.p, self.i, self.d, self.f = float(p[-1]), float(i[-1]), float(d[-1]), float(f[-1])
+    self.control = float(control[-1])
+    return control
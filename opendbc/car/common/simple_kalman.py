@@ -1,5 +1,9 @@
 import numpy as np
 
+# updates solved together by KF1D.filter
+FILTER_BLOCK = 64
+FILTER_CHUNK = 16 * FILTER_BLOCK
+
 
 def get_kalman_gain(dt, A, C, Q, R, iterations=100):
   P = np.zeros_like(Q)
@@ -37,6 +41,8 @@ class KF1D:
     # (x, l, K) = control.dare(np.transpose(self.A), np.transpose(self.C), Q, R)
     # self.K = np.transpose(K)
 
+    self._blocks: tuple[np.ndarray, np.ndarray] | None = None
+
   def update(self, meas):
     #self.x = np.dot(self.A_K, self.x) + np.dot(self.K, meas)
     x0_0 = self.A_K_0 * self.x0_0 + self.A_K_1 * self.x1_0 + self.K0_0 * meas
@@ -45,6 +51,67 @@ class KF1D:
     self.x1_0 = x1_0
     return [self.x0_0, self.x1_0]
 
+  def _block_matrices(self) -> tuple[np.ndarray, np.ndarray]:
+    # the filter is the linear recurrence x' = A_K x + K z, so a block of FILTER_BLOCK updates is
+    # x_j = A_K^(j+1) x + sum_i A_K^(j-i) K z_i, with the powers and the lower triangular gains precomputed
+    if self._blocks is None:
+      A_K = np.array([[self.A_K_0, self.A_K_1], [self.A_K_2, self.A_K_3]])
+      powers = np.empty((FILTER_BLOCK + 1, 2, 2))
+      powers[0] = np.eye(2)
+      for j in range(FILTER_BLOCK):
+        powers[j + 1] = A_K @ powers[j]
+      impulse = powers[:FILTER_BLOCK] @ np.array([self.K0_0, self.K1_0])
+      lags = np.subtract.outer(np.arange(FILTER_BLOCK), np.arange(FILTER_BLOCK))
+      gains = np.where(lags[None] >= 0, impulse[np.maximum(lags, 0)].transpose(2, 0, 1), 0.)
+      self._blocks = powers[1:], gains
+    return self._blocks
+
+  def _filter_linear(self, meas: np.ndarray, out: np.ndarray) -> None:
+    powers, gains = self._block_matrices()
+    n = len(meas)
+    n_blocks = -(-n // FILTER_BLOCK)
+    z = np.zeros(n_blocks * FILTER_BLOCK)
+    z[:n] = meas
+    # response of each block to its own measurements, starting from zero
+    forced = (z.reshape(n_blocks, FILTER_BLOCK) @ gains.transpose(0, 2, 1)).transpose(1, 2, 0)
+
+    # carry the state between blocks, then add each block's response to its initial state
+    starts = np.empty((n_blocks, 2))
+    (p0, p1), (p2, p3) = powers[-1].tolist()
+    x0, x1 = self.x0_0, self.x1_0
+    for b, (f0, f1) in enumerate(forced[:, -1].tolist()):
+      starts[b] = x0, x1
+      x0, x1 = p0 * x0 + p1 * x1 + f0, p2 * x0 + p3 * x1 + f1
+    states = forced + (starts @ powers.reshape(-1, 2).T).reshape(n_blocks, FILTER_BLOCK, 2)
+    out[:] = states.reshape(-1, 2)[:n]
+    self.x0_0, self.x1_0 = (float(v) for v in out[-1])
+
+  def filter(self, meas, reset_threshold: float | None = None) -> np.ndarray:
+    """
+    Runs update over a whole array of measurements, returning the (n, 2) states. With reset_threshold, the state
+    is set to [meas, 0] before any measurement further than that from the estimate, like CarStateBase.update_speed_kf.
+    """
+    meas = np.asarray(meas, dtype=float).ravel()
+    out = np.empty((len(meas), 2))
+    start = 0
+    while start < len(meas):
+      # with resets, filter a chunk at a time so a reset only reruns the rest of its chunk
+      end = len(meas) if reset_threshold is None else min(start + FILTER_CHUNK, len(meas))
+      x0_start = self.x0_0
+      self._filter_linear(meas[start:end], out[start:end])
+      if reset_threshold is None:
+        break
+
+      # rerun from the first measurement that jumps away from the estimate before it, reset to that measurement
+      prev = np.concatenate(([x0_start], out[start:end - 1, 0]))
+      jumps = np.flatnonzero(np.abs(meas[start:end] - prev) > reset_threshold)
+      if not len(jumps):
+        start = end
+        continue
+      start += int(jumps[0])
+      self.set_x([[float(meas[start])], [0.0]])
+    return out
+
   @property
   def x(self):
     return [[self.x0_0], [self.x1_0]]
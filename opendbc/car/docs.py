@@ -1,19 +1,25 @@
 #!/usr/bin/env python3
 import re
 import os
+import glob
+import struct
 import argparse
+import hashlib
+import marshal
+import tempfile
 import unicodedata
+from functools import cache
 from string import Template
 from typing import get_args
 
 from enum import Enum
 
 from opendbc.car.common.basedir import BASEDIR
-from opendbc.car import gen_empty_fingerprint
 from opendbc.car.structs import CarParams
 from opendbc.car.docs_definitions import CarDocs, ExtraCarDocs, ExtraCarsColumn, CommonFootnote
 from opendbc.car.car_helpers import interfaces
 from opendbc.car.interfaces import get_interface_attr
+from opendbc.car.torque_db import source_hash as torque_source_hash
 from opendbc.car.values import Platform
 from opendbc.car.mock.values import CAR as MOCK
 from opendbc.car.extra_cars import CAR as EXTRA
@@ -22,6 +28,16 @@ from opendbc.car.extra_cars import CAR as EXTRA
 EXTRA_CARS_MD_OUT = os.path.join(BASEDIR, "../", "../", "docs", "CARS.md")
 EXTRA_CARS_MD_TEMPLATE = os.path.join(BASEDIR, "CARS_template.md")
 
+# Rendered table rows per platform, so generating CARS.md only rebuilds the platforms whose sources changed. Each
+# platform's rows are keyed on its brand's modules, the shared docs and params code, and the torque data.
+DOCS_CACHE_PATH = os.environ.get("DOCS_CACHE_PATH", os.path.join(BASEDIR, "docs_cache.db"))
+DOCS_CACHE_VERSION = 1
+DOCS_COMMON_SOURCES = ("__init__.py", "docs.py", "docs_definitions.py", "interfaces.py", "car.capnp")
+
+# magic, cache version, marshal version
+_CACHE_HEADER = struct.Struct("<4sII")
+_CACHE_MAGIC = b"OPDC"
+
 # TODO: merge these platforms into normal car ports with SupportType flag
 ExtraPlatform = Platform | EXTRA
 EXTRA_BRANDS = get_args(ExtraPlatform)
@@ -30,9 +46,7 @@ EXTRA_PLATFORMS: dict[str, ExtraPlatform] = {str(platform): platform for brand i
 
 def get_params_for_docs(platform) -> CarParams:
   cp_platform = platform if platform in interfaces else MOCK.MOCK
-  CP: CarParams = interfaces[cp_platform].get_params(cp_platform, fingerprint=gen_empty_fingerprint(),
-                                                     car_fw=[CarParams.CarFw(ecu=CarParams.Ecu.unknown)],
-                                                     alpha_long=True, is_release=True, docs=True)
+  CP: CarParams = interfaces[cp_platform].get_template_params(cp_platform, alpha_long=True, is_release=True, docs=True)
   return CP
 
 
@@ -49,21 +63,22 @@ def _natural_sort_key(s):
   return [int(t) if t.isdigit() else t.lower() for t in re.split(r'(\d+)', normalized) if t]
 
 
+def _platform_car_docs(platform, footnotes=None) -> list[CarDocs | ExtraCarDocs]:
+  car_docs = platform.config.car_docs
+  CP = get_params_for_docs(platform)
+
+  # A platform can include multiple car models
+  for _car_docs in car_docs:
+    if not hasattr(_car_docs, "row"):
+      _car_docs.init_make(CP)
+      _car_docs.init(CP, footnotes)
+  return list(car_docs)
+
+
 def build_sorted_car_docs_list(platforms, footnotes=None):
   collected_car_docs: list[CarDocs | ExtraCarDocs] = []
   for platform in platforms.values():
-    car_docs = platform.config.car_docs
-    CP = get_params_for_docs(platform)
-
-    if not len(car_docs):
-      continue
-
-    # A platform can include multiple car models
-    for _car_docs in car_docs:
-      if not hasattr(_car_docs, "row"):
-        _car_docs.init_make(CP)
-        _car_docs.init(CP, footnotes)
-      collected_car_docs.append(_car_docs)
+    collected_car_docs.extend(_platform_car_docs(platform, footnotes))
 
   # Sort cars by make and model + year
   sorted_cars = sorted(collected_car_docs, key=lambda car: _natural_sort_key(car.name))
@@ -77,8 +92,8 @@ def get_all_car_docs() -> list[CarDocs]:
   return sorted_list
 
 
-def _build_cars_table(all_car_docs: list[CarDocs], **kwargs) -> tuple[str, str, str]:
-  """Build markdown table header, separator, and body rows for ExtraCarsColumn."""
+def _build_cars_table_header(**kwargs) -> tuple[str, str]:
+  """Build markdown table header and separator for ExtraCarsColumn."""
   hardware_col_name = kwargs.get("hardware_col_name", "")
   wide_hardware_col_name = kwargs.get("wide_hardware_col_name", "")
 
@@ -91,40 +106,131 @@ def _build_cars_table(all_car_docs: list[CarDocs], **kwargs) -> tuple[str, str,
   # First three columns left-aligned (---), remaining centered (:---:)
   sep_parts = ["---"] * min(3, len(columns)) + [":---:"] * max(0, len(columns) - 3)
   table_separator = "|" + "|".join(sep_parts) + "|"
+  return table_header, table_separator
 
-  rows = []
-  for car_docs in all_car_docs:
-    cells = [car_docs.get_extra_cars_column(column) for column in columns]
-    rows.append("|" + "|".join(cells) + "|")
-  table_rows = "\n".join(rows) + ("\n" if rows else "")
 
-  return table_header, table_separator, table_rows
+def _build_cars_table_row(car_docs: CarDocs) -> str:
+  return "|" + "|".join(car_docs.get_extra_cars_column(column) for column in ExtraCarsColumn) + "|"
 
 
-# CAUTION: This function is imported by shop.comma.ai and comma.ai/vehicles, test changes carefully
-def generate_cars_md(all_car_docs: list[CarDocs], template_fn: str, **kwargs) -> str:
+def _render_cars_md(rows: list[str], template_fn: str, **kwargs) -> str:
   with open(template_fn) as f:
     template = Template(f.read())
 
-  table_header, table_separator, table_rows = _build_cars_table(all_car_docs, **kwargs)
+  table_header, table_separator = _build_cars_table_header(**kwargs)
   cars_md: str = template.substitute(
-    car_count=len(all_car_docs),
+    car_count=len(rows),
     table_header=table_header,
     table_separator=table_separator,
-    table_rows=table_rows,
+    table_rows="\n".join(rows) + ("\n" if rows else ""),
   )
   # Match historical output: no trailing newline at EOF
   return cars_md.rstrip("\n")
 
 
+# CAUTION: This function is imported by shop.comma.ai and comma.ai/vehicles, test changes carefully
+def generate_cars_md(all_car_docs: list[CarDocs], template_fn: str, **kwargs) -> str:
+  return _render_cars_md([_build_cars_table_row(car_docs) for car_docs in all_car_docs], template_fn, **kwargs)
+
+
+@cache
+def _sources_hash(paths: tuple[str, ...]) -> bytes:
+  h = hashlib.sha256()
+  for fn in paths:
+    h.update(os.path.relpath(fn, BASEDIR).encode())
+    with open(fn, "rb") as f:
+      h.update(f.read())
+  return h.digest()
+
+
+def _module_sources(module: str) -> tuple[str, ...]:
+  # a brand's values module stands for its whole directory, since the interface and fingerprints feed its params
+  path = os.path.join(BASEDIR, *module.split(".")[2:])
+  if os.path.isdir(os.path.dirname(path)) and os.path.dirname(path) != BASEDIR:
+    return tuple(sorted(glob.glob(os.path.join(os.path.dirname(path), "*.py"))))
+  return (path + ".py",)
+
+
+def platform_docs_key(platform) -> bytes:
+  """Hash of everything a platform's docs rows are built from"""
+  cp_platform = platform if platform in interfaces else MOCK.MOCK
+  h = hashlib.sha256(str(platform).encode())
+  h.update(_sources_hash(tuple(os.path.join(BASEDIR, fn) for fn in DOCS_COMMON_SOURCES)))
+  h.update(torque_source_hash())
+  for module in sorted({type(platform).__module__, type(cp_platform).__module__}):
+    h.update(_sources_hash(_module_sources(module)))
+  return h.digest()
+
+
+def _read_docs_cache(path: str) -> dict[str, tuple[bytes, list[tuple[str, str]]]]:
+  try:
+    with open(path, "rb") as f:
+      data = f.read()
+    if data[:_CACHE_HEADER.size] != _CACHE_HEADER.pack(_CACHE_MAGIC, DOCS_CACHE_VERSION, marshal.version):
+      return {}
+    return marshal.loads(data[_CACHE_HEADER.size:])
+  except (OSError, ValueError, EOFError):
+    return {}
+
+
+def _write_docs_cache(path: str, entries: dict[str, tuple[bytes, list[tuple[str, str]]]]) -> None:
+  fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+  try:
+    with os.fdopen(fd, "wb") as f:
+      f.write(_CACHE_HEADER.pack(_CACHE_MAGIC, DOCS_CACHE_VERSION, marshal.version))
+      f.write(marshal.dumps(entries))
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+  finally:
+    if os.path.exists(tmp_path):
+      os.unlink(tmp_path)
+
+
+def get_cars_table_rows(cache_path: str = DOCS_CACHE_PATH) -> tuple[list[str], list[str]]:
+  """CARS.md table rows in docs order, building only the platforms whose cached rows are stale. Returns the rows
+  and the platforms that were rebuilt."""
+  cached = _read_docs_cache(cache_path)
+  updated: dict[str, tuple[bytes, list[tuple[str, str]]]] = {}
+  rebuilt = []
+  footnotes = None
+  for name, platform in EXTRA_PLATFORMS.items():
+    key = platform_docs_key(platform)
+    entry = cached.get(name)
+    if entry is None or entry[0] != key:
+      if footnotes is None:
+        footnotes = get_all_footnotes()
+      entry = (key, [(car_docs.name, _build_cars_table_row(car_docs)) for car_docs in _platform_car_docs(platform, footnotes)])
+      rebuilt.append(name)
+    updated[name] = entry
+
+  if rebuilt or updated.keys() != cached.keys():
+    try:
+      _write_docs_cache(cache_path, updated)
+    except OSError:
+      pass
+
+  # Sort cars by make and model + year, like build_sorted_car_docs_list
+  rows = [row for _, rows in updated.values() for row in rows]
+  return [row for _, row in sorted(rows, key=lambda row: _natural_sort_key(row[0]))], rebuilt
+
+
 if __name__ == "__main__":
   parser = argparse.ArgumentParser(description="Auto generates supportability info docs for all known cars",
                                    formatter_class=argparse.ArgumentDefaultsHelpFormatter)
 
   parser.add_argument("--template", default=EXTRA_CARS_MD_TEMPLATE, help="Override default template filename")
   parser.add_argument("--out", default=EXTRA_CARS_MD_OUT, help="Override default generated filename")
+  parser.add_argument("--cache", default=DOCS_CACHE_PATH, help="Per-platform rows cache, only changed platforms are rebuilt")
+  parser.add_argument("--no-cache", action="store_true", help="Rebuild every platform")
   args = parser.parse_args()
 
+  if args.no_cache:
+    cars_md = generate_cars_md(get_all_car_docs(), args.template)
+  else:
+    rows, rebuilt = get_cars_table_rows(args.cache)
+    cars_md = _render_cars_md(rows, args.template)
+    print(f"Rebuilt {len(rebuilt)} of {len(EXTRA_PLATFORMS)} platforms")
+
   with open(args.out, 'w') as f:
-    f.write(generate_cars_md(get_all_car_docs(), args.template))
+    f.write(cars_md)
   print(f"Generated and written to {args.out}")
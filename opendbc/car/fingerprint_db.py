@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import tempfile
+from functools import cache
+from typing import Any
+
+from opendbc.car.common.basedir import BASEDIR
+
+# A precompiled copy of every brand's FW_VERSIONS and FINGERPRINTS, so fingerprinting doesn't need to import
+# the brand fingerprints.py modules. Those stay the source of truth: the database is keyed on their content
+# (and the values.py modules their platforms come from), generated when the package is built, and rebuilt in
+# memory whenever it's missing or stale. Only `python -m opendbc.car.fingerprint_db` writes it.
+DB_PATH = os.environ.get("FINGERPRINT_DB_PATH", os.path.join(BASEDIR, "fingerprints.db"))
+DB_VERSION = 1
+DB_ATTRS = ("FW_VERSIONS", "FINGERPRINTS")
+
+# magic, database version, marshal version, sha256 of the source modules
+_HEADER = struct.Struct("<4sII32s")
+_MAGIC = b"OPFP"
+
+FingerprintDB = dict[str, dict[str, Any]]
+
+
+def _brands() -> list[str]:
+  return sorted(os.path.basename(os.path.dirname(fn)) for fn in glob.glob(os.path.join(BASEDIR, "*", "fingerprints.py")))
+
+
+def _source_files() -> list[str]:
+  return [fn for brand in _brands() for fn in (os.path.join(BASEDIR, brand, "fingerprints.py"), os.path.join(BASEDIR, brand, "values.py"))
+          if os.path.isfile(fn)]
+
+
+def source_hash() -> bytes:
+  h = hashlib.sha256()
+  for fn in _source_files():
+    h.update(os.path.relpath(fn, BASEDIR).encode())
+    with open(fn, "rb") as f:
+      h.update(f.read())
+  return h.digest()
+
+
+def _header(digest: bytes) -> bytes:
+  return _HEADER.pack(_MAGIC, DB_VERSION, marshal.version, digest)
+
+
+def build_db() -> FingerprintDB:
+  """Imports every brand's fingerprints module and returns {attr: {brand: {platform: value}}}, with platforms as plain strings"""
+  db: FingerprintDB = {attr: {} for attr in DB_ATTRS}
+  for brand in _brands():
+    try:
+      module = __import__(f"opendbc.car.{brand}.fingerprints", fromlist=list(DB_ATTRS))
+    except (ImportError, OSError):
+      continue
+
+    for attr in DB_ATTRS:
+      if hasattr(module, attr):
+        data = getattr(module, attr)
+        db[attr][brand] = {str(platform): value for platform, value in data.items()} if isinstance(data, dict) else data
+  return db
+
+
+def write_db(db: FingerprintDB, path: str = DB_PATH, digest: bytes | None = None) -> None:
+  if digest is None:
+    digest = source_hash()
+  fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+  try:
+    with os.fdopen(fd, "wb") as f:
+      f.write(_header(digest))
+      f.write(marshal.dumps(db))
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+  finally:
+    if os.path.exists(tmp_path):
+      os.unlink(tmp_path)
+
+
+def read_db(path: str = DB_PATH, digest: bytes | None = None) -> FingerprintDB | None:
+  """Returns the database at path, or None if it's missing or wasn't built from the current sources"""
+  if digest is None:
+    digest = source_hash()
+  try:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      if mm[:_HEADER.size] != _header(digest):
+        return None
+      return marshal.loads(memoryview(mm)[_HEADER.size:])
+  except (OSError, ValueError, EOFError):
+    return None
+
+
+@cache
+def load_db(path: str = DB_PATH) -> FingerprintDB:
+  """Returns {attr: {brand: {platform: value}}} for FW_VERSIONS and FINGERPRINTS, with platforms as Platform members.
+
+  Loaded from the precompiled database when it's up to date, otherwise built from the brand modules.
+  """
+  from opendbc.car.values import PLATFORMS
+
+  db = read_db(path)
+  if db is None:
+    db = build_db()
+
+  for brands in db.values():
+    for brand, data in brands.items():
+      if isinstance(data, dict):
+        brands[brand] = {PLATFORMS.get(platform, platform): value for platform, value in data.items()}
+  return db
+
+
+def combine_brands(brands: dict[str, Any]) -> dict[str, Any]:
+  ret = {}
+  for data in brands.values():
+    if isinstance(data, dict):
+      ret.update(data)
+  return ret
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Builds the fingerprint database from the brand fingerprints modules")
+  parser.add_argument("--out", default=DB_PATH, help="output path")
+  args = parser.parse_args()
+
+  write_db(build_db(), args.out)
+  print(f"Wrote {args.out} ({os.path.getsize(args.out)} bytes)")
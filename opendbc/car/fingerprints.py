@@ -1,4 +1,4 @@
-from opendbc.car.interfaces import get_interface_attr
+from opendbc.car.fingerprint_db import combine_brands, load_db
 from opendbc.car.body.values import CAR as BODY
 from opendbc.car.chrysler.values import CAR as CHRYSLER
 from opendbc.car.ford.values import CAR as FORD
@@ -14,8 +14,8 @@ from opendbc.car.tesla.values import CAR as TESLA
 from opendbc.car.toyota.values import CAR as TOYOTA
 from opendbc.car.volkswagen.values import CAR as VW
 
-FW_VERSIONS = get_interface_attr('FW_VERSIONS', combine_brands=True, ignore_none=True)
-_FINGERPRINTS = get_interface_attr('FINGERPRINTS', combine_brands=True, ignore_none=True)
+FW_VERSIONS = combine_brands(load_db()['FW_VERSIONS'])
+_FINGERPRINTS = combine_brands(load_db()['FINGERPRINTS'])
 
 _DEBUG_ADDRESS = {1880: 8}   # reserved for debug purposes
 
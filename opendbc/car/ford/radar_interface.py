@@ -1,14 +1,11 @@
 import numpy as np
-from typing import cast
-from collections import defaultdict
-from math import cos, sin
-from dataclasses import dataclass
 from opendbc.can import CANParser
 from opendbc.car import Bus, structs
 from opendbc.car.common.conversions import Conversions as CV
 from opendbc.car.ford.fordcan import CanBus
 from opendbc.car.ford.values import DBC, RADAR
 from opendbc.car.interfaces import RadarInterfaceBase
+from opendbc.car.radar_tracks import RadarTrackTable, set_points
 
 DELPHI_ESR_RADAR_MSGS = list(range(0x500, 0x540))
 
@@ -20,26 +17,37 @@ DELPHI_MRR_RADAR_RANGE_COVERAGE = {0: 42, 1: 164, 2: 45, 3: 175}  # scan index t
 DELPHI_MRR_MIN_LONG_RANGE_DIST = 30  # meters
 DELPHI_MRR_CLUSTER_THRESHOLD = 5  # meters, lateral distance and relative velocity are weighted
 
+# points from scan indexes 2 and 3 are clustered together
+DELPHI_MRR_MAX_POINTS = 2 * DELPHI_MRR_RADAR_MSG_COUNT
 
-@dataclass
-class Cluster:
-  dRel: float = 0.0
-  yRel: float = 0.0
-  vRel: float = 0.0
-  trackId: int = 0
+# cluster points are weighted by this before measuring distances
+DELPHI_MRR_CLUSTER_WEIGHTS = np.array([1.0, 2.0, 2.0])
 
+# grid cells are keyed by packing their 3 coordinates into one int64, coordinates are clipped to fit
+_CELL_BITS = 20
+_CELL_LIMIT = (1 << (_CELL_BITS - 1)) - 2
+_CELL_NEIGHBORS = np.array([(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)], dtype=np.int64)
 
-def cluster_points(pts_l: list[list[float]], pts2_l: list[list[float]], max_dist: float) -> list[int]:
+
+def _cell_keys(cells: np.ndarray) -> np.ndarray:
+  c = np.clip(cells, -_CELL_LIMIT - 1, _CELL_LIMIT + 1) + (1 << (_CELL_BITS - 1))
+  return (c[..., 0] << (2 * _CELL_BITS)) | (c[..., 1] << _CELL_BITS) | c[..., 2]
+
+
+def cluster_points(pts_l: list[list[float]] | np.ndarray, pts2_l: list[list[float]] | np.ndarray, max_dist: float) -> list[int]:
   """
   Clusters a collection of points based on another collection of points. This is useful for correlating clusters through time.
   Points in pts2 not close enough to any point in pts are assigned -1.
+
+  pts is bucketed into a grid with cells max_dist wide, so each point in pts2 is only compared against pts
+  in its own and neighboring cells rather than all of them.
   Args:
     pts_l: List of points to base the new clusters on
     pts2_l: List of points to cluster using pts
     max_dist: Max distance from cluster center to candidate point
 
   Returns:
-    List of cluster indices for pts2 that correspond to pts
+    List of cluster indices for pts2 that correspond to pts, the closest one if several are in range
   """
 
   if not len(pts2_l):
@@ -48,25 +56,37 @@ def cluster_points(pts_l: list[list[float]], pts2_l: list[list[float]], max_dist
   if not len(pts_l):
     return [-1] * len(pts2_l)
 
-  max_dist_sq = max_dist ** 2
-  pts = np.array(pts_l)
-  pts2 = np.array(pts2_l)
+  pts = np.asarray(pts_l, dtype=np.float64)
+  pts2 = np.asarray(pts2_l, dtype=np.float64)
 
-  # Compute squared norms
-  pts_norm_sq = np.sum(pts ** 2, axis=1)
-  pts2_norm_sq = np.sum(pts2 ** 2, axis=1)
+  with np.errstate(invalid='ignore'):
+    cells = np.floor(pts / max_dist).astype(np.int64)
+    cells2 = np.floor(pts2 / max_dist).astype(np.int64)
 
-  # Compute squared Euclidean distances using the identity
-  # dist_sq[i, j] = ||pts2[i]||^2 + ||pts[j]||^2 - 2 * pts2[i] . pts[j]
-  dist_sq = pts2_norm_sq[:, np.newaxis] + pts_norm_sq[np.newaxis, :] - 2 * np.dot(pts2, pts.T)
-  dist_sq = np.maximum(dist_sq, 0.0)
+  # pts sorted by cell, each query point looks up the range of pts in each of its 27 neighboring cells
+  keys = _cell_keys(cells)
+  order = np.argsort(keys, kind='stable')
+  sorted_keys = keys[order]
+  neighbor_keys = _cell_keys(cells2[:, np.newaxis, :] + _CELL_NEIGHBORS).ravel()
+  lo = np.searchsorted(sorted_keys, neighbor_keys, side='left')
+  counts = np.searchsorted(sorted_keys, neighbor_keys, side='right') - lo
 
-  # Find the closest cluster for each point and assign its index
-  closest_clusters = np.argmin(dist_sq, axis=1)
-  closest_dist_sq = dist_sq[np.arange(len(pts2)), closest_clusters]
-  cluster_idxs = np.where(closest_dist_sq < max_dist_sq, closest_clusters, -1)
+  # expand to every (query point, candidate) pair
+  pair_query = np.repeat(np.repeat(np.arange(len(pts2)), len(_CELL_NEIGHBORS)), counts)
+  offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+  pair_candidate = order[np.repeat(lo, counts) + offsets]
 
-  return cast(list[int], cluster_idxs.tolist())
+  dist_sq = np.sum((pts2[pair_query] - pts[pair_candidate]) ** 2, axis=1)
+  in_range = dist_sq < max_dist ** 2
+  pair_query, pair_candidate, dist_sq = pair_query[in_range], pair_candidate[in_range], dist_sq[in_range]
+
+  # closest candidate per query point, ties go to the lowest index
+  best = np.lexsort((pair_candidate, dist_sq, pair_query))
+  queries, first = np.unique(pair_query[best], return_index=True)
+  cluster_idxs = np.full(len(pts2), -1, dtype=np.int64)
+  cluster_idxs[queries] = pair_candidate[best][first]
+
+  return cluster_idxs.tolist()
 
 
 def _create_delphi_esr_radar_can_parser(CP) -> CANParser:
@@ -93,8 +113,12 @@ class RadarInterface(RadarInterfaceBase):
   def __init__(self, CP):
     super().__init__(CP)
 
-    self.points: list[list[float]] = []
-    self.clusters: list[Cluster] = []
+    # points accumulated over a scan cycle, and the previous cycle's cluster centroids (dRel, yRel, vRel)
+    self.points = np.zeros((DELPHI_MRR_MAX_POINTS, 3))
+    self.n_points = 0
+    self.clusters = np.zeros((DELPHI_MRR_MAX_POINTS, 3))
+    self.cluster_track_ids = np.zeros(DELPHI_MRR_MAX_POINTS, dtype=np.int64)
+    self.n_clusters = 0
 
     self.updated_messages = set()
     self.radar = DBC[CP.carFingerprint].get(Bus.radar)
@@ -110,6 +134,10 @@ class RadarInterface(RadarInterfaceBase):
     elif self.radar == RADAR.DELPHI_MRR:
       self.rcp = _create_delphi_mrr_radar_can_parser(CP)
       self.trigger_msg = DELPHI_MRR_RADAR_HEADER_ADDR
+      signals = ('SCAN_INDEX', 'VALID_LEVEL', 'RANGE', 'AZIMUTH', 'RANGE_RATE')
+      ids = range(1, DELPHI_MRR_RADAR_MSG_COUNT + 1)
+      self.detections = RadarTrackTable(self.rcp, [f"MRR_Detection_{ii:03d}" for ii in ids], signals,
+                                        [[f"CAN_{'SCAN_INDEX_2LSB' if sig == 'SCAN_INDEX' else 'DET_' + sig}_{ii:02d}" for sig in signals] for ii in ids])
     else:
       raise ValueError(f"Unsupported radar: {self.radar}")
 
@@ -135,7 +163,7 @@ class RadarInterface(RadarInterfaceBase):
       if not _update:
         return None
 
-    ret.points = list(self.pts.values())
+    set_points(ret, self.pts.values())
     return ret
 
   def _update_delphi_esr(self):
@@ -154,15 +182,13 @@ class RadarInterface(RadarInterfaceBase):
       # radar point only valid if there have been enough valid measurements
       if self.valid_cnt[ii] > 0:
         if ii not in self.pts:
-          self.pts[ii] = structs.RadarData.RadarPoint()
-          self.pts[ii].trackId = self.track_id
+          self._new_point(ii, self.track_id)
           self.track_id += 1
         self.pts[ii].dRel = cpt['X_Rel']  # from front of car
         self.pts[ii].yRel = cpt['X_Rel'] * cpt['Angle'] * CV.DEG_TO_RAD  # in car frame's y axis, left is positive
         self.pts[ii].vRel = cpt['V_Rel']
       else:
-        if ii in self.pts:
-          del self.pts[ii]
+        self._drop_point(ii)
 
   def _update_delphi_mrr(self, ret: structs.RadarData):
     headerScanIndex = int(self.rcp.vl["MRR_Header_InformationDetections"]['CAN_SCAN_INDEX']) & 0b11
@@ -175,9 +201,10 @@ class RadarInterface(RadarInterfaceBase):
     self.prev_headerScanIndex = headerScanIndex
 
     if self.radar_unavailable_cnt >= 5:
-      self.pts.clear()
-      self.points.clear()
-      self.clusters.clear()
+      for idx in list(self.pts):
+        self._drop_point(idx)
+      self.n_points = 0
+      self.n_clusters = 0
       ret.errors.radarUnavailableTemporary = True
       return True
 
@@ -194,75 +221,82 @@ class RadarInterface(RadarInterfaceBase):
     if self.scan_index_invalid_cnt >= 5:
       ret.errors.wrongConfig = True
 
-    for ii in range(1, DELPHI_MRR_RADAR_MSG_COUNT + 1):
-      msg = self.rcp.vl[f"MRR_Detection_{ii:03d}"]
-
-      # SCAN_INDEX rotates through 0..3 on each message for different measurement modes
-      # Indexes 0 and 2 have a max range of ~40m, 1 and 3 are ~170m (MRR_Header_SensorCoverage->CAN_RANGE_COVERAGE)
-      # Indexes 0 and 1 have a Doppler coverage of +-71 m/s, 2 and 3 have +-60 m/s
-      scanIndex = msg[f"CAN_SCAN_INDEX_2LSB_{ii:02d}"]
-
-      # Throw out old measurements. Very unlikely to happen, but is proper behavior
-      if scanIndex != headerScanIndex:
-        continue
-
-      valid = bool(msg[f"CAN_DET_VALID_LEVEL_{ii:02d}"])
-
-      # Long range measurement mode is more sensitive and can detect the road surface
-      dist = msg[f"CAN_DET_RANGE_{ii:02d}"]  # m [0|255.984]
-      if scanIndex in (1, 3) and dist < DELPHI_MRR_MIN_LONG_RANGE_DIST:
-        valid = False
-
-      if valid:
-        azimuth = msg[f"CAN_DET_AZIMUTH_{ii:02d}"]              # rad [-3.1416|3.13964]
-        distRate = msg[f"CAN_DET_RANGE_RATE_{ii:02d}"]          # m/s [-128|127.984]
-        dRel = cos(azimuth) * dist                              # m from front of car
-        yRel = -sin(azimuth) * dist                             # in car frame's y axis, left is positive
-
-        self.points.append([dRel, yRel * 2, distRate * 2])
+    det = self.detections.read()
+
+    # SCAN_INDEX rotates through 0..3 on each message for different measurement modes
+    # Indexes 0 and 2 have a max range of ~40m, 1 and 3 are ~170m (MRR_Header_SensorCoverage->CAN_RANGE_COVERAGE)
+    # Indexes 0 and 1 have a Doppler coverage of +-71 m/s, 2 and 3 have +-60 m/s
+    # Throw out old measurements. Very unlikely to happen, but is proper behavior
+    valid = (det['SCAN_INDEX'] == headerScanIndex) & (det['VALID_LEVEL'] != 0)
+
+    # Long range measurement mode is more sensitive and can detect the road surface
+    dist = det['RANGE']  # m [0|255.984]
+    if headerScanIndex in (1, 3):
+      valid &= dist >= DELPHI_MRR_MIN_LONG_RANGE_DIST
+
+    azimuth = det['AZIMUTH'][valid]  # rad [-3.1416|3.13964]
+    dist = dist[valid]
+    n = len(dist)
+    if self.n_points + n > len(self.points):
+      # a skipped scan index 3 means more than two scans accumulate before clustering
+      self.points = np.concatenate([self.points, np.zeros_like(self.points)])
+    points = self.points[self.n_points:self.n_points + n]
+    points[:, 0] = np.cos(azimuth) * dist        # m from front of car
+    points[:, 1] = -np.sin(azimuth) * dist       # in car frame's y axis, left is positive
+    points[:, 2] = det['RANGE_RATE'][valid]      # m/s [-128|127.984]
+    self.n_points += n
 
     # Cluster and publish using stored points once we've cycled through all 4 scan modes
     if headerScanIndex != 3:
       return False
 
-    # Cluster points from this cycle against the centroids from the previous cycle
-    prev_keys = [[p.dRel, p.yRel * 2, p.vRel * 2] for p in self.clusters]
-    labels = cluster_points(prev_keys, self.points, DELPHI_MRR_CLUSTER_THRESHOLD)
-
-    points_by_track_id = defaultdict(list)
-    for idx, label in enumerate(labels):
-      if label != -1:
-        points_by_track_id[self.clusters[label].trackId].append(self.points[idx])
-      else:
-        points_by_track_id[self.track_id].append(self.points[idx])
-        self.track_id += 1
-
-    self.clusters = []
-    for idx, (track_id, pts) in enumerate(points_by_track_id.items()):
-      dRel = [p[0] for p in pts]
-      min_dRel = min(dRel)
-      dRel = sum(dRel) / len(dRel)
-
-      yRel = [p[1] for p in pts]
-      yRel = sum(yRel) / len(yRel) / 2
-
-      vRel = [p[2] for p in pts]
-      vRel = sum(vRel) / len(vRel) / 2
-
-      # FIXME: creating capnp RadarPoint and accessing attributes are both expensive, so we store a dataclass and reuse the RadarPoint
-      self.clusters.append(Cluster(dRel=dRel, yRel=yRel, vRel=vRel, trackId=track_id))
-
-      if idx not in self.pts:
-        self.pts[idx] = structs.RadarData.RadarPoint()
-
-      self.pts[idx].dRel = min_dRel
-      self.pts[idx].yRel = yRel
-      self.pts[idx].vRel = vRel
-      self.pts[idx].trackId = track_id
-
-    for idx in range(len(points_by_track_id), len(self.pts)):
-      del self.pts[idx]
+    self._cluster_mrr_points()
+    self.n_points = 0
+    return True
 
-    self.points = []
+  def _cluster_mrr_points(self):
+    points = self.points[:self.n_points]
+    clusters = self.clusters[:self.n_clusters]
+    weighted = points * DELPHI_MRR_CLUSTER_WEIGHTS
 
-    return True
+    # Cluster points from this cycle against the centroids from the previous cycle
+    labels = np.array(cluster_points(clusters * DELPHI_MRR_CLUSTER_WEIGHTS, weighted, DELPHI_MRR_CLUSTER_THRESHOLD), dtype=np.int64)
+
+    # points not matching a previous cluster each start a new track
+    new = labels == -1
+    track_ids = np.empty(len(points), dtype=np.int64)
+    track_ids[~new] = self.cluster_track_ids[labels[~new]]
+    track_ids[new] = self.track_id + np.arange(np.count_nonzero(new))
+    self.track_id += int(np.count_nonzero(new))
+
+    # group by track id, ordered by each track's first point
+    unique_ids, first, group = np.unique(track_ids, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    group = rank[group]
+    n_clusters = len(unique_ids)
+
+    counts = np.bincount(group, minlength=n_clusters)
+    means = np.stack([np.bincount(group, weights=weighted[:, i], minlength=n_clusters) for i in range(3)], axis=1) / counts[:, np.newaxis]
+    means[:, 1:] /= 2
+    min_dRel = np.full(n_clusters, np.inf)
+    np.minimum.at(min_dRel, group, points[:, 0])
+
+    if n_clusters > len(self.clusters):
+      self.clusters = np.zeros_like(self.points)
+      self.cluster_track_ids = np.zeros(len(self.points), dtype=np.int64)
+    self.n_clusters = n_clusters
+    self.clusters[:n_clusters] = means
+    self.cluster_track_ids[:n_clusters] = unique_ids[order]
+
+    for idx, (dRel, yRel, vRel, track_id) in enumerate(zip(min_dRel.tolist(), means[:, 1].tolist(), means[:, 2].tolist(),
+                                                           unique_ids[order].tolist(), strict=True)):
+      pt = self.pts[idx] if idx in self.pts else self._new_point(idx, track_id)
+      pt.trackId = track_id
+      pt.dRel = dRel
+      pt.yRel = yRel
+      pt.vRel = vRel
+
+    for idx in range(n_clusters, len(self.pts)):
+      self._drop_point(idx)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+import argparse
+import random
+import time
+
+import numpy as np
+
+from opendbc.can import CANPacker
+from opendbc.car import structs
+from opendbc.car.can_definitions import CanData
+from opendbc.car.ford.fordcan import CanBus
+from opendbc.car.ford.radar_interface import RadarInterface
+from opendbc.car.ford.tests.test_ford_radar import mrr_scan_frames, random_detections, random_targets
+from opendbc.car.ford.values import CAR, RADAR
+
+
+def synthetic_frames(CP, n_targets: int, cycles: int, seed: int = 0):
+  rng = random.Random(seed)
+  packer, bus = CANPacker(RADAR.DELPHI_MRR), CanBus(CP).radar
+  targets = random_targets(rng, n_targets)
+  frames = []
+  for cycle in range(cycles):
+    targets = [(d + rng.gauss(0, 0.2), a, r) for d, a, r in targets]
+    frames.append((cycle * 30_000_000, [CanData(*f) for f in mrr_scan_frames(packer, bus, cycle % 4, random_detections(rng, targets))]))
+  return frames
+
+
+def recorded_frames(log: str):
+  from opendbc.car.logreader import LogReader
+
+  frames = []
+  for msg in LogReader(log, only_union_types=True, sort_by_time=True):
+    if msg.which() == "can":
+      frames.append((msg.logMonoTime, [CanData(can.address, can.dat, can.src) for can in msg.can]))
+  return frames
+
+
+def benchmark(CP, frames):
+  """Per-cycle latency of RadarInterface.update in ms, for cycles that published clusters"""
+  radar = RadarInterface(CP)
+  times, n_points = [], []
+  for frame in frames:
+    t = time.perf_counter()
+    rr = radar.update([frame])
+    dt = time.perf_counter() - t
+    if rr is not None:
+      times.append(dt * 1e3)
+      n_points.append(len(rr.points))
+  return np.array(times), np.array(n_points)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmarks the Ford Delphi MRR radar interface's per-cycle latency")
+  parser.add_argument("--log", help="rlog path or URL of a drive with a Delphi MRR radar, synthetic detections are used if not set")
+  parser.add_argument("--platform", default=CAR.FORD_ESCAPE_MK4, help="platform of the recorded drive")
+  parser.add_argument("--cycles", type=int, default=2000, help="scan cycles per synthetic run")
+  parser.add_argument("--max-ms", type=float, help="fail if the 99th percentile latency of a publishing cycle is above this")
+  args = parser.parse_args()
+
+  CP = structs.CarParams(carFingerprint=args.platform)
+  assert RadarInterface(CP).radar == RADAR.DELPHI_MRR, f"{args.platform} doesn't have a Delphi MRR radar"
+
+  if args.log:
+    runs = [("recorded", recorded_frames(args.log))]
+  else:
+    # 3 detections per target, up to the radar's 64 detections per scan
+    runs = [(f"{n} targets", synthetic_frames(CP, n, args.cycles)) for n in (1, 5, 10, 15, 21)]
+
+  over = False
+  for name, frames in runs:
+    times, n_points = benchmark(CP, frames)
+    p99 = np.percentile(times, 99)
+    print(f"{name:>12}: {len(times)} cycles, {n_points.mean():5.1f} clusters, mean {times.mean():.3f} ms, p99 {p99:.3f} ms, max {times.max():.3f} ms")
+    over |= args.max_ms is not None and p99 > args.max_ms
+
+  return 1 if over else 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,182 @@
+import math
+import random
+import unittest
+from collections import defaultdict
+
+import numpy as np
+
+from opendbc.can import CANPacker
+from opendbc.car import structs
+from opendbc.car.ford.fordcan import CanBus
+from opendbc.car.ford.radar_interface import DELPHI_MRR_CLUSTER_THRESHOLD, DELPHI_MRR_MIN_LONG_RANGE_DIST, DELPHI_MRR_RADAR_MSG_COUNT, \
+                                            DELPHI_MRR_RADAR_RANGE_COVERAGE, RadarInterface, cluster_points
+from opendbc.car.ford.values import CAR, RADAR
+
+
+def mrr_scan_frames(packer: CANPacker, bus: int, scan_index: int, detections: list[tuple[float, float, float]]):
+  """CAN frames for one MRR scan, detections are (range, azimuth, range rate) and fill the first detection messages"""
+  frames = [packer.make_can_msg("MRR_Header_InformationDetections", bus, {"CAN_SCAN_INDEX": scan_index})]
+  for ii in range(1, DELPHI_MRR_RADAR_MSG_COUNT + 1):
+    values = {f"CAN_SCAN_INDEX_2LSB_{ii:02d}": scan_index}
+    if ii <= len(detections):
+      dist, azimuth, rate = detections[ii - 1]
+      values |= {f"CAN_DET_VALID_LEVEL_{ii:02d}": 1, f"CAN_DET_RANGE_{ii:02d}": dist, f"CAN_DET_AZIMUTH_{ii:02d}": azimuth,
+                 f"CAN_DET_RANGE_RATE_{ii:02d}": rate}
+    frames.append(packer.make_can_msg(f"MRR_Detection_{ii:03d}", bus, values))
+  frames.append(packer.make_can_msg("MRR_Header_SensorCoverage", bus, {"CAN_RANGE_COVERAGE": DELPHI_MRR_RADAR_RANGE_COVERAGE[scan_index]}))
+  return frames
+
+
+def random_targets(rng: random.Random, n: int) -> list[tuple[float, float, float]]:
+  return [(rng.uniform(5, 150), rng.uniform(-0.6, 0.6), rng.uniform(-20, 20)) for _ in range(n)]
+
+
+def random_detections(rng: random.Random, targets: list[tuple[float, float, float]], per_target: int = 3) -> list[tuple[float, float, float]]:
+  # a few detections scattered around each target, like the radar returns for a vehicle
+  detections = []
+  for dist, azimuth, rate in targets:
+    for _ in range(per_target):
+      detections.append((dist + rng.gauss(0, 1.0), azimuth + rng.gauss(0, 0.01), rate + rng.gauss(0, 0.3)))
+  rng.shuffle(detections)
+  return detections[:DELPHI_MRR_RADAR_MSG_COUNT]
+
+
+def cluster_points_dense(pts_l, pts2_l, max_dist):
+  # the dense distance matrix implementation the grid one replaced
+  if not len(pts2_l):
+    return []
+  if not len(pts_l):
+    return [-1] * len(pts2_l)
+  pts, pts2 = np.array(pts_l), np.array(pts2_l)
+  dist_sq = np.sum(pts2 ** 2, axis=1)[:, np.newaxis] + np.sum(pts ** 2, axis=1)[np.newaxis, :] - 2 * np.dot(pts2, pts.T)
+  dist_sq = np.maximum(dist_sq, 0.0)
+  closest = np.argmin(dist_sq, axis=1)
+  return np.where(dist_sq[np.arange(len(pts2)), closest] < max_dist ** 2, closest, -1).tolist()
+
+
+class ReferenceRadarInterface(RadarInterface):
+  """The list based MRR implementation the array based one replaced"""
+  def __init__(self, CP):
+    super().__init__(CP)
+    self.points = []
+    self.clusters = []
+
+  def _update_delphi_mrr(self, ret):
+    headerScanIndex = int(self.rcp.vl["MRR_Header_InformationDetections"]['CAN_SCAN_INDEX']) & 0b11
+    if (self.prev_headerScanIndex + 1) % 4 != headerScanIndex:
+      self.radar_unavailable_cnt += 1
+    else:
+      self.radar_unavailable_cnt = 0
+    self.prev_headerScanIndex = headerScanIndex
+
+    if self.radar_unavailable_cnt >= 5:
+      self.pts.clear()
+      self.points.clear()
+      self.clusters.clear()
+      ret.errors.radarUnavailableTemporary = True
+      return True
+
+    if headerScanIndex not in (2, 3):
+      return False
+
+    for ii in range(1, DELPHI_MRR_RADAR_MSG_COUNT + 1):
+      msg = self.rcp.vl[f"MRR_Detection_{ii:03d}"]
+      scanIndex = msg[f"CAN_SCAN_INDEX_2LSB_{ii:02d}"]
+      if scanIndex != headerScanIndex:
+        continue
+      valid = bool(msg[f"CAN_DET_VALID_LEVEL_{ii:02d}"])
+      dist = msg[f"CAN_DET_RANGE_{ii:02d}"]
+      if scanIndex in (1, 3) and dist < DELPHI_MRR_MIN_LONG_RANGE_DIST:
+        valid = False
+      if valid:
+        azimuth = msg[f"CAN_DET_AZIMUTH_{ii:02d}"]
+        distRate = msg[f"CAN_DET_RANGE_RATE_{ii:02d}"]
+        self.points.append([math.cos(azimuth) * dist, -math.sin(azimuth) * dist * 2, distRate * 2])
+
+    if headerScanIndex != 3:
+      return False
+
+    prev_keys = [[c[0], c[1] * 2, c[2] * 2] for c, _ in self.clusters]
+    labels = cluster_points_dense(prev_keys, self.points, DELPHI_MRR_CLUSTER_THRESHOLD)
+
+    points_by_track_id = defaultdict(list)
+    for idx, label in enumerate(labels):
+      if label != -1:
+        points_by_track_id[self.clusters[label][1]].append(self.points[idx])
+      else:
+        points_by_track_id[self.track_id].append(self.points[idx])
+        self.track_id += 1
+
+    self.clusters = []
+    for idx, (track_id, pts) in enumerate(points_by_track_id.items()):
+      dRel = [p[0] for p in pts]
+      yRel = sum(p[1] for p in pts) / len(pts) / 2
+      vRel = sum(p[2] for p in pts) / len(pts) / 2
+      self.clusters.append(((sum(dRel) / len(dRel), yRel, vRel), track_id))
+      if idx not in self.pts:
+        self.pts[idx] = structs.RadarData.RadarPoint()
+      self.pts[idx].dRel = min(dRel)
+      self.pts[idx].yRel = yRel
+      self.pts[idx].vRel = vRel
+      self.pts[idx].trackId = track_id
+
+    for idx in range(len(points_by_track_id), len(self.pts)):
+      del self.pts[idx]
+    self.points = []
+    return True
+
+
+class TestFordRadar(unittest.TestCase):
+  def test_cluster_points(self):
+    rng = np.random.default_rng(0)
+    for n, m in ((0, 5), (5, 0), (1, 1), (10, 40), (60, 128), (200, 200)):
+      pts = rng.uniform([0, -40, -60], [180, 40, 60], size=(n, 3))
+      # queries near some of the clusters, and some far from any
+      pts2 = rng.uniform([0, -40, -60], [180, 40, 60], size=(m, 3))
+      if n:
+        near = rng.integers(0, n, size=m // 2)
+        pts2[:m // 2] = pts[near] + rng.normal(0, 2, size=(m // 2, 3))
+
+      labels = cluster_points(pts, pts2, DELPHI_MRR_CLUSTER_THRESHOLD)
+      assert labels == cluster_points_dense(pts, pts2, DELPHI_MRR_CLUSTER_THRESHOLD)
+      assert labels == cluster_points(pts.tolist(), pts2.tolist(), DELPHI_MRR_CLUSTER_THRESHOLD)
+
+    # exact ties go to the lowest index, points outside the grid's range are still found
+    assert cluster_points([[0, 0, 0], [2, 0, 0], [2, 0, 0]], [[1, 0, 0], [2, 0, 0]], 5) == [0, 1]
+    assert cluster_points([[1e9, 0, 0]], [[1e9 + 1, 0, 0], [0, 0, 0]], 5) == [0, -1]
+
+  def test_mrr_matches_reference(self):
+    CP = structs.CarParams(carFingerprint=CAR.FORD_ESCAPE_MK4)
+    radar, reference = RadarInterface(CP), ReferenceRadarInterface(CP)
+    assert radar.radar == RADAR.DELPHI_MRR
+    packer, bus = CANPacker(RADAR.DELPHI_MRR), CanBus(CP).radar
+
+    rng = random.Random(0)
+    targets = random_targets(rng, 8)
+    t = 0
+    published = 0
+    for cycle in range(400):
+      t += 30_000_000
+      scan_index = cycle % 4
+      # skip a scan now and then, and stop advancing for a while to hit the unavailable radar path
+      if rng.random() < 0.03 or 200 <= cycle < 210:
+        scan_index = (scan_index + 2) % 4
+
+      # targets drift, and come and go
+      targets = [(d + rng.gauss(0, 0.2), a, r) for d, a, r in targets if rng.random() > 0.02]
+      targets += random_targets(rng, int(rng.random() < 0.2))
+
+      frames = mrr_scan_frames(packer, bus, scan_index, random_detections(rng, targets))
+      rr, rr_ref = radar.update([(t, frames)]), reference.update([(t, frames)])
+      assert (rr is None) == (rr_ref is None)
+      if rr is not None:
+        published += 1
+        assert [(p.trackId, p.dRel, p.yRel, p.vRel) for p in rr.points] == [(p.trackId, p.dRel, p.yRel, p.vRel) for p in rr_ref.points]
+        assert rr.errors.radarUnavailableTemporary == rr_ref.errors.radarUnavailableTemporary
+
+    assert published > 50
+    assert radar.track_id == reference.track_id > 0
+
+
+if __name__ == "__main__":
+  unittest.main()
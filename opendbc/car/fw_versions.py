@@ -1,5 +1,6 @@
 from collections import defaultdict
 from collections.abc import Callable, Iterator
+from functools import cache
 from typing import Protocol, TypeVar
 
 from tqdm import tqdm
@@ -9,19 +10,37 @@ from opendbc.car.can_definitions import CanRecvCallable, CanSendCallable
 from opendbc.car.carlog import carlog
 from opendbc.car.structs import CarParams
 from opendbc.car.ecu_addrs import get_ecu_addrs
+from opendbc.car.fingerprint_db import load_db
 from opendbc.car.fingerprints import FW_VERSIONS
-from opendbc.car.fw_query_definitions import ESSENTIAL_ECUS, AddrType, EcuAddrBusType, FwQueryConfig, LiveFwVersions, OfflineFwVersions
+from opendbc.car.fw_query_definitions import ESSENTIAL_ECUS, AddrType, EcuAddrBusType, FwQueryConfig, LiveFwVersions, OfflineFwVersions, Request
 from opendbc.car.interfaces import get_interface_attr
 from opendbc.car.isotp_parallel_query import IsoTpParallelQuery
 
 Ecu = CarParams.Ecu
 FUZZY_EXCLUDE_ECUS = [Ecu.fwdCamera, Ecu.fwdRadar, Ecu.eps, Ecu.debug]
 
-FW_QUERY_CONFIGS: dict[str, FwQueryConfig] = get_interface_attr('FW_QUERY_CONFIG', ignore_none=True)
-VERSIONS = get_interface_attr('FW_VERSIONS', ignore_none=True)
+VERSIONS = load_db()['FW_VERSIONS']
 
 MODEL_TO_BRAND = {c: b for b, e in VERSIONS.items() for c in e}
-REQUESTS = [(brand, config, r) for brand, config in FW_QUERY_CONFIGS.items() for r in config.requests]
+
+
+# the query configs are only needed once fingerprinting runs, not to import this module
+@cache
+def get_fw_query_configs() -> dict[str, FwQueryConfig]:
+  return get_interface_attr('FW_QUERY_CONFIG', ignore_none=True)
+
+
+@cache
+def get_fw_requests() -> list[tuple[str, FwQueryConfig, Request]]:
+  return [(brand, config, r) for brand, config in get_fw_query_configs().items() for r in config.requests]
+
+
+def __getattr__(name: str):
+  if name == 'FW_QUERY_CONFIGS':
+    return get_fw_query_configs()
+  if name == 'REQUESTS':
+    return get_fw_requests()
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 T = TypeVar('T')
 ObdCallback = Callable[[bool], None]
@@ -115,7 +134,7 @@ def match_fw_to_car_exact(live_fw_versions: LiveFwVersions, match_brand: str | N
                 is_brand(MODEL_TO_BRAND[c], match_brand)}
 
   for candidate, fws in candidates.items():
-    config = FW_QUERY_CONFIGS[MODEL_TO_BRAND[candidate]]
+    config = get_fw_query_configs()[MODEL_TO_BRAND[candidate]]
     for ecu, expected_versions in fws.items():
       expected_versions = expected_versions + extra_fw_versions.get(candidate, {}).get(ecu, [])
       ecu_type = ecu[0]
@@ -160,7 +179,7 @@ def match_fw_to_car(fw_versions: list[CarParams.CarFw], vin: str, allow_exact: b
       matches |= match_func(fw_versions_dict, match_brand=brand, log=log)
 
       # If specified and no matches so far, fall back to brand's fuzzy fingerprinting function
-      config = FW_QUERY_CONFIGS[brand]
+      config = get_fw_query_configs()[brand]
       if not exact_match and not len(matches) and config.match_fw_to_car_fuzzy is not None:
         matches |= config.match_fw_to_car_fuzzy(fw_versions_dict, vin, VERSIONS[brand])
 
@@ -176,7 +195,7 @@ def get_present_ecus(can_recv: CanRecvCallable, can_send: CanSendCallable, set_o
   parallel_queries: dict[bool, list[EcuAddrBusType]] = {True: [], False: []}
   responses: set[EcuAddrBusType] = set()
 
-  for brand, config, r in REQUESTS:
+  for brand, config, r in get_fw_requests():
     for ecu_type, addr, sub_addr in config.get_all_ecus(VERSIONS[brand]):
       # Only query ecus in whitelist if whitelist is not empty
       if len(r.whitelist_ecus) == 0 or ecu_type in r.whitelist_ecus:
@@ -207,11 +226,11 @@ def get_present_ecus(can_recv: CanRecvCallable, can_send: CanSendCallable, set_o
 def get_brand_ecu_matches(ecu_rx_addrs: set[EcuAddrBusType]) -> dict[str, list[bool]]:
   """Returns dictionary of brands and matches with ECUs in their FW versions"""
 
-  brand_rx_addrs = {brand: set() for brand in FW_QUERY_CONFIGS}
-  brand_matches = {brand: [] for brand, _, _ in REQUESTS}
+  brand_rx_addrs = {brand: set() for brand in get_fw_query_configs()}
+  brand_matches = {brand: [] for brand, _, _ in get_fw_requests()}
 
   # Since we can't know what request an ecu responded to, add matches for all possible rx offsets
-  for brand, config, r in REQUESTS:
+  for brand, config, r in get_fw_requests():
     for ecu in config.get_all_ecus(VERSIONS[brand]):
       if len(r.whitelist_ecus) == 0 or ecu[0] in r.whitelist_ecus:
         brand_rx_addrs[brand].add((uds.get_rx_addr_for_tx_addr(ecu[1], r.rx_offset), ecu[2]))
@@ -266,7 +285,7 @@ def get_fw_versions(can_recv: CanRecvCallable, can_send: CanSendCallable, set_ob
   ecu_types = {}
 
   for brand, brand_versions in versions.items():
-    config = FW_QUERY_CONFIGS[brand]
+    config = get_fw_query_configs()[brand]
     for ecu_type, addr, sub_addr in config.get_all_ecus(brand_versions):
       a = (brand, addr, sub_addr)
       if a not in ecu_types:
@@ -283,7 +302,7 @@ def get_fw_versions(can_recv: CanRecvCallable, can_send: CanSendCallable, set_ob
 
   # Get versions and build capnp list to put into CarParams
   car_fw = []
-  requests = [(brand, config, r) for brand, config, r in REQUESTS if is_brand(brand, query_brand)]
+  requests = [(brand, config, r) for brand, config, r in get_fw_requests() if is_brand(brand, query_brand)]
   for addr_group in tqdm(addrs, disable=not progress):  # split by subaddr, if any
     for addr_chunk in chunks(addr_group):
       for brand, config, r in requests:
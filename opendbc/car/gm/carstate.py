@@ -1,6 +1,6 @@
 import copy
 from opendbc.can import CANDefine, CANParser
-from opendbc.car import Bus, create_button_events, structs
+from opendbc.car import Bus, create_button_events, mirrors, structs
 from opendbc.car.common.conversions import Conversions as CV
 from opendbc.car.interfaces import CarStateBase
 from opendbc.car.gm.values import DBC, AccState, CruiseButtons, STEER_THRESHOLD, SDGM_CAR, ALT_ACCS
@@ -31,7 +31,7 @@ class CarState(CarStateBase):
 
     self.distance_button = 0
 
-  def update_button_enable(self, buttonEvents: list[structs.CarState.ButtonEvent]):
+  def update_button_enable(self, buttonEvents: list[mirrors.CarState.ButtonEvent]):
     if not self.CP.pcmCruise:
       for b in buttonEvents:
         # The ECM allows enabling on falling edge of set, but only rising edge of resume
@@ -40,12 +40,12 @@ class CarState(CarStateBase):
           return True
     return False
 
-  def update(self, can_parsers) -> structs.CarState:
+  def update(self, can_parsers) -> mirrors.CarState:
     pt_cp = can_parsers[Bus.pt]
     cam_cp = can_parsers[Bus.cam]
     loopback_cp = can_parsers[Bus.loopback]
 
-    ret = structs.CarState()
+    ret = mirrors.CarState()
 
     prev_cruise_buttons = self.cruise_buttons
     prev_distance_button = self.distance_button
@@ -5,6 +5,7 @@ from opendbc.car import Bus, structs
 from opendbc.car.common.conversions import Conversions as CV
 from opendbc.car.gm.values import DBC, CanBus
 from opendbc.car.interfaces import RadarInterfaceBase
+from opendbc.car.radar_tracks import set_points
 
 RADAR_HEADER_MSG = 1120  # F_LRR_Obj_Header
 CAMERA_DATA_HEADER_MSG = 1056  # F_Vision_Obj_Header
@@ -80,8 +81,7 @@ class RadarInterface(RadarInterfaceBase):
         targetId = cpt['TrkObjectID']
         currentTargets.add(targetId)
         if targetId not in self.pts:
-          self.pts[targetId] = structs.RadarData.RadarPoint()
-          self.pts[targetId].trackId = targetId
+          self._new_point(targetId, targetId)
         distance = cpt['TrkRange']
         self.pts[targetId].dRel = distance  # from front of car
         # From driver's pov, left is positive
@@ -90,8 +90,8 @@ class RadarInterface(RadarInterfaceBase):
 
     for oldTarget in list(self.pts.keys()):
       if oldTarget not in currentTargets:
-        del self.pts[oldTarget]
+        self._drop_point(oldTarget)
 
-    ret.points = list(self.pts.values())
+    set_points(ret, self.pts.values())
     self.updated_messages.clear()
     return ret
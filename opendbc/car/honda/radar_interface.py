@@ -2,6 +2,7 @@
 from opendbc.can import CANParser
 from opendbc.car import Bus, structs
 from opendbc.car.interfaces import RadarInterfaceBase
+from opendbc.car.radar_tracks import set_points
 from opendbc.car.honda.values import DBC
 
 
@@ -53,15 +54,13 @@ class RadarInterface(RadarInterfaceBase):
         self.radar_wrong_config = cpt['RADAR_STATE'] == 0x69
       elif cpt['LONG_DIST'] < 255:
         if ii not in self.pts or cpt['NEW_TRACK']:
-          self.pts[ii] = structs.RadarData.RadarPoint()
-          self.pts[ii].trackId = self.track_id
+          self._new_point(ii, self.track_id)
           self.track_id += 1
         self.pts[ii].dRel = cpt['LONG_DIST']  # from front of car
         self.pts[ii].yRel = -cpt['LAT_DIST']  # in car frame's y axis, left is positive
         self.pts[ii].vRel = cpt['REL_SPEED']
       else:
-        if ii in self.pts:
-          del self.pts[ii]
+        self._drop_point(ii)
 
     if not self.rcp.can_valid:
       ret.errors.canError = True
@@ -70,6 +69,6 @@ class RadarInterface(RadarInterfaceBase):
     if self.radar_wrong_config:
       ret.errors.wrongConfig = True
 
-    ret.points = list(self.pts.values())
+    set_points(ret, self.pts.values())
 
     return ret
@@ -1,8 +1,9 @@
-import math
+import numpy as np
 
 from opendbc.can import CANParser
 from opendbc.car import Bus, structs
 from opendbc.car.interfaces import RadarInterfaceBase
+from opendbc.car.radar_tracks import RadarTrackTable, set_points
 from opendbc.car.hyundai.values import DBC
 
 RADAR_START_ADDR = 0x500
@@ -28,6 +29,10 @@ class RadarInterface(RadarInterfaceBase):
     self.radar_off_can = CP.radarUnavailable
     self.rcp = get_radar_can_parser(CP)
 
+    self.addrs = list(range(RADAR_START_ADDR, RADAR_START_ADDR + RADAR_MSG_COUNT))
+    if self.rcp is not None:
+      self.tracks = RadarTrackTable(self.rcp, [f"RADAR_TRACK_{addr:x}" for addr in self.addrs], ('STATE', 'AZIMUTH', 'LONG_DIST', 'REL_SPEED'))
+
   def update(self, can_strings):
     if self.radar_off_can or (self.rcp is None):
       return super().update(None)
@@ -51,23 +56,14 @@ class RadarInterface(RadarInterfaceBase):
     if not self.rcp.can_valid:
       ret.errors.canError = True
 
-    for addr in range(RADAR_START_ADDR, RADAR_START_ADDR + RADAR_MSG_COUNT):
-      msg = self.rcp.vl[f"RADAR_TRACK_{addr:x}"]
-
-      if addr not in self.pts:
-        self.pts[addr] = structs.RadarData.RadarPoint()
-        self.pts[addr].trackId = self.track_id
-        self.track_id += 1
-
-      valid = msg['STATE'] in (3, 4)
-      if valid:
-        azimuth = math.radians(msg['AZIMUTH'])
-        self.pts[addr].dRel = math.cos(azimuth) * msg['LONG_DIST']
-        self.pts[addr].yRel = 0.5 * -math.sin(azimuth) * msg['LONG_DIST']
-        self.pts[addr].vRel = msg['REL_SPEED']
+    t = self.tracks.read()
+    valid = (t['STATE'] == 3) | (t['STATE'] == 4)
+    azimuth = np.radians(t['AZIMUTH'])
+    d_rel = np.cos(azimuth) * t['LONG_DIST']
+    y_rel = 0.5 * -np.sin(azimuth) * t['LONG_DIST']
 
-      else:
-        del self.pts[addr]
+    # a track id is allocated for every new address, even ones dropped as invalid
+    self._update_points(self.addrs, np.ones(len(self.addrs), dtype=bool), valid, None, d_rel, y_rel, t['REL_SPEED'], drop_consumes_id=True)
 
-    ret.points = list(self.pts.values())
+    set_points(ret, self.pts.values())
     return ret
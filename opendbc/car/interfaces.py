@@ -1,7 +1,6 @@
 import os
 import numpy as np
 import time
-import tomllib
 from abc import abstractmethod, ABC
 from enum import StrEnum
 from typing import Any
@@ -9,11 +8,16 @@ from collections.abc import Callable
 from functools import cache
 
 from opendbc.car import DT_CTRL, apply_hysteresis, gen_empty_fingerprint, scale_rot_inertia, scale_tire_stiffness, STD_CARGO_KG
-from opendbc.car import structs
+from opendbc.car import mirrors, structs
 from opendbc.car.can_definitions import CanData, CanRecvCallable, CanSendCallable
 from opendbc.car.common.basedir import BASEDIR
 from opendbc.car.common.conversions import Conversions as CV
+from opendbc.car.common.fastmath import clip
 from opendbc.car.common.simple_kalman import KF1D, get_kalman_gain
+from opendbc.car.overrides import OVERRIDES, VEHICLE_MASS
+from opendbc.car.profiler import PROFILER
+from opendbc.car.radar_tracks import RadarPoint, RadarPointPool
+from opendbc.car.torque_db import TORQUE_OVERRIDE_PATH, TORQUE_PARAMS_PATH, TORQUE_SUBSTITUTE_PATH, load_db as load_torque_db  # noqa: F401
 from opendbc.car.values import PLATFORMS
 from opendbc.can import CANParser
 
@@ -25,10 +29,6 @@ MAX_CTRL_SPEED = (V_CRUISE_MAX + 4) * CV.KPH_TO_MS
 ACCEL_MAX = 2.0
 ACCEL_MIN = -3.5
 
-TORQUE_PARAMS_PATH = os.path.join(BASEDIR, 'torque_data/params.toml')
-TORQUE_OVERRIDE_PATH = os.path.join(BASEDIR, 'torque_data/override.toml')
-TORQUE_SUBSTITUTE_PATH = os.path.join(BASEDIR, 'torque_data/substitute.toml')
-
 GEAR_SHIFTER_MAP: dict[str, structs.CarState.GearShifter] = {
   'P': GearShifter.park, 'PARK': GearShifter.park,
   'R': GearShifter.reverse, 'REVERSE': GearShifter.reverse,
@@ -46,33 +46,31 @@ LateralAccelFromTorqueCallbackType = Callable[[float, structs.CarParams.LateralT
 
 
 @cache
-def get_torque_params():
-  with open(TORQUE_SUBSTITUTE_PATH, 'rb') as f:
-    sub = tomllib.load(f)
-  with open(TORQUE_PARAMS_PATH, 'rb') as f:
-    params = tomllib.load(f)
-  with open(TORQUE_OVERRIDE_PATH, 'rb') as f:
-    override = tomllib.load(f)
-
-  torque_params = {}
-  for candidate in (sub.keys() | params.keys() | override.keys()) - {'legend'}:
-    if sum([candidate in x for x in [sub, params, override]]) > 1:
-      raise RuntimeError(f'{candidate} is defined twice in torque config')
-
-    sub_candidate = sub.get(candidate, candidate)
-
-    if sub_candidate in override:
-      out = override[sub_candidate]
-    elif sub_candidate in params:
-      out = params[sub_candidate]
-    else:
-      raise NotImplementedError(f"Did not find torque params for {sub_candidate}")
+def get_torque_params() -> dict[str, dict[str, float]]:
+  """{platform: {legend name: value}}, for callers that index by name. load_torque_db() has the typed records."""
+  return {platform: params._asdict() for platform, params in load_torque_db().items()}
+
+# CarParams built by CarInterfaceBase.get_template_params, keyed on interface, platform, flags and the mass override
+_PARAMS_TEMPLATES: dict[tuple, structs.CarParams] = {}
+
+# vEgo Kalman filter, reset to the raw speed on jumps larger than SPEED_KF_RESET
+SPEED_KF_Q = [[0.0, 0.0], [0.0, 100.0]]
+SPEED_KF_R = 0.3
+SPEED_KF_A = [[1.0, DT_CTRL], [0.0, 1.0]]
+SPEED_KF_C = [[1.0, 0.0]]
+SPEED_KF_RESET = 2.0  # m/s
+
+
+@cache
+def get_speed_kf_gain() -> tuple[tuple[float, ...], ...]:
+  # only depends on constants, so it's solved once rather than for every CarState
+  K = get_kalman_gain(DT_CTRL, np.array(SPEED_KF_A), np.array(SPEED_KF_C), np.array(SPEED_KF_Q), SPEED_KF_R)
+  return tuple(tuple(float(v) for v in row) for row in K)
 
-    torque_params[sub_candidate] = {key: out[i] for i, key in enumerate(params['legend'])}
-    if candidate in sub:
-      torque_params[candidate] = torque_params[sub_candidate]
 
-  return torque_params
+def get_speed_kf() -> KF1D:
+  """A vEgo filter starting from standstill, use KF1D.filter(v_ego_raw, SPEED_KF_RESET) to smooth a whole log"""
+  return KF1D(x0=[[0.0], [0.0]], A=SPEED_KF_A, C=SPEED_KF_C[0], K=get_speed_kf_gain())
 
 # generic car and radar interfaces
 
@@ -81,9 +79,10 @@ class RadarInterfaceBase(ABC):
   def __init__(self, CP: structs.CarParams):
     self.CP = CP
     self.rcp = None
-    self.pts: dict[int, structs.RadarData.RadarPoint] = {}
+    self.pts: dict[int, RadarPoint] = {}
     self.track_id: int = 0
     self.frame = 0
+    self.point_pool = RadarPointPool()
 
   def update(self, can_packets: list[tuple[int, list[CanData]]]) -> structs.RadarDataT | None:
     self.frame += 1
@@ -91,6 +90,48 @@ class RadarInterfaceBase(ABC):
       return structs.RadarData()
     return None
 
+  def _new_point(self, key: int, track_id: int) -> RadarPoint:
+    """Starts a new track at key, reusing the point it replaces or a dropped one"""
+    pt = self.pts.get(key)
+    if pt is None:
+      pt = self.pts[key] = self.point_pool.get(track_id)
+    else:
+      pt.trackId = track_id
+      pt.dRel = pt.yRel = pt.vRel = 0.
+    return pt
+
+  def _drop_point(self, key: int) -> None:
+    pt = self.pts.pop(key, None)
+    if pt is not None:
+      self.point_pool.put(pt)
+
+  def _update_points(self, keys: list[int], mask: np.ndarray, valid: np.ndarray, new_track: np.ndarray | None,
+                     d_rel: np.ndarray, y_rel: np.ndarray, v_rel: np.ndarray, drop_consumes_id: bool = False) -> None:
+    """Applies one cycle of decoded tracks to self.pts. Rows outside mask are left untouched, invalid rows are dropped
+    and new_track rows restart with a new track id.
+
+    drop_consumes_id: allocate a track id for every row not already tracked, even if it's then dropped as invalid
+    """
+    if new_track is None:
+      new_track = np.zeros(len(keys), dtype=bool)
+    rows = np.flatnonzero(mask).tolist()
+    valid_l, new_l = valid.tolist(), new_track.tolist()
+    d_l, y_l, v_l = d_rel.tolist(), y_rel.tolist(), v_rel.tolist()
+
+    for i in rows:
+      key = keys[i]
+      if not valid_l[i]:
+        if drop_consumes_id and key not in self.pts:
+          self.track_id += 1
+        self._drop_point(key)
+        continue
+
+      pt = self.pts.get(key)
+      if pt is None or new_l[i]:
+        pt = self._new_point(key, self.track_id)
+        self.track_id += 1
+      pt.dRel, pt.yRel, pt.vRel = d_l[i], y_l[i], v_l[i]
+
 
 class CarInterfaceBase(ABC):
   CarState: type['CarStateBase']
@@ -101,6 +142,8 @@ class CarInterfaceBase(ABC):
 
   def __init__(self, CP: structs.CarParams):
     self.CP = CP
+    # loads the runtime overrides the car code reads and keeps them up to date
+    OVERRIDES.start()
 
     self.frame = 0
     self.v_ego_cluster_seen = False
@@ -114,7 +157,10 @@ class CarInterfaceBase(ABC):
   def apply(self, c: structs.CarControl, now_nanos: int | None = None) -> tuple[structs.CarControl.Actuators, list[CanData]]:
     if now_nanos is None:
       now_nanos = int(time.monotonic() * 1e9)
-    return self.CC.update(c, self.CS, now_nanos)
+    lap = PROFILER.lap("CarInterface.apply")
+    ret = self.CC.update(c, self.CS, now_nanos)
+    lap.done()
+    return ret
 
   @staticmethod
   def get_pid_accel_limits(CP, current_speed, cruise_speed):
@@ -125,7 +171,26 @@ class CarInterfaceBase(ABC):
     """
     Parameters essential to controlling the car may be incomplete or wrong without FW versions or fingerprints.
     """
-    return cls.get_params(candidate, gen_empty_fingerprint(), list(), False, False, False)
+    return cls.get_template_params(candidate)
+
+  @classmethod
+  def get_template_params(cls, candidate: str, alpha_long: bool = False, is_release: bool = False, docs: bool = False) -> structs.CarParams:
+    """
+    get_params without fingerprints or FW versions, as tests and docs use it. Docs get a placeholder FW version.
+    Built once per platform and flags and copied on each call, so callers are free to modify the result.
+    """
+    VEHICLE_MASS.poll()
+    key = (cls, str(candidate), alpha_long, is_release, docs, VEHICLE_MASS.value, cls._template_params_key())
+    template = _PARAMS_TEMPLATES.get(key)
+    if template is None:
+      car_fw = [structs.CarParams.CarFw(ecu=structs.CarParams.Ecu.unknown)] if docs else []
+      template = _PARAMS_TEMPLATES[key] = cls.get_params(candidate, gen_empty_fingerprint(), car_fw, alpha_long, is_release, docs)
+    return template.copy()
+
+  @classmethod
+  def _template_params_key(cls) -> tuple:
+    """Any other runtime inputs _get_params reads, such as toggles, so cached templates follow them"""
+    return ()
 
   @classmethod
   def get_params(cls, candidate: str, fingerprint: dict[int, dict[int, int]], car_fw: list[structs.CarParams.CarFw],
@@ -144,13 +209,9 @@ class CarInterfaceBase(ABC):
 
     ret = cls._get_params(ret, candidate, fingerprint, car_fw, alpha_long, is_release, docs)
 
-    try:
-      with open('/data/vehicle_mass.txt','r') as fp:
-        vehicle_mass_str = fp.read() #車重を変更する
-        if vehicle_mass_str and float(vehicle_mass_str) > 0:
-          ret.mass = float(vehicle_mass_str)
-    except Exception as e:
-      pass
+    VEHICLE_MASS.poll()
+    if VEHICLE_MASS.value is not None:
+      ret.mass = VEHICLE_MASS.value #車重を変更する
 
     # Vehicle mass is published curb weight plus assumed payload such as a human driver; notCars have no assumed payload
     if not ret.notCar:
@@ -204,7 +265,7 @@ class CarInterfaceBase(ABC):
     ret.carFingerprint = candidate
 
     # Car docs fields
-    ret.maxLateralAccel = get_torque_params()[candidate]['MAX_LAT_ACCEL_MEASURED']
+    ret.maxLateralAccel = load_torque_db()[candidate].MAX_LAT_ACCEL_MEASURED
     ret.autoResumeSng = True  # describes whether car can resume from a stop automatically
 
     # standard ALC params
@@ -227,25 +288,30 @@ class CarInterfaceBase(ABC):
 
   @staticmethod
   def configure_torque_tune(candidate: str, tune: structs.CarParams.LateralTuning, steering_angle_deadzone_deg: float = 0.0):
-    params = get_torque_params()[candidate]
+    params = load_torque_db()[candidate]
 
     tune.init('torque')
-    tune.torque.friction = params['FRICTION']
-    tune.torque.latAccelFactor = params['LAT_ACCEL_FACTOR']
+    tune.torque.friction = params.FRICTION
+    tune.torque.latAccelFactor = params.LAT_ACCEL_FACTOR
     tune.torque.latAccelOffset = 0.0
     tune.torque.steeringAngleDeadzoneDeg = steering_angle_deadzone_deg
 
   def update(self, can_packets: list[tuple[int, list[CanData]]]) -> structs.CarState:
+    lap = PROFILER.lap("CarInterface.update")
+
     # parse can
     for cp in self.can_parsers.values():
       if cp is not None:
         cp.update(can_packets)
+    lap.mark("can_parse")
 
     # get CarState
     ret = self.CS.update(self.can_parsers)
+    lap.mark("CarState.update")
 
     ret.canValid = all(cp.can_valid for cp in self.can_parsers.values())
     ret.canTimeout = any(cp.bus_timeout for cp in self.can_parsers.values())
+    lap.mark("can_valid")
 
     if ret.vEgoCluster == 0.0 and not self.v_ego_cluster_seen:
       ret.vEgoCluster = ret.vEgo
@@ -262,17 +328,21 @@ class CarInterfaceBase(ABC):
 
     ret.buttonEnable = self.CS.update_button_enable(ret.buttonEvents)
 
-    # save for next iteration
+    # save for next iteration, CarState and CarController read the mirror. rounded so they see the published values
+    mirrors.round_float32(ret)
     self.CS.out = ret
 
-    return ret
+    msg = mirrors.to_capnp(ret)
+    lap.mark("to_capnp")
+    lap.done()
+    return msg
 
 
 class CarStateBase(ABC):
   def __init__(self, CP: structs.CarParams):
     self.CP = CP
     self.car_fingerprint = CP.carFingerprint
-    self.out = structs.CarState()
+    self.out = mirrors.CarState()
 
     self.cruise_buttons = 0
     self.left_blinker_cnt = 0
@@ -285,19 +355,13 @@ class CarStateBase(ABC):
     self.cluster_min_speed = 0.0  # min speed before dropping to 0
     self.secoc_key: bytes = b"00" * 16
 
-    Q = [[0.0, 0.0], [0.0, 100.0]]
-    R = 0.3
-    A = [[1.0, DT_CTRL], [0.0, 1.0]]
-    C = [[1.0, 0.0]]
-    x0=[[0.0], [0.0]]
-    K = get_kalman_gain(DT_CTRL, np.array(A), np.array(C), np.array(Q), R)
-    self.v_ego_kf = KF1D(x0=x0, A=A, C=C[0], K=K)
+    self.v_ego_kf = get_speed_kf()
 
     self.knight_scanner_bit3 = 7 # carstate.updateで knight_scanner_bit3.txt が反映される,デフォは7
     self.steeringAngleDegOrg = 0 #回転先予想する前のオリジナル値
 
   @abstractmethod
-  def update(self, can_parsers) -> structs.CarState:
+  def update(self, can_parsers) -> mirrors.CarState:
     pass
 
   def parse_wheel_speeds(self, cs, fl, fr, rl, rr, unit=CV.KPH_TO_MS):
@@ -305,7 +369,7 @@ class CarStateBase(ABC):
     cs.vEgo, cs.aEgo = self.update_speed_kf(cs.vEgoRaw)
 
   def update_speed_kf(self, v_ego_raw):
-    if abs(v_ego_raw - self.v_ego_kf.x[0][0]) > 2.0:  # Prevent large accelerations when car starts at non zero speed
+    if abs(v_ego_raw - self.v_ego_kf.x[0][0]) > SPEED_KF_RESET:  # Prevent large accelerations when car starts at non zero speed
       self.v_ego_kf.set_x([[v_ego_raw], [0.0]])
 
     v_ego_x = self.v_ego_kf.update(v_ego_raw)
@@ -322,7 +386,7 @@ class CarStateBase(ABC):
   def update_steering_pressed(self, steering_pressed, steering_pressed_min_count):
     """Applies filtering on steering pressed for noisy driver torque signals."""
     self.steering_pressed_cnt += 1 if steering_pressed else -1
-    self.steering_pressed_cnt = int(np.clip(self.steering_pressed_cnt, 0, steering_pressed_min_count * 2 + 1))
+    self.steering_pressed_cnt = int(clip(self.steering_pressed_cnt, 0, steering_pressed_min_count * 2 + 1))
     return self.steering_pressed_cnt > steering_pressed_min_count
 
   def update_blinker_from_stalk(self, blinker_time: int, left_blinker_stalk: bool, right_blinker_stalk: bool):
@@ -348,7 +412,7 @@ class CarStateBase(ABC):
 
     return bool(left_blinker_stalk or self.left_blinker_cnt > 0), bool(right_blinker_stalk or self.right_blinker_cnt > 0)
 
-  def update_button_enable(self, buttonEvents: list[structs.CarState.ButtonEvent]):
+  def update_button_enable(self, buttonEvents: list[mirrors.CarState.ButtonEvent]):
     if not self.CP.pcmCruise:
       for b in buttonEvents:
         # Enable OP long on falling edge of enable buttons
@@ -1,7 +1,7 @@
 import math
-import numpy as np
 from dataclasses import dataclass
 from opendbc.car import structs, rate_limit, DT_CTRL, ACCELERATION_DUE_TO_GRAVITY
+from opendbc.car.common.fastmath import clip, interp
 from opendbc.car.vehicle_model import VehicleModel
 
 FRICTION_THRESHOLD = 0.2
@@ -53,18 +53,18 @@ class CurvatureSteeringLimits:
 
     # *** max lateral accel limit ***
     max_curvature = self.MAX_LATERAL_ACCEL / (v_ego ** 2)
-    new_apply_curvature = float(np.clip(apply_curvature, -max_curvature, max_curvature))
+    new_apply_curvature = float(clip(apply_curvature, -max_curvature, max_curvature))
 
     # *** max lateral jerk limit ***
     max_jerk = (self.MAX_LATERAL_JERK / (v_ego ** 2)) * (steer_step * DT_CTRL)
-    new_apply_curvature = float(np.clip(new_apply_curvature, apply_curvature_last - max_jerk, apply_curvature_last + max_jerk))
+    new_apply_curvature = float(clip(new_apply_curvature, apply_curvature_last - max_jerk, apply_curvature_last + max_jerk))
 
     # curvature is current curvature when inactive
     if not lat_active:
       new_apply_curvature = curvature
 
     # prevent fault
-    return float(np.clip(new_apply_curvature, -self.CURVATURE_MAX, self.CURVATURE_MAX))
+    return float(clip(new_apply_curvature, -self.CURVATURE_MAX, self.CURVATURE_MAX))
 
 
 def apply_driver_steer_torque_limits(apply_torque: int, apply_torque_last: int, driver_torque: float, LIMITS, steer_max: int | None = None):
@@ -77,14 +77,14 @@ def apply_driver_steer_torque_limits(apply_torque: int, apply_torque_last: int,
   driver_min_torque = -steer_max + (-LIMITS.STEER_DRIVER_ALLOWANCE + driver_torque * LIMITS.STEER_DRIVER_FACTOR) * LIMITS.STEER_DRIVER_MULTIPLIER
   max_steer_allowed = max(min(steer_max, driver_max_torque), 0)
   min_steer_allowed = min(max(-steer_max, driver_min_torque), 0)
-  apply_torque = np.clip(apply_torque, min_steer_allowed, max_steer_allowed)
+  apply_torque = clip(apply_torque, min_steer_allowed, max_steer_allowed)
 
   # slow rate if steer torque increases in magnitude
   if apply_torque_last > 0:
-    apply_torque = np.clip(apply_torque, max(apply_torque_last - LIMITS.STEER_DELTA_DOWN, -LIMITS.STEER_DELTA_UP),
+    apply_torque = clip(apply_torque, max(apply_torque_last - LIMITS.STEER_DELTA_DOWN, -LIMITS.STEER_DELTA_UP),
                            apply_torque_last + LIMITS.STEER_DELTA_UP)
   else:
-    apply_torque = np.clip(apply_torque, apply_torque_last - LIMITS.STEER_DELTA_UP,
+    apply_torque = clip(apply_torque, apply_torque_last - LIMITS.STEER_DELTA_UP,
                            min(apply_torque_last + LIMITS.STEER_DELTA_DOWN, LIMITS.STEER_DELTA_UP))
 
   return int(round(float(apply_torque)))
@@ -97,15 +97,15 @@ def apply_dist_to_meas_limits(val, val_last, val_meas,
   max_lim = min(max(val_meas + STEER_ERROR_MAX, STEER_ERROR_MAX), STEER_MAX)
   min_lim = max(min(val_meas - STEER_ERROR_MAX, -STEER_ERROR_MAX), -STEER_MAX)
 
-  val = np.clip(val, min_lim, max_lim)
+  val = clip(val, min_lim, max_lim)
 
   # slow rate if val increases in magnitude
   if val_last > 0:
-    val = np.clip(val,
+    val = clip(val,
                   max(val_last - STEER_DELTA_DOWN, -STEER_DELTA_UP),
                   val_last + STEER_DELTA_UP)
   else:
-    val = np.clip(val,
+    val = clip(val,
                   val_last - STEER_DELTA_UP,
                   min(val_last + STEER_DELTA_DOWN, STEER_DELTA_UP))
 
@@ -124,14 +124,14 @@ def apply_std_steer_angle_limits(apply_angle: float, apply_angle_last: float, v_
   steer_up = apply_angle_last * apply_angle >= 0. and abs(apply_angle) > abs(apply_angle_last)
   rate_limits = limits.ANGLE_RATE_LIMIT_UP if steer_up else limits.ANGLE_RATE_LIMIT_DOWN
 
-  angle_rate_lim = np.interp(v_ego, rate_limits[0], rate_limits[1])
-  new_apply_angle = np.clip(apply_angle, apply_angle_last - angle_rate_lim, apply_angle_last + angle_rate_lim)
+  angle_rate_lim = interp(v_ego, rate_limits[0], rate_limits[1])
+  new_apply_angle = clip(apply_angle, apply_angle_last - angle_rate_lim, apply_angle_last + angle_rate_lim)
 
   # angle is current steering wheel angle when inactive on all angle cars
   if not lat_active:
     new_apply_angle = steering_angle
 
-  return float(np.clip(new_apply_angle, -limits.STEER_ANGLE_MAX, limits.STEER_ANGLE_MAX))
+  return float(clip(new_apply_angle, -limits.STEER_ANGLE_MAX, limits.STEER_ANGLE_MAX))
 
 
 def get_max_angle_delta_vm(v_ego_raw: float, VM: VehicleModel, limits):
@@ -161,14 +161,14 @@ def apply_steer_angle_limits_vm(apply_angle: float, apply_angle_last: float, v_e
 
   # *** max lateral accel limit ***
   max_angle = get_max_angle_vm(v_ego_raw, VM, limits)
-  new_apply_angle = np.clip(new_apply_angle, -max_angle, max_angle)
+  new_apply_angle = clip(new_apply_angle, -max_angle, max_angle)
 
   # angle is current angle when inactive
   if not lat_active:
     new_apply_angle = steering_angle
 
   # prevent fault
-  return float(np.clip(new_apply_angle, -limits.ANGLE_LIMITS.STEER_ANGLE_MAX, limits.ANGLE_LIMITS.STEER_ANGLE_MAX))
+  return float(clip(new_apply_angle, -limits.ANGLE_LIMITS.STEER_ANGLE_MAX, limits.ANGLE_LIMITS.STEER_ANGLE_MAX))
 
 
 def common_fault_avoidance(fault_condition: bool, request: bool, above_limit_frames: int,
@@ -204,7 +204,7 @@ def apply_center_deadzone(error, deadzone):
 def get_friction(lateral_accel_error: float, lateral_accel_deadzone: float, friction_threshold: float,
                  torque_params: structs.CarParams.LateralTorqueTuning) -> float:
   # TODO torque params' friction should be in lat accel space, not torque space
-  friction_interp = np.interp(
+  friction_interp = interp(
     apply_center_deadzone(lateral_accel_error, lateral_accel_deadzone),
     [-friction_threshold, friction_threshold],
     [-torque_params.friction * torque_params.latAccelFactor, torque_params.friction * torque_params.latAccelFactor]
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+import argparse
+import importlib
+import json
+from dataclasses import dataclass
+
+import numpy as np
+
+from opendbc.car import DT_CTRL
+from opendbc.car.car_helpers import interfaces
+from opendbc.car.lateral import ISO_LATERAL_ACCEL, ISO_LATERAL_JERK, MAX_LATERAL_ACCEL, AngleSteeringLimits, AngleSteeringLimitsVM
+from opendbc.car.torque_db import load_db as load_torque_db
+from opendbc.car.values import PLATFORMS
+from opendbc.car.vehicle_model import VehicleModel
+
+# jerk is measured over half a second
+JERK_MEAS_T = 0.5
+
+SPEEDS = np.linspace(1., 40., 40)  # m/s, the limit helpers clamp below 1 m/s
+
+
+@dataclass
+class LateralEnvelope:
+  """The lateral accel and jerk each platform's limits allow, as platforms x speeds arrays"""
+  platforms: list[str]
+  control_types: list[str]
+  speeds: np.ndarray
+  max_lat_accel: np.ndarray  # m/s^2
+  max_jerk_up: np.ndarray  # m/s^3, winding up from straight over JERK_MEAS_T
+  max_jerk_down: np.ndarray  # m/s^3, unwinding from max accel over JERK_MEAS_T
+
+  def index(self, platform: str) -> int:
+    return self.platforms.index(platform)
+
+  def to_dict(self) -> dict:
+    return {"speeds": self.speeds.tolist()} | {platform: {
+      "control_type": self.control_types[i],
+      "max_lat_accel": self.max_lat_accel[i].tolist(),
+      "max_jerk_up": self.max_jerk_up[i].tolist(),
+      "max_jerk_down": self.max_jerk_down[i].tolist(),
+    } for i, platform in enumerate(self.platforms)}
+
+  def report(self) -> str:
+    """One line per platform with the peaks over the speed sweep, flagging any above ISO 11270"""
+    lines = [f"{'platform':<40} {'type':<9} {'accel':>6} {'@m/s':>5} {'jerk up':>8} {'@m/s':>5} {'jerk dn':>8} {'@m/s':>5}"]
+    for i, platform in enumerate(self.platforms):
+      # angle and curvature limits allow for an average road bank, torque cars are measured on the road
+      accel_limit = ISO_LATERAL_ACCEL if self.control_types[i] == "torque" else MAX_LATERAL_ACCEL
+      cols = []
+      for values, limit in ((self.max_lat_accel[i], accel_limit), (self.max_jerk_up[i], ISO_LATERAL_JERK), (self.max_jerk_down[i], ISO_LATERAL_JERK)):
+        peak = int(np.argmax(values))
+        flag = "*" if values[peak] > limit + 1e-6 else " "
+        cols.append(f"{values[peak]:>7.2f}{flag} {self.speeds[peak]:>4.0f}")
+      lines.append(f"{platform:<40} {self.control_types[i]:<9}" + "".join(cols))
+    lines.append(f"* above ISO 11270: {ISO_LATERAL_ACCEL} m/s^2 plus road bank for angle and curvature, {ISO_LATERAL_JERK} m/s^3")
+    lines.append(f"{len(self.platforms)} platforms over {self.speeds[0]:.0f}-{self.speeds[-1]:.0f} m/s")
+    return "\n".join(lines)
+
+
+def torque_envelope(params: list, max_lat_accels: list[float], speeds: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+  """Torque limits don't depend on speed, so all torque platforms are evaluated together and broadcast over speeds"""
+  steer_max = np.array([p.STEER_MAX for p in params], dtype=float)
+  steer_step = np.array([p.STEER_STEP for p in params], dtype=float)
+  max_lat_accel = np.array(max_lat_accels, dtype=float)
+
+  # fraction of max torque reached in JERK_MEAS_T, clipping to max torque
+  frames = JERK_MEAS_T / DT_CTRL
+  up = np.minimum(np.array([p.STEER_DELTA_UP for p in params]) / steer_max / steer_step * frames, 1.)
+  down = np.minimum(np.array([p.STEER_DELTA_DOWN for p in params]) / steer_max / steer_step * frames, 1.)
+
+  shape = (len(params), len(speeds))
+  return (np.broadcast_to(max_lat_accel[:, None], shape),
+          np.broadcast_to((up * max_lat_accel / JERK_MEAS_T)[:, None], shape),
+          np.broadcast_to((down * max_lat_accel / JERK_MEAS_T)[:, None], shape))
+
+
+def angle_envelope(params, VM: VehicleModel, speeds: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+  limits = params.ANGLE_LIMITS
+  frames = JERK_MEAS_T / (DT_CTRL * getattr(params, "STEER_STEP", 1))
+
+  def lat_accel(angle_deg):
+    return np.abs(VM.calc_curvature(np.radians(angle_deg), speeds, 0.)) * speeds ** 2
+
+  if isinstance(limits, AngleSteeringLimitsVM):
+    # vectorized get_max_angle_vm and get_max_angle_delta_vm, capped like apply_steer_angle_limits_vm
+    max_angle = np.minimum(np.degrees(VM.get_steer_from_curvature(limits.MAX_LATERAL_ACCEL / speeds ** 2, speeds, 0.)), limits.STEER_ANGLE_MAX)
+    max_delta = np.degrees(VM.get_steer_from_curvature(limits.MAX_LATERAL_JERK / speeds ** 2, speeds, 0.)) * (DT_CTRL * params.STEER_STEP)
+    rate_up = rate_down = np.minimum(max_delta, limits.MAX_ANGLE_RATE)
+  else:
+    assert isinstance(limits, AngleSteeringLimits)
+    max_angle = np.full_like(speeds, limits.STEER_ANGLE_MAX)
+    rate_up = np.interp(speeds, *limits.ANGLE_RATE_LIMIT_UP)
+    rate_down = np.interp(speeds, *limits.ANGLE_RATE_LIMIT_DOWN)
+
+  return (lat_accel(max_angle),
+          lat_accel(np.minimum(rate_up * frames, max_angle)) / JERK_MEAS_T,
+          lat_accel(np.minimum(rate_down * frames, max_angle)) / JERK_MEAS_T)
+
+
+def curvature_envelope(params, speeds: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+  # CurvatureSteeringLimits.apply_limits: accel and jerk limits in curvature space, then the EPS max
+  limits = params.CURVATURE_LIMITS
+  max_lat_accel = np.minimum(limits.MAX_LATERAL_ACCEL, limits.CURVATURE_MAX * speeds ** 2)
+  jerk = np.minimum(limits.MAX_LATERAL_JERK * JERK_MEAS_T, max_lat_accel) / JERK_MEAS_T
+  return max_lat_accel, jerk, jerk
+
+
+def compute_envelope(platforms=None, speeds: np.ndarray = SPEEDS) -> LateralEnvelope:
+  """
+  Lateral envelope of every (or the given) platform's CarControllerParams. Mock and notCar platforms are skipped,
+  as are angle platforms without ANGLE_LIMITS, which have no lateral control to evaluate.
+  """
+  speeds = np.asarray(speeds, dtype=float)
+  torque_params = load_torque_db()
+
+  rows: dict[str, tuple[str, tuple]] = {}
+  torque_platforms, torque_controls, torque_accels = [], [], []
+  for platform in sorted(PLATFORMS) if platforms is None else platforms:
+    platform = str(platform)
+    if platform == "MOCK":
+      continue
+
+    CP = interfaces[platform].get_non_essential_params(platform)
+    if CP.notCar:
+      continue
+
+    # dispatch on the limits the controller applies, Ford reports angle control but limits curvature
+    CarControllerParams = importlib.import_module(f"opendbc.car.{CP.brand}.values").CarControllerParams
+    params = CarControllerParams() if CarControllerParams.__init__ is object.__init__ else CarControllerParams(CP)
+    if hasattr(params, "CURVATURE_LIMITS"):
+      rows[platform] = ("curvature", curvature_envelope(params, speeds))
+    elif CP.steerControlType == "angle" and hasattr(params, "ANGLE_LIMITS"):
+      rows[platform] = ("angle", angle_envelope(params, VehicleModel(CP), speeds))
+    elif CP.steerControlType == "torque":
+      torque_platforms.append(platform)
+      torque_controls.append(params)
+      torque_accels.append(torque_params[platform].MAX_LAT_ACCEL_MEASURED)
+      rows[platform] = ("torque", ())
+
+  if torque_platforms:
+    accel, up, down = torque_envelope(torque_controls, torque_accels, speeds)
+    for i, platform in enumerate(torque_platforms):
+      rows[platform] = ("torque", (accel[i], up[i], down[i]))
+
+  names = list(rows)
+  arrays = [np.array([rows[name][1][k] for name in names]).reshape(len(names), len(speeds)) for k in range(3)]
+  return LateralEnvelope(names, [rows[name][0] for name in names], speeds, *arrays)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Reports the lateral accel and jerk envelope every platform's steering limits allow",
+                                   formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+  parser.add_argument("platforms", nargs="*", help="platforms to evaluate, all by default")
+  parser.add_argument("--max-speed", type=float, default=SPEEDS[-1], help="top of the speed sweep, m/s")
+  parser.add_argument("--json", action="store_true", help="print the full envelope as JSON")
+  args = parser.parse_args()
+
+  envelope = compute_envelope(args.platforms or None, np.linspace(1., args.max_speed, int(args.max_speed)))
+  print(json.dumps(envelope.to_dict()) if args.json else envelope.report())
+
+
+if __name__ == "__main__":
+  main()
@@ -1,5 +1,5 @@
 from opendbc.can.parser import CANParser
-from opendbc.car import Bus, structs
+from opendbc.car import Bus, mirrors, structs
 from opendbc.car.interfaces import CarStateBase
 from opendbc.car.mg.values import DBC
 from opendbc.car.common.conversions import Conversions as CV
@@ -16,10 +16,10 @@ GEAR_MAP = {
 
 
 class CarState(CarStateBase):
-  def update(self, can_parsers) -> structs.CarState:
+  def update(self, can_parsers) -> mirrors.CarState:
     cp = can_parsers[Bus.pt]
     cp_cam = can_parsers[Bus.cam]
-    ret = structs.CarState()
+    ret = mirrors.CarState()
 
     # Vehicle speed
     ret.vEgoRaw = cp.vl["SCS_HSC2_FrP19"]["VehSpdAvgHSC2"] * CV.KPH_TO_MS
@@ -0,0 +1,182 @@
+import dataclasses
+import math
+import struct as _struct
+from typing import TYPE_CHECKING, Any
+
+from opendbc.car import structs
+
+# Plain Python mirrors of capnp structs for the hot path. Setting or reading a pycapnp field goes through its capnp
+# accessors and costs about ten times a __slots__ attribute, and CarState is written field by field then read again by
+# CarInterfaceBase and the CarController every frame. The mirrors are slots dataclasses generated from car.capnp with
+# the same field names and defaults, converted to and from capnp once at the process boundary:
+#
+#   CS = mirrors.CarState()          # nested structs work like the capnp struct's, enums hold their int values
+#   msg = mirrors.to_capnp(CS)       # a structs.CarState builder
+#   CS = mirrors.from_capnp(reader)  # and back
+#
+# Lists of structs hold mirrors. Mirrors keep Python floats until round_float32, which rounds the float32 fields like
+# a capnp round trip. Enums are plain ints, which compare equal to the capnp enum constants (GearShifter.drive) but not
+# to their names ('drive'). CarInterfaceBase.update builds a CarState mirror, rounds it and returns it converted, so
+# CS.out holds the same values as the published CarState. apply() keeps taking the capnp CarControl, converting a
+# whole reader costs more than the few fields a CarController reads from it.
+#
+# The classes are generated at import, so type checkers see them as the capnp structs they mirror.
+
+_PRIMITIVES = {'bool', 'int8', 'int16', 'int32', 'int64', 'uint8', 'uint16', 'uint32', 'uint64', 'float32', 'float64', 'text', 'data'}
+_FLOAT32 = _struct.Struct('<f')
+
+
+def _float32(v: float) -> float:
+  try:
+    return _FLOAT32.unpack(_FLOAT32.pack(v))[0]
+  except OverflowError:
+    return math.copysign(math.inf, v)
+
+
+@dataclasses.dataclass(frozen=True)
+class _Field:
+  name: str
+  kind: str  # 'value', 'enum', 'struct', 'list' or 'struct_list'
+  schema: Any = None  # of the nested struct or list element
+  float32: bool = False  # the value or list elements are float32
+
+
+def _schema_fields(schema) -> list[_Field]:
+  fields = []
+  for name in schema.fieldnames:
+    field = schema.fields[name]
+    # deprecated fields are groups or renamed with a DEPRECATED suffix
+    if field.proto.which() != 'slot' or name.endswith('DEPRECATED'):
+      continue
+    typ = field.proto.slot.type.which()
+    if typ == 'struct':
+      fields.append(_Field(name, 'struct', field.schema))
+    elif typ == 'list':
+      if field.proto.slot.type.list.elementType.which() == 'struct':
+        fields.append(_Field(name, 'struct_list', field.schema.elementType))
+      else:
+        fields.append(_Field(name, 'list', float32=field.proto.slot.type.list.elementType.which() == 'float32'))
+    elif typ == 'enum':
+      fields.append(_Field(name, 'enum'))
+    else:
+      assert typ in _PRIMITIVES, f"{schema.node.displayName}.{name}: unsupported type {typ}"
+      fields.append(_Field(name, 'value', float32=typ == 'float32'))
+  return fields
+
+
+def _short_name(schema) -> str:
+  return schema.node.displayName.rsplit(':', 1)[-1].rsplit('.', 1)[-1]
+
+
+class _Generator:
+  """Generates the mirror class, capnp filler, capnp reader and float32 rounder of a struct and every struct nested in it"""
+  def __init__(self):
+    self.classes: dict[int, type] = {}
+    self.fillers: dict[int, Any] = {}
+    self.readers: dict[int, Any] = {}
+    self.rounders: dict[int, Any] = {}
+    self.node_ids: dict[type, int] = {}
+
+  def generate(self, schema, defaults) -> type:
+    """defaults is a capnp builder of the struct with nothing set"""
+    node_id = schema.node.id
+    if node_id in self.classes:
+      return self.classes[node_id]
+
+    assert not schema.union_fields, f"{schema.node.displayName}: unions aren't supported"
+    fields = _schema_fields(schema)
+    attrs, nested = [], {}
+    for f in fields:
+      if f.kind == 'struct':
+        nested[f.name] = self.generate(f.schema, getattr(defaults, f.name))
+        attrs.append((f.name, nested[f.name], dataclasses.field(default_factory=nested[f.name])))
+      elif f.kind == 'struct_list':
+        nested[f.name] = self.generate(f.schema, defaults.init(f.name, 1)[0])
+        attrs.append((f.name, list, dataclasses.field(default_factory=list)))
+      elif f.kind == 'list':
+        attrs.append((f.name, list, dataclasses.field(default_factory=list)))
+      elif f.kind == 'enum':
+        attrs.append((f.name, int, dataclasses.field(default=getattr(defaults, f.name).raw)))
+      else:
+        value = getattr(defaults, f.name)
+        attrs.append((f.name, type(value), dataclasses.field(default=value)))
+
+    cls = dataclasses.make_dataclass(_short_name(schema), attrs, slots=True)
+    cls.__module__ = __name__
+    cls.__qualname__ = schema.node.displayName.rsplit(':', 1)[-1]
+    for sub in nested.values():
+      if not hasattr(cls, sub.__name__):
+        setattr(cls, sub.__name__, sub)
+    self.classes[node_id] = cls
+    self.node_ids[cls] = node_id
+    self.fillers[node_id], self.readers[node_id], self.rounders[node_id] = self._converters(cls, fields)
+    return cls
+
+  def _converters(self, cls, fields: list[_Field]):
+    ns: dict[str, Any] = {'cls': cls, 'new': object.__new__, 'f32': _float32}
+    fill = ['def fill(m, b):']
+    read = ['def read(r):', '  m = new(cls)']
+    rnd = ['def rnd(m):']
+    for i, f in enumerate(fields):
+      n = f.name
+      if f.kind in ('struct', 'struct_list'):
+        # nested structs are generated first
+        node_id = f.schema.node.id
+        ns[f'fill{i}'], ns[f'read{i}'], ns[f'rnd{i}'] = self.fillers[node_id], self.readers[node_id], self.rounders[node_id]
+      if f.kind == 'struct':
+        fill.append(f'  fill{i}(m.{n}, b.{n})')
+        read.append(f'  m.{n} = read{i}(r.{n})')
+        rnd.append(f'  rnd{i}(m.{n})')
+      elif f.kind == 'struct_list':
+        fill += [f'  v = m.{n}', '  if v:', f"    for e, eb in zip(v, b.init('{n}', len(v))):", f'      fill{i}(e, eb)']
+        read.append(f'  m.{n} = [read{i}(e) for e in r.{n}]')
+        rnd += [f'  for e in m.{n}:', f'    rnd{i}(e)']
+      elif f.kind == 'list':
+        fill += [f'  v = m.{n}', '  if v:', f'    b.{n} = v']
+        read.append(f'  m.{n} = list(r.{n})')
+        if f.float32:
+          rnd += [f'  v = m.{n}', '  if v:', f'    m.{n} = [f32(e) for e in v]']
+      else:
+        # only write fields that differ from the default, most of a CarState is False or 0 in a frame
+        ns[f'd{i}'] = cls.__dataclass_fields__[n].default
+        fill += [f'  v = m.{n}', f'  if v != d{i}:', f'    b.{n} = v']
+        read.append(f'  m.{n} = r.{n}.raw' if f.kind == 'enum' else f'  m.{n} = r.{n}')
+        if f.float32:
+          # zero is exact, and is most of them
+          rnd += [f'  v = m.{n}', '  if v:', f'    m.{n} = f32(v)']
+    read.append('  return m')
+    for lines in (fill, rnd):
+      if len(lines) == 1:
+        lines.append('  pass')
+
+    exec('\n'.join(fill) + '\n\n' + '\n'.join(read) + '\n\n' + '\n'.join(rnd), ns)
+    return ns['fill'], ns['read'], ns['rnd']
+
+
+_generator = _Generator()
+if TYPE_CHECKING:
+  CarState = structs.CarState
+  CarControl = structs.CarControl
+else:
+  CarState = _generator.generate(structs.CarState.schema, structs.CarState.new_message())
+  CarControl = _generator.generate(structs.CarControl.schema, structs.CarControl.new_message())
+
+_structs = {CarState: structs.CarState, CarControl: structs.CarControl}
+
+
+def to_capnp(m):
+  """capnp builder of the mirror, of CarState or CarControl"""
+  struct = _structs[type(m)]
+  b = struct.new_message()
+  _generator.fillers[struct.schema.node.id](m, b)
+  return b
+
+
+def round_float32(m) -> None:
+  """Rounds the float32 fields of a mirror in place, to the values a capnp round trip gives"""
+  _generator.rounders[_generator.node_ids[type(m)]](m)
+
+
+def from_capnp(r):
+  """Mirror of a capnp reader or builder of CarState, CarControl or any struct nested in them"""
+  return _generator.readers[r.schema.node.id](r)
@@ -0,0 +1,204 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from opendbc.car import DT_CTRL
+
+# Runtime overrides are small files a user or another process writes to change tuning while driving. Car code reads
+# Override.value, which a background watcher updates once when the file changes, so the control loop never touches
+# the filesystem. The watcher uses inotify on each file's directory and falls back to checking mtimes every frame
+# where inotify isn't available.
+#
+# Registering doesn't touch the file, so modules can register at import. Values are loaded by poll() or when the
+# watcher starts, which CarInterfaceBase does for the car process.
+
+_IN_CLOEXEC = 0o2000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_DELETE = 0x200
+_IN_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def _load_libc():
+  try:
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+  except OSError:
+    return None
+  return libc if hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch") else None
+
+
+class Override:
+  def __init__(self, name: str, path: str, parse: Callable[[str], Any], default: Any, sticky: bool = False):
+    """parse turns the file's contents into the value, raising ValueError if they're invalid. Invalid contents keep
+    the current value. A removed file resets the value to default, unless sticky.
+    """
+    self.name = name
+    self.path = path
+    self.parse = parse
+    self.default = default
+    self.sticky = sticky
+    self.value = default
+    self._signature: tuple[int, int, int] | None = None
+
+  def _stat(self) -> tuple[int, int, int] | None:
+    try:
+      st = os.stat(self.path)
+    except OSError:
+      return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+  def reload(self) -> None:
+    try:
+      with open(self.path) as f:
+        contents = f.read()
+    except OSError:
+      if not self.sticky:
+        self.value = self.default
+      return
+    try:
+      self.value = self.parse(contents.strip())
+    except (ValueError, TypeError):
+      pass
+
+  def poll(self, force: bool = False) -> bool:
+    """Reloads the value if the file changed since it was last loaded"""
+    signature = self._stat()
+    if signature == self._signature and not force:
+      return False
+    self._signature = signature
+    self.reload()
+    return True
+
+
+class OverrideRegistry:
+  def __init__(self, poll_interval: float = DT_CTRL, use_inotify: bool = True):
+    self.poll_interval = poll_interval
+    self.use_inotify = use_inotify
+    self._overrides: dict[str, Override] = {}
+    self._lock = threading.Lock()
+    self._thread: threading.Thread | None = None
+    self._stop = threading.Event()
+    self._wake_r, self._wake_w = -1, -1
+
+  def __getitem__(self, name: str) -> Override:
+    return self._overrides[name]
+
+  def __contains__(self, name: str) -> bool:
+    return name in self._overrides
+
+  def register(self, name: str, path: str, parse: Callable[[str], Any], default: Any, sticky: bool = False) -> Override:
+    """Adds an override, which holds its default until it's polled or the watcher runs.
+    Registering the same name again returns the existing override."""
+    with self._lock:
+      if name in self._overrides:
+        override = self._overrides[name]
+        assert override.path == path, f"override {name} is already registered for {override.path}"
+        return override
+
+      override = Override(name, path, parse, default, sticky)
+      self._overrides[name] = override
+      running = self._thread is not None
+    if running:
+      override.poll()
+      os.write(self._wake_w, b"\0")
+    return override
+
+  def poll(self) -> None:
+    """Reloads every override whose file changed"""
+    for override in list(self._overrides.values()):
+      override.poll()
+
+  def start(self) -> None:
+    """Loads every override and starts the watcher thread, if it isn't running"""
+    with self._lock:
+      if self._thread is not None:
+        return
+      for override in self._overrides.values():
+        override.poll()
+      self._stop.clear()
+      self._wake_r, self._wake_w = os.pipe()
+      self._thread = threading.Thread(target=self._watch, name="opendbc-overrides", daemon=True)
+      self._thread.start()
+
+  def stop(self) -> None:
+    with self._lock:
+      thread, self._thread = self._thread, None
+    if thread is None:
+      return
+    self._stop.set()
+    os.write(self._wake_w, b"\0")
+    thread.join()
+    os.close(self._wake_r)
+    os.close(self._wake_w)
+
+  def _watch(self) -> None:
+    libc = _load_libc() if self.use_inotify else None
+    inotify_fd = libc.inotify_init1(_IN_CLOEXEC | _IN_NONBLOCK) if libc is not None else -1
+    watches: dict[str, int] = {}  # directory: watch descriptor
+    watched: dict[tuple[int, str], Override] = {}
+    polled: list[Override] = []
+
+    def add_watches():
+      watched.clear()
+      polled.clear()
+      for override in list(self._overrides.values()):
+        directory, fn = os.path.split(override.path)
+        if inotify_fd >= 0 and directory not in watches:
+          wd = libc.inotify_add_watch(inotify_fd, os.fsencode(directory), _IN_WATCH_MASK)
+          if wd >= 0:
+            watches[directory] = wd
+        if directory in watches:
+          watched[(watches[directory], fn)] = override
+        else:
+          polled.append(override)
+        # catch changes made before the watch was added
+        override.poll()
+
+    try:
+      add_watches()
+      while not self._stop.is_set():
+        fds = [self._wake_r] + ([inotify_fd] if inotify_fd >= 0 else [])
+        readable, _, _ = select.select(fds, [], [], self.poll_interval if polled else None)
+
+        if self._wake_r in readable:
+          os.read(self._wake_r, 4096)
+          add_watches()
+
+        if inotify_fd in readable:
+          data = os.read(inotify_fd, 64 * 1024)
+          offset = 0
+          while offset < len(data):
+            wd, _, _, name_len = _INOTIFY_EVENT.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + _INOTIFY_EVENT.size:offset + _INOTIFY_EVENT.size + name_len].rstrip(b"\0"))
+            offset += _INOTIFY_EVENT.size + name_len
+            override = watched.get((wd, name))
+            if override is not None:
+              override.poll(force=True)
+
+        for override in polled:
+          override.poll()
+    finally:
+      if inotify_fd >= 0:
+        os.close(inotify_fd)
+
+
+OVERRIDES = OverrideRegistry()
+
+
+def positive_float(contents: str) -> float:
+  value = float(contents)
+  if value <= 0:
+    raise ValueError(f"{value} isn't positive")
+  return value
+
+
+# curb weight in kg, replaces the platform's
+VEHICLE_MASS = OVERRIDES.register("vehicle_mass", "/data/vehicle_mass.txt", positive_float, None)
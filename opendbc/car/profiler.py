@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+import argparse
+import atexit
+import json
+import os
+import time
+
+# Opt-in cycle time profiling of the car interface hot path. Instrumented code asks PROFILER for a Lap, or checks
+# PROFILER.enabled before timing itself, so a disabled profiler costs an attribute lookup and a no-op call.
+# Set OPENDBC_PROFILE to a path to enable it in a process and dump its histograms there at exit,
+# then print them with: python -m opendbc.car.profiler <dump.json> ...
+
+
+class LatencyHistogram:
+  """Fixed-size log-linear histogram of durations in ns, like an HdrHistogram. Each power of two is split into
+  SUB_BUCKETS linear buckets, so any recorded value is off by less than 1/SUB_BUCKETS.
+  """
+  SUB_BUCKET_BITS = 4
+  SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+  MAX_BITS = 40  # ~18 minutes
+  N_BUCKETS = (MAX_BITS - SUB_BUCKET_BITS + 1) * SUB_BUCKETS
+
+  def __init__(self):
+    self.counts = [0] * self.N_BUCKETS
+    self.count = 0
+    self.total = 0
+    self.min = 0
+    self.max = 0
+
+  @classmethod
+  def bucket(cls, value: int) -> int:
+    # values below 2 * SUB_BUCKETS get a bucket each, above that the top SUB_BUCKET_BITS + 1 bits pick the bucket
+    shift = max(value.bit_length() - cls.SUB_BUCKET_BITS - 1, 0)
+    return min(shift * cls.SUB_BUCKETS + (value >> shift), cls.N_BUCKETS - 1)
+
+  @classmethod
+  def bucket_value(cls, bucket: int) -> int:
+    """Highest value recorded in bucket"""
+    if bucket < 2 * cls.SUB_BUCKETS:
+      return bucket
+    shift = bucket // cls.SUB_BUCKETS - 1
+    return ((bucket % cls.SUB_BUCKETS + cls.SUB_BUCKETS + 1) << shift) - 1
+
+  def record(self, value: int) -> None:
+    self.counts[self.bucket(value)] += 1
+    if self.count == 0 or value < self.min:
+      self.min = value
+    if value > self.max:
+      self.max = value
+    self.count += 1
+    self.total += value
+
+  def percentile(self, q: float) -> int:
+    if self.count == 0:
+      return 0
+    target = max(q / 100 * self.count, 1)
+    seen = 0
+    for bucket, n in enumerate(self.counts):
+      seen += n
+      if seen >= target:
+        return min(self.bucket_value(bucket), self.max)
+    return self.max
+
+  @property
+  def mean(self) -> float:
+    return self.total / self.count if self.count else 0.
+
+  def merge(self, other: 'LatencyHistogram') -> None:
+    if other.count == 0:
+      return
+    self.counts = [a + b for a, b in zip(self.counts, other.counts, strict=True)]
+    self.min = other.min if self.count == 0 else min(self.min, other.min)
+    self.max = max(self.max, other.max)
+    self.count += other.count
+    self.total += other.total
+
+  def to_dict(self) -> dict:
+    return {"count": self.count, "total": self.total, "min": self.min, "max": self.max,
+            "counts": {str(bucket): n for bucket, n in enumerate(self.counts) if n}}
+
+  @classmethod
+  def from_dict(cls, d: dict) -> 'LatencyHistogram':
+    histogram = cls()
+    histogram.count, histogram.total, histogram.min, histogram.max = d["count"], d["total"], d["min"], d["max"]
+    for bucket, n in d["counts"].items():
+      histogram.counts[int(bucket)] = n
+    return histogram
+
+
+class Lap:
+  """Times consecutive stages of one cycle, each mark records the time since the previous one"""
+  __slots__ = ("profiler", "name", "start", "last")
+
+  def __init__(self, profiler: 'CycleProfiler', name: str):
+    self.profiler = profiler
+    self.name = name
+    self.start = self.last = time.perf_counter_ns()
+
+  def mark(self, stage: str) -> None:
+    now = time.perf_counter_ns()
+    self.profiler.record(stage, now - self.last)
+    self.last = now
+
+  def done(self) -> None:
+    """Records the whole cycle under the lap's name"""
+    self.profiler.record(self.name, time.perf_counter_ns() - self.start)
+
+
+class _NullLap:
+  __slots__ = ()
+
+  def mark(self, stage: str) -> None:
+    pass
+
+  def done(self) -> None:
+    pass
+
+
+_NULL_LAP = _NullLap()
+
+
+class CycleProfiler:
+  def __init__(self):
+    self.enabled = False
+    self.histograms: dict[str, LatencyHistogram] = {}
+
+  def enable(self) -> None:
+    self.enabled = True
+
+  def disable(self) -> None:
+    self.enabled = False
+
+  def reset(self) -> None:
+    self.histograms = {}
+
+  def lap(self, name: str) -> Lap | _NullLap:
+    return Lap(self, name) if self.enabled else _NULL_LAP
+
+  def record(self, stage: str, ns: int) -> None:
+    histogram = self.histograms.get(stage)
+    if histogram is None:
+      histogram = self.histograms[stage] = LatencyHistogram()
+    histogram.record(ns)
+
+  def merge(self, histograms: dict[str, LatencyHistogram]) -> None:
+    for stage, histogram in histograms.items():
+      self.histograms.setdefault(stage, LatencyHistogram()).merge(histogram)
+
+  def dump(self) -> dict[str, dict]:
+    return {stage: histogram.to_dict() for stage, histogram in self.histograms.items()}
+
+  def save(self, path: str) -> None:
+    with open(path, "w") as f:
+      json.dump(self.dump(), f)
+
+  @staticmethod
+  def load(path: str) -> dict[str, LatencyHistogram]:
+    with open(path) as f:
+      return {stage: LatencyHistogram.from_dict(d) for stage, d in json.load(f).items()}
+
+  def summary(self) -> dict[str, dict[str, float]]:
+    """Stats of each stage in us"""
+    return {stage: {"count": histogram.count, "mean": histogram.mean / 1e3, "p50": histogram.percentile(50) / 1e3, "p90": histogram.percentile(90) / 1e3,
+                    "p99": histogram.percentile(99) / 1e3, "p99.9": histogram.percentile(99.9) / 1e3, "max": histogram.max / 1e3}
+            for stage, histogram in self.histograms.items()}
+
+  def report(self) -> str:
+    summary = self.summary()
+    lines = [f"{'stage':<28} {'count':>8} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'p99.9':>9} {'max':>9}  (us)"]
+    for stage in sorted(summary):
+      s = summary[stage]
+      lines.append(f"{stage:<28} {s['count']:>8} " + " ".join(f"{s[k]:>9.1f}" for k in ("mean", "p50", "p90", "p99", "p99.9", "max")))
+    return "\n".join(lines)
+
+
+PROFILER = CycleProfiler()
+
+if os.environ.get("OPENDBC_PROFILE"):
+  PROFILER.enable()
+  atexit.register(PROFILER.save, os.environ["OPENDBC_PROFILE"])
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Prints the per-stage latency of profiler dumps, merging several")
+  parser.add_argument("dumps", nargs="+", help="files written by a process run with OPENDBC_PROFILE set")
+  args = parser.parse_args()
+
+  profiler = CycleProfiler()
+  for path in args.dumps:
+    profiler.merge(CycleProfiler.load(path))
+  print(profiler.report())
+
+
+if __name__ == "__main__":
+  main()
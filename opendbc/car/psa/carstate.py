@@ -1,4 +1,4 @@
-from opendbc.car import structs, Bus
+from opendbc.car import mirrors, structs, Bus
 from opendbc.can.parser import CANParser
 from opendbc.car.common.conversions import Conversions as CV
 from opendbc.car.psa.values import DBC, CarControllerParams
@@ -7,11 +7,11 @@ from opendbc.car.interfaces import CarStateBase
 GearShifter = structs.CarState.GearShifter
 
 class CarState(CarStateBase):
-  def update(self, can_parsers) -> structs.CarState:
+  def update(self, can_parsers) -> mirrors.CarState:
     cp = can_parsers[Bus.main]
     cp_adas = can_parsers[Bus.adas]
     cp_cam = can_parsers[Bus.cam]
-    ret = structs.CarState()
+    ret = mirrors.CarState()
 
     # car speed
     self.parse_wheel_speeds(ret,
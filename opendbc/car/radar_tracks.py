@@ -0,0 +1,74 @@
+import operator
+from collections.abc import Collection, Sequence
+
+import numpy as np
+
+from opendbc.car import structs
+
+
+class RadarTrackTable:
+  """Reads the same signals from a block of radar track messages into arrays, one element per message.
+
+  The parser updates each message's decoded values in place, so the message dicts are looked up once here
+  and every read is a single pass over them.
+
+  msg_signals: the signal names in each message, for radars that number their signals per message.
+    signals then only names the arrays that are returned.
+  """
+  def __init__(self, rcp, msgs: Sequence[int | str], signals: Sequence[str], msg_signals: Sequence[Sequence[str]] | None = None):
+    self.msgs = list(msgs)
+    self.signals = tuple(signals)
+    self._vls = [rcp.vl[msg] for msg in self.msgs]
+    if msg_signals is None:
+      msg_signals = [self.signals] * len(self.msgs)
+    assert len(msg_signals) == len(self.msgs) and all(len(names) == len(self.signals) for names in msg_signals)
+    self._getters = [operator.itemgetter(*names) for names in msg_signals]
+
+  def read(self) -> dict[str, np.ndarray]:
+    vals = np.array([getter(vl) for getter, vl in zip(self._getters, self._vls, strict=True)], dtype=np.float64)
+    return dict(zip(self.signals, vals.reshape(len(self._vls), len(self.signals)).T, strict=True))
+
+
+class RadarPoint:
+  """Radar point the interfaces track between cycles, converted to a capnp RadarData.RadarPoint only when published.
+  Writing capnp struct fields is far slower than writing slots.
+  """
+  __slots__ = ('trackId', 'dRel', 'yRel', 'vRel')
+
+  def __init__(self, trackId: int = 0, dRel: float = 0., yRel: float = 0., vRel: float = 0.):
+    self.trackId = trackId
+    self.dRel = dRel
+    self.yRel = yRel
+    self.vRel = vRel
+
+  def __repr__(self):
+    return f"RadarPoint(trackId={self.trackId}, dRel={self.dRel}, yRel={self.yRel}, vRel={self.vRel})"
+
+
+class RadarPointPool:
+  """Free list of dropped points, so tracks coming and going don't allocate once the pool has warmed up"""
+  def __init__(self):
+    self._free: list[RadarPoint] = []
+
+  def __len__(self):
+    return len(self._free)
+
+  def get(self, track_id: int) -> RadarPoint:
+    if not self._free:
+      return RadarPoint(track_id)
+    pt = self._free.pop()
+    pt.trackId = track_id
+    pt.dRel = pt.yRel = pt.vRel = 0.
+    return pt
+
+  def put(self, pt: RadarPoint) -> None:
+    self._free.append(pt)
+
+
+def set_points(ret: structs.RadarData, points: Collection[RadarPoint]) -> None:
+  """Copies points into ret's capnp point list in a single pass"""
+  for dst, pt in zip(ret.init('points', len(points)), points, strict=True):
+    dst.trackId = pt.trackId
+    dst.dRel = pt.dRel
+    dst.yRel = pt.yRel
+    dst.vRel = pt.vRel
@@ -3,6 +3,7 @@ import math
 from opendbc.can import CANParser
 from opendbc.car import Bus, structs
 from opendbc.car.interfaces import RadarInterfaceBase
+from opendbc.car.radar_tracks import set_points
 from opendbc.car.rivian.values import DBC
 
 RADAR_START_ADDR = 0x500
@@ -58,16 +59,15 @@ class RadarInterface(RadarInterfaceBase):
 
       if valid:
         if addr not in self.pts or msg['STATE'] in (1, 2, 7):
-          self.pts[addr] = structs.RadarData.RadarPoint()
-          self.pts[addr].trackId = self.track_id
+          self._new_point(addr, self.track_id)
           self.track_id += 1
 
         azimuth = math.radians(msg['AZIMUTH'])
         self.pts[addr].dRel = math.cos(azimuth) * msg['LONG_DIST']
         self.pts[addr].yRel = -math.sin(azimuth) * msg['LONG_DIST']
         self.pts[addr].vRel = msg['REL_SPEED']
-      elif addr in self.pts:
-        del self.pts[addr]
+      else:
+        self._drop_point(addr)
 
-    ret.points = list(self.pts.values())
+    set_points(ret, self.pts.values())
     return ret
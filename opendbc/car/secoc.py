@@ -3,6 +3,10 @@ import struct
 from Crypto.Hash import CMAC
 from Crypto.Cipher import AES
 
+BLOCK_SIZE = 16
+RB = 0x87  # CMAC subkey constant for 128 bit blocks (NIST SP 800-38B)
+MASK_128 = (1 << 128) - 1
+
 
 def add_mac(key, trip_cnt, reset_cnt, msg_cnt, msg):
   # TODO: clean up conversion to and from hex
@@ -47,3 +51,58 @@ def build_sync_mac(key, trip_cnt, reset_cnt, id_=0xf):
   msg = "0" + cmac.digest().hex()[:7]
   msg = bytes.fromhex(msg)
   return struct.unpack('>I', msg)[0]
+
+
+def _double(x: int) -> int:
+  """Multiplication by x in GF(2^128), for the CMAC subkeys"""
+  return ((x << 1) & MASK_128) ^ (RB if x >> 127 else 0)
+
+
+class SecOCSigner:
+  """
+  add_mac and build_sync_mac for one key. The AES key schedule and CMAC subkeys are computed once, and MACs are
+  computed on bytes and ints without going through hex. Toyota authenticates up to a few hundred messages a second.
+  """
+  __slots__ = ("key", "_encrypt", "_k1", "_k2")
+
+  def __init__(self, key: bytes):
+    self.key = key
+    self._encrypt = AES.new(key, AES.MODE_ECB).encrypt
+    l0 = int.from_bytes(self._encrypt(bytes(BLOCK_SIZE)), "big")
+    self._k1 = _double(l0)
+    self._k2 = _double(self._k1)
+
+  def cmac(self, data: bytes) -> bytes:
+    """Full AES-CMAC of data"""
+    n = max((len(data) + BLOCK_SIZE - 1) // BLOCK_SIZE, 1)
+    last = data[(n - 1) * BLOCK_SIZE:]
+    if len(last) == BLOCK_SIZE:
+      last_block = int.from_bytes(last, "big") ^ self._k1
+    else:
+      last_block = int.from_bytes(last + b"\x80" + bytes(BLOCK_SIZE - 1 - len(last)), "big") ^ self._k2
+
+    state = 0
+    for i in range(n - 1):
+      state = int.from_bytes(self._encrypt((state ^ int.from_bytes(data[i * BLOCK_SIZE:(i + 1) * BLOCK_SIZE], "big")).to_bytes(BLOCK_SIZE, "big")), "big")
+    return self._encrypt((state ^ last_block).to_bytes(BLOCK_SIZE, "big"))
+
+  def truncated_mac(self, data: bytes) -> int:
+    """The first 28 bits of the CMAC, as SecOC sends it"""
+    return int.from_bytes(self.cmac(data)[:4], "big") >> 4
+
+  def mac(self, addr: int, payload: bytes, trip_cnt: int, reset_cnt: int, msg_cnt: int) -> int:
+    """Authenticator of the first 4 bytes of payload"""
+    # [Message ID (16 bits)][Payload (32 bits)][Freshness Value (48 bits)], see add_mac
+    freshness = (reset_cnt << 12) | ((msg_cnt & 0xff) << 4) | ((reset_cnt & 0b11) << 2)
+    return self.truncated_mac(struct.pack('>H4sHI', addr, payload, trip_cnt, freshness))
+
+  def add_mac(self, trip_cnt: int, reset_cnt: int, msg_cnt: int, msg):
+    addr, payload, bus = msg
+    payload = bytes(payload[:4])
+
+    # [Payload (32 bit)][Message Counter Flag (2 bit)][Reset Flag (2 bit)][Authenticator (28 bit)]
+    flags = ((msg_cnt & 0b11) << 2) | (reset_cnt & 0b11)
+    return (addr, payload + struct.pack('>I', (flags << 28) | self.mac(addr, payload, trip_cnt, reset_cnt, msg_cnt)), bus)
+
+  def build_sync_mac(self, trip_cnt: int, reset_cnt: int, id_: int = 0xf) -> int:
+    return self.truncated_mac(struct.pack('>HHI', id_, trip_cnt, reset_cnt << 12)[:-1])
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+import argparse
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from opendbc.can.dbc import DBC
+from opendbc.car.can_definitions import CanData
+from opendbc.car.secoc import SecOCSigner
+
+SECOC_DBC = "toyota_secoc_pt_generated"
+SYNC_ADDR = 0xf  # SECOC_SYNCHRONIZATION
+
+# only the lower 2 bits of the 8 bit message counter are sent, so after missed frames the
+# verifier searches this many counters ahead for the one the frame was signed with
+MAX_MSG_CNT_SKIP = 64
+
+
+@dataclass
+class StreamStats:
+  frames: int = 0
+  verified: int = 0
+  failed: int = 0
+  desyncs: int = 0
+  unsynced: int = 0  # before the first SECOC_SYNCHRONIZATION, so not verifiable
+
+
+@dataclass
+class Desync:
+  nanos: int
+  source: str
+  src: int
+  addr: int
+  kind: str  # "msg_cnt" or "reset"
+  expected: int
+  actual: int
+
+
+def authenticated_addrs(dbc_name: str = SECOC_DBC) -> frozenset[int]:
+  """Messages carrying a SecOC authenticator, besides the synchronization message"""
+  return frozenset(addr for addr, msg in DBC(dbc_name).addr_to_msg.items() if "AUTHENTICATOR" in msg.sigs and addr != SYNC_ADDR)
+
+
+class SecOCVerifier:
+  """
+  Checks every authenticated frame of a log offline. Trip and reset counters come from SECOC_SYNCHRONIZATION,
+  and each (source, bus, address) stream's message counter is tracked like the sender's, restarting from 0 when
+  the reset counter changes. Frames that only verify further ahead are reported as desyncs and resync the stream.
+  """
+  def __init__(self, key: bytes, addrs: Iterable[int] | None = None):
+    self.signer = SecOCSigner(key)
+    self.addrs = authenticated_addrs() if addrs is None else frozenset(addrs)
+    self.trip_cnt: int | None = None
+    self.reset_cnt: int | None = None
+    self.msg_cnts: dict[tuple[str, int, int], int] = {}
+    self.sync = StreamStats()
+    self.streams: dict[tuple[str, int, int], StreamStats] = defaultdict(StreamStats)
+    self.desyncs: list[Desync] = []
+
+  def update(self, nanos: int, frames: Iterable[CanData], source: str = "can") -> None:
+    for addr, dat, src in frames:
+      if addr == SYNC_ADDR and source == "can" and src < 128:
+        self.update_sync(dat)
+      elif addr in self.addrs:
+        self.verify_frame(nanos, source, src, addr, dat)
+
+  def update_sync(self, dat: bytes) -> None:
+    trip_cnt = int.from_bytes(dat[0:2], "big")
+    reset_cnt = int.from_bytes(dat[2:5], "big") >> 4
+    authenticator = int.from_bytes(dat[4:8], "big") & 0x0fffffff
+
+    self.sync.frames += 1
+    if self.signer.build_sync_mac(trip_cnt, reset_cnt) == authenticator:
+      self.sync.verified += 1
+    else:
+      self.sync.failed += 1
+
+    # senders restart their message counters on a new reset counter, like the Toyota CarController
+    if (trip_cnt, reset_cnt) != (self.trip_cnt, self.reset_cnt):
+      self.msg_cnts.clear()
+    self.trip_cnt, self.reset_cnt = trip_cnt, reset_cnt
+
+  def verify_frame(self, nanos: int, source: str, src: int, addr: int, dat: bytes) -> bool:
+    stats = self.streams[source, src, addr]
+    stats.frames += 1
+    if self.reset_cnt is None:
+      stats.unsynced += 1
+      return False
+
+    # [Payload (32 bit)][Message Counter Flag (2 bit)][Reset Flag (2 bit)][Authenticator (28 bit)]
+    word = int.from_bytes(dat[4:8], "big")
+    authenticator, reset_flag, msg_cnt_lower = word & 0x0fffffff, (word >> 28) & 0b11, word >> 30
+    key = (source, src, addr)
+    expected = self.msg_cnts.get(key, 0)
+
+    if reset_flag != self.reset_cnt & 0b11:
+      stats.failed += 1
+      stats.desyncs += 1
+      self.desyncs.append(Desync(nanos, source, src, addr, "reset", self.reset_cnt & 0b11, reset_flag))
+      self.msg_cnts[key] = expected + 1
+      return False
+
+    mac = self.signer.mac
+    payload = dat[:4]
+    for msg_cnt in range(expected + ((msg_cnt_lower - expected) & 0b11), expected + MAX_MSG_CNT_SKIP, 4):
+      if mac(addr, payload, self.trip_cnt, self.reset_cnt, msg_cnt) == authenticator:
+        if msg_cnt != expected:
+          stats.desyncs += 1
+          self.desyncs.append(Desync(nanos, source, src, addr, "msg_cnt", expected, msg_cnt))
+        stats.verified += 1
+        self.msg_cnts[key] = msg_cnt + 1
+        return True
+
+    stats.failed += 1
+    self.msg_cnts[key] = expected + 1
+    return False
+
+  def report(self) -> str:
+    names = {addr: msg.name for addr, msg in DBC(SECOC_DBC).addr_to_msg.items()}
+    lines = [f"{'source':<8} {'bus':>4} {'message':<26} {'frames':>8} {'verified':>9} {'failed':>7} {'desyncs':>8} {'unsynced':>9}"]
+    for (source, src, addr), s in [(("can", -1, SYNC_ADDR), self.sync)] + sorted(self.streams.items()):
+      bus = "-" if src < 0 else str(src)
+      name = f"{names.get(addr, '')} ({addr:#x})"
+      lines.append(f"{source:<8} {bus:>4} {name:<26} {s.frames:>8} {s.verified:>9} {s.failed:>7} {s.desyncs:>8} {s.unsynced:>9}")
+    for d in self.desyncs[:20]:
+      lines.append(f"desync at {d.nanos * 1e-9:.3f}s: {d.source} bus {d.src} {d.addr:#x} {d.kind} expected {d.expected}, got {d.actual}")
+    if len(self.desyncs) > 20:
+      lines.append(f"... and {len(self.desyncs) - 20} more desyncs")
+    return "\n".join(lines)
+
+
+def log_frames(log: str, sources: tuple[str, ...]) -> Iterator[tuple[int, str, list[CanData]]]:
+  from opendbc.car.logreader import LogReader
+  for msg in LogReader(log, only_union_types=True, sort_by_time=True):
+    which = msg.which()
+    if which in sources:
+      yield msg.logMonoTime, which, [CanData(c.address, c.dat, c.src) for c in getattr(msg, which)]
+
+
+def synthetic_frames(key: bytes, seconds: float, reset_period: float = 10.) -> Iterator[tuple[int, str, list[CanData]]]:
+  """A route's worth of signed Toyota control frames: STEERING_LKA at 100Hz, STEERING_LTA_2 and ACC_CONTROL_2 at 50Hz"""
+  signer = SecOCSigner(key)
+  trip_cnt, reset_cnt = 1, 0
+  msg_cnts: dict[int, int] = {}
+  for frame in range(int(seconds * 100)):
+    can = []
+    if frame % int(reset_period * 100) == 0:
+      reset_cnt += 1
+      msg_cnts.clear()
+      sync = (trip_cnt << 48) | (reset_cnt << 28) | signer.build_sync_mac(trip_cnt, reset_cnt)
+      can.append(CanData(SYNC_ADDR, sync.to_bytes(8, "big"), 0))
+    for addr, step in ((0x2e4, 1), (0x131, 2), (0x183, 2)):
+      if frame % step == 0:
+        msg_cnt = msg_cnts.get(addr, 0)
+        msg_cnts[addr] = msg_cnt + 1
+        can.append(CanData(*signer.add_mac(trip_cnt, reset_cnt, msg_cnt, (addr, frame.to_bytes(8, "little"), 0))))
+    yield frame * 10_000_000, "can", can
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Verifies the SecOC authenticators of every frame in a log",
+                                   formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+  parser.add_argument("log", nargs="?", help="rlog or qlog, a synthetic route is verified without one")
+  parser.add_argument("--key", required=True, help="SecOC key as hex")
+  parser.add_argument("--source", choices=("can", "sendcan", "both"), default="both", help="which log frames to verify")
+  parser.add_argument("--seconds", type=float, default=600., help="length of the synthetic route")
+  args = parser.parse_args()
+
+  key = bytes.fromhex(args.key)
+  if args.log is None:
+    frames = list(synthetic_frames(key, args.seconds))
+  else:
+    frames = list(log_frames(args.log, ("can", "sendcan") if args.source == "both" else (args.source,)))
+
+  verifier = SecOCVerifier(key)
+  t = time.perf_counter()
+  for nanos, source, can in frames:
+    verifier.update(nanos, can, source)
+  elapsed = time.perf_counter() - t
+
+  print(verifier.report())
+  authenticated = sum(s.frames for s in verifier.streams.values())
+  print(f"\n{authenticated} authenticated frames in {elapsed:.2f}s, {authenticated / max(elapsed, 1e-9):,.0f} frames/s")
+
+
+if __name__ == "__main__":
+  main()
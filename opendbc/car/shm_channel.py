@@ -0,0 +1,138 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Any
+
+# A typed key/value channel in a memory-mapped file, for small values other processes read or write every frame.
+# Reading or writing a value is a memory access instead of an open/read/parse cycle on a text file.
+#
+# Every field has a fixed 24 byte slot: a little endian uint32 sequence counter, 4 bytes of padding, an 8 byte value and
+# the CLOCK_MONOTONIC time of the last write in nanoseconds. A writer makes the counter odd while it writes and even
+# again after, readers retry while it's odd or changes under them. A counter of 0 means the value was never written,
+# and the field's default is returned.
+#
+# The file name includes a hash of the field layout, so processes built with different fields use separate files
+# instead of replacing one another's.
+SHM_DIR = os.environ.get("OPENDBC_SHM_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+
+# magic, channel version, hash of the field layout
+_HEADER = struct.Struct("<4sI24s")
+_MAGIC = b"OPSC"
+_VERSION = 2
+_SEQ = struct.Struct("<I")
+_STAMP = struct.Struct("<Q")
+_SLOT_SIZE = 24
+_VALUE_OFFSET = 8
+_STAMP_OFFSET = 16
+# two writers racing on the same field can leave its counter odd, give up and use the value rather than spin
+_MAX_READ_RETRIES = 8
+
+# field types: float, int, bool and short strings of up to 8 bytes
+FIELD_TYPES = {float: "<d", int: "<q", bool: "<?", str: "<8s"}
+
+
+class ShmChannel:
+  def __init__(self, name: str, fields: dict[str, tuple[type, Any]], directory: str = SHM_DIR):
+    """fields maps each key to its type and default value. Processes opening a channel with the same name and fields
+    share it, a different layout gets its own file.
+    """
+    self._fields: dict[str, tuple[int, struct.Struct, type, Any]] = {}
+    for i, (key, (typ, default)) in enumerate(fields.items()):
+      self._fields[key] = (_HEADER.size + i * _SLOT_SIZE, struct.Struct(FIELD_TYPES[typ]), typ, default)
+
+    layout = ",".join(f"{key}:{typ.__name__}" for key, (typ, _) in fields.items())
+    digest = hashlib.sha256(f"{_VERSION}:{layout}".encode()).digest()[:24]
+    self.path = os.path.join(directory, f"{name}.{digest[:6].hex()}")
+    self._header = _HEADER.pack(_MAGIC, _VERSION, digest)
+    self._size = _HEADER.size + len(fields) * _SLOT_SIZE
+    self._mm = self._open()
+
+  def _open(self) -> mmap.mmap:
+    while True:
+      try:
+        fd = os.open(self.path, os.O_RDWR)
+      except FileNotFoundError:
+        fd = None
+
+      if fd is not None:
+        try:
+          if os.fstat(fd).st_size == self._size and os.pread(fd, _HEADER.size, 0) == self._header:
+            return mmap.mmap(fd, self._size)
+        finally:
+          os.close(fd)
+
+      # missing, or not a channel. the file is created aside so no process maps a partially written header, and a
+      # missing one is linked in so a process creating it at the same time can't replace it
+      tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=os.path.basename(self.path) + ".")
+      try:
+        os.fchmod(tmp_fd, 0o666)
+        os.write(tmp_fd, self._header + bytes(self._size - _HEADER.size))
+        if fd is None:
+          try:
+            os.link(tmp_path, self.path)
+          except FileExistsError:
+            continue
+        else:
+          os.replace(tmp_path, self.path)
+        return mmap.mmap(tmp_fd, self._size)
+      finally:
+        os.close(tmp_fd)
+        if os.path.exists(tmp_path):
+          os.unlink(tmp_path)
+
+  def close(self) -> None:
+    self._mm.close()
+
+  def __contains__(self, key: str) -> bool:
+    return key in self._fields
+
+  def _read(self, offset: int, value_struct: struct.Struct) -> tuple[int, Any, int]:
+    mm = self._mm
+    for _ in range(_MAX_READ_RETRIES):
+      seq = _SEQ.unpack_from(mm, offset)[0]
+      if seq & 1:
+        continue
+      value = value_struct.unpack_from(mm, offset + _VALUE_OFFSET)[0]
+      stamp = _STAMP.unpack_from(mm, offset + _STAMP_OFFSET)[0]
+      if _SEQ.unpack_from(mm, offset)[0] == seq:
+        return seq, value, stamp
+    return _SEQ.unpack_from(mm, offset)[0], value_struct.unpack_from(mm, offset + _VALUE_OFFSET)[0], _STAMP.unpack_from(mm, offset + _STAMP_OFFSET)[0]
+
+  def get(self, key: str, max_age: float | None = None) -> Any:
+    """Returns the value of key, or its default if it was never written or, with max_age, was written more than max_age
+    seconds ago"""
+    offset, value_struct, typ, default = self._fields[key]
+    seq, value, stamp = self._read(offset, value_struct)
+    if seq == 0 or (max_age is not None and time.monotonic_ns() - stamp > max_age * 1e9):
+      return default
+    return value.rstrip(b"\0").decode() if typ is str else value
+
+  def age(self, key: str) -> float | None:
+    """Seconds since key was last written, None if it never was"""
+    offset, value_struct, _, _ = self._fields[key]
+    seq, _, stamp = self._read(offset, value_struct)
+    return None if seq == 0 else (time.monotonic_ns() - stamp) / 1e9
+
+  def put(self, key: str, value: Any) -> None:
+    offset, value_struct, typ, _ = self._fields[key]
+    if typ is str:
+      value = value.encode()
+      assert len(value) <= value_struct.size, f"{key}: {value!r} is longer than {value_struct.size} bytes"
+    else:
+      value = typ(value)
+
+    mm = self._mm
+    seq = _SEQ.unpack_from(mm, offset)[0] | 1
+    _SEQ.pack_into(mm, offset, seq)
+    value_struct.pack_into(mm, offset + _VALUE_OFFSET, value)
+    _STAMP.pack_into(mm, offset + _STAMP_OFFSET, time.monotonic_ns())
+    # wrap before 0, which means never written
+    _SEQ.pack_into(mm, offset, (seq + 1) & 0xFFFFFFFF or 2)
+
+  def clear(self, key: str) -> None:
+    """Resets key to its default, as if it was never written. Writers use this to unset a value they stopped producing"""
+    offset = self._fields[key][0]
+    self._mm[offset:offset + _SLOT_SIZE] = bytes(_SLOT_SIZE)
@@ -1,6 +1,7 @@
 from opendbc.can import CANParser
 from opendbc.car import Bus, structs
 from opendbc.car.interfaces import RadarInterfaceBase
+from opendbc.car.radar_tracks import RadarTrackTable, set_points
 from opendbc.car.tesla.values import DBC
 
 RADAR_START_ADDR = 0x410
@@ -30,6 +31,11 @@ class RadarInterface(RadarInterfaceBase):
     self.radar_off_can = CP.radarUnavailable
     self.rcp = get_radar_can_parser(CP)
 
+    self.indices = list(range(RADAR_MSG_COUNT // 2))
+    if self.rcp is not None:
+      self.tracks_a = RadarTrackTable(self.rcp, [f'RadarPoint{i}_A' for i in self.indices], ('Index', 'Tracked', 'LongDist', 'LatDist', 'LongSpeed'))
+      self.tracks_b = RadarTrackTable(self.rcp, [f'RadarPoint{i}_B' for i in self.indices], ('Index2',))
+
   def update(self, can_strings):
     if self.radar_off_can or self.rcp is None:
       return super().update(None)
@@ -59,27 +65,10 @@ class RadarInterface(RadarInterfaceBase):
     if radar_status['sensorBlocked'] or radar_status['vehDynamicsError']:
       ret.errors.radarFault = True
 
-    for i in range(RADAR_MSG_COUNT // 2):
-      msg_a = self.rcp.vl[f'RadarPoint{i}_A']
-      msg_b = self.rcp.vl[f'RadarPoint{i}_B']
-
-      # Make sure msg A and B are together
-      if msg_a['Index'] != msg_b['Index2']:
-        continue
-
-      if not msg_a['Tracked']:
-        if i in self.pts:
-          del self.pts[i]
-        continue
-
-      if i not in self.pts:
-        self.pts[i] = structs.RadarData.RadarPoint()
-        self.pts[i].trackId = self.track_id
-        self.track_id += 1
-
-      self.pts[i].dRel = msg_a['LongDist']
-      self.pts[i].yRel = msg_a['LatDist']
-      self.pts[i].vRel = msg_a['LongSpeed']
+    a = self.tracks_a.read()
+    # Make sure msg A and B are together
+    paired = a['Index'] == self.tracks_b.read()['Index2']
+    self._update_points(self.indices, paired, a['Tracked'] != 0, None, a['LongDist'], a['LatDist'], a['LongSpeed'])
 
-    ret.points = list(self.pts.values())
+    set_points(ret, self.pts.values())
     return ret
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+import numpy as np
+
+from opendbc.car import rate_limit, structs
+from opendbc.car.common.fastmath import Interp, clip, interp
+from opendbc.car.common.pid import PIDController
+from opendbc.car.lateral import AngleSteeringLimits, apply_driver_steer_torque_limits, apply_meas_steer_torque_limits, apply_std_steer_angle_limits
+from opendbc.car.subaru.values import CarControllerParams as SubaruParams
+from opendbc.car.toyota.values import CarControllerParams as ToyotaParams
+
+
+def timed(fn, n: int) -> float:
+  """us per call"""
+  t = time.perf_counter()
+  for _ in range(n):
+    fn()
+  return (time.perf_counter() - t) / n * 1e6
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Compares the fastmath helpers with the NumPy scalar calls they replace")
+  parser.add_argument("-n", type=int, default=50000, help="iterations of each case")
+  args = parser.parse_args()
+
+  xp, fp = [0., 5., 10., 20., 35.], [1.2, 0.9, 0.7, 0.5, 0.4]
+  table = Interp(xp, fp)
+  print(f"{'call':<34} {'numpy':>9} {'fastmath':>9}  (us)")
+  for name, np_fn, fast_fn in (
+    ("interp", lambda: np.interp(12.3, xp, fp), lambda: interp(12.3, xp, fp)),
+    ("interp, precompiled", lambda: np.interp(12.3, xp, fp), lambda: table(12.3)),
+    ("clip", lambda: np.clip(1.7, -1., 1.), lambda: clip(1.7, -1., 1.)),
+  ):
+    print(f"{name:<34} {timed(np_fn, args.n):>9.2f} {timed(fast_fn, args.n):>9.2f}")
+
+  # the helpers a torque or angle car runs every frame, which now use fastmath
+  driver_limits = SubaruParams(structs.CarParams.new_message(carFingerprint="SUBARU_OUTBACK"))
+  meas_limits = ToyotaParams(structs.CarParams.new_message(carFingerprint="TOYOTA_RAV4"))
+  angle_limits = AngleSteeringLimits(90., ([0., 5., 15.], [5., .8, .15]), ([0., 5., 15.], [5., 3.5, .4]))
+  pid = PIDController(([0., 10., 30.], [1., .8, .5]), ([0., 10., 30.], [.2, .15, .1]), k_f=1., pos_limit=2., neg_limit=-3.5)
+  print()
+  print(f"{'helper':<34} {'us':>9}")
+  for name, fn in (
+    ("PIDController.update", lambda: pid.update(0.3, speed=12.3, feedforward=0.5)),
+    ("apply_driver_steer_torque_limits", lambda: apply_driver_steer_torque_limits(900, 850, 40., driver_limits)),
+    ("apply_meas_steer_torque_limits", lambda: apply_meas_steer_torque_limits(900, 850, 800., meas_limits)),
+    ("apply_std_steer_angle_limits", lambda: apply_std_steer_angle_limits(12., 11.5, 12.3, 11., True, angle_limits)),
+    ("rate_limit", lambda: rate_limit(1.5, 1., -.2, .2)),
+  ):
+    print(f"{name:<34} {timed(fn, args.n):>9.2f}")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import platform as host_platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from opendbc.can import CANPacker
+from opendbc.car import DT_CTRL, structs
+from opendbc.car.can_definitions import CanData
+from opendbc.car.car_helpers import interfaces
+from opendbc.car.profiler import PROFILER
+from opendbc.car.values import PLATFORMS
+
+# End-to-end benchmark of CarInterface.update() + apply(), the car process's hot path. Every platform gets CAN traffic
+# made by packing each message its parsers subscribe to at the message's declared frequency, or replays a recorded segment.
+# Writes a JSON report that can be compared against a previous one:
+#   python opendbc/car/tests/benchmark_interfaces.py --json master.json
+#   python opendbc/car/tests/benchmark_interfaces.py --json pr.json --baseline master.json --max-regression 0.2
+
+# messages a parser only subscribes to when CarState first reads them have no declared frequency
+DEFAULT_FREQUENCY = 10.
+
+
+def car_control(active: bool) -> structs.CarControl:
+  CC = structs.CarControl()
+  CC.enabled = CC.latActive = CC.longActive = active
+  return CC.as_reader()
+
+
+def subscribed_messages(CI) -> list[tuple[CANPacker, int, int, int]]:
+  """Packer, address, bus and send period in frames of every message CI's parsers check"""
+  # parsers subscribe to messages lazily as CarState reads them, run a cycle so they're all known
+  CI.update([])
+  CI.apply(car_control(False), 0)
+
+  msgs = []
+  for cp in CI.can_parsers.values():
+    if cp is None:
+      continue
+    packer = CANPacker(cp.dbc_name)
+    for addr, state in sorted(cp.message_states.items()):
+      freq = state.frequency if state.frequency > 0 else DEFAULT_FREQUENCY
+      msgs.append((packer, addr, cp.bus, max(round(1 / (freq * DT_CTRL)), 1)))
+  return msgs
+
+
+def synthetic_frames(CI, cycles: int) -> list[tuple[int, list[CanData]]]:
+  """One CAN packet per 10ms frame with every message due in it. Signals are zero, counters and checksums are valid."""
+  msgs = subscribed_messages(CI)
+  frames = []
+  for frame in range(cycles):
+    can = [CanData(*packer.make_can_msg(addr, bus, {})) for packer, addr, bus, period in msgs if frame % period == 0]
+    frames.append((int(frame * DT_CTRL * 1e9), can))
+  return frames
+
+
+def recorded_frames(log: str) -> list[tuple[int, list[CanData]]]:
+  from opendbc.car.logreader import LogReader
+  return [(msg.logMonoTime, [CanData(c.address, c.dat, c.src) for c in msg.can])
+          for msg in LogReader(log, only_union_types=True, sort_by_time=True) if msg.which() == 'can']
+
+
+def run(CI, frames, CC) -> None:
+  for nanos, can in frames:
+    CI.update([(nanos, can)])
+    CI.apply(CC, nanos)
+
+
+def benchmark(CarInterface, CP, frames, warm_up: int, active: bool) -> dict:
+  """Steady state us per update() + apply() cycle, its stages, and bytes allocated per cycle. The cycles after
+  the warm-up are timed, profiled and traced in separate passes so neither slows down the other.
+  """
+  CC = car_control(active)
+  warm, timed = frames[:warm_up], frames[warm_up:]
+
+  CI = CarInterface(CP)
+  run(CI, warm, CC)
+  times = np.empty(len(timed))
+  can_valid = 0
+  for i, (nanos, can) in enumerate(timed):
+    t = time.perf_counter_ns()
+    CS = CI.update([(nanos, can)])
+    CI.apply(CC, nanos)
+    times[i] = time.perf_counter_ns() - t
+    can_valid += CS.canValid
+  times /= 1e3
+
+  CI = CarInterface(CP)
+  run(CI, warm, CC)
+  PROFILER.reset()
+  PROFILER.enable()
+  try:
+    run(CI, timed, CC)
+  finally:
+    PROFILER.disable()
+  stages = PROFILER.summary()
+  PROFILER.reset()
+
+  CI = CarInterface(CP)
+  run(CI, warm, CC)
+  peak = np.empty(len(timed))
+  tracemalloc.start()
+  try:
+    start = tracemalloc.get_traced_memory()[0]
+    for i, (nanos, can) in enumerate(timed):
+      tracemalloc.reset_peak()
+      before = tracemalloc.get_traced_memory()[0]
+      CI.update([(nanos, can)])
+      CI.apply(CC, nanos)
+      peak[i] = tracemalloc.get_traced_memory()[1] - before
+    retained = tracemalloc.get_traced_memory()[0] - start
+  finally:
+    tracemalloc.stop()
+
+  return {
+    "cycles": len(timed),
+    "can_valid": can_valid / len(timed),
+    "us": {"mean": times.mean(), "p50": np.percentile(times, 50), "p90": np.percentile(times, 90),
+           "p99": np.percentile(times, 99), "max": times.max()},
+    "stages": stages,
+    # peak bytes allocated during a cycle, and bytes a cycle keeps alive after it returns
+    "alloc_bytes": {"mean": peak.mean(), "max": peak.max()},
+    "retained_bytes": retained / len(timed),
+  }
+
+
+def regressions(report: dict, baseline: dict, max_regression: float) -> list[str]:
+  """Platforms whose mean cycle time grew by more than max_regression over the baseline report"""
+  ret = []
+  for name, result in report["platforms"].items():
+    base = baseline["platforms"].get(name)
+    if base is None or "us" not in result or "us" not in base:
+      continue
+    ratio = result["us"]["mean"] / base["us"]["mean"]
+    if ratio > 1 + max_regression:
+      ret.append(f"{name}: {base['us']['mean']:.1f} -> {result['us']['mean']:.1f} us ({ratio - 1:+.0%})")
+  return ret
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmarks each platform's CarInterface update() + apply() cycle on synthetic or recorded CAN")
+  parser.add_argument("platforms", nargs="*", help="platforms or brands to benchmark, defaults to all")
+  parser.add_argument("--log", help="replay CAN from this segment's log instead of synthetic traffic, needs a single platform")
+  parser.add_argument("--cycles", type=int, default=500, help="timed cycles per platform, after the warm-up")
+  parser.add_argument("--warm-up", type=int, default=100, help="cycles run before timing, parsers need a few to become valid")
+  parser.add_argument("--disengaged", action="store_true", help="run apply() with controls inactive")
+  parser.add_argument("--json", help="write the report here")
+  parser.add_argument("--baseline", help="report to compare against")
+  parser.add_argument("--max-regression", type=float, default=0.2, help="fail if any platform's mean time grew by more than this fraction over the baseline")
+  args = parser.parse_args()
+
+  platforms = [p for p in PLATFORMS if not args.platforms or p in args.platforms or
+               type(PLATFORMS[p]).__module__.split('.')[-2] in args.platforms]
+  if args.log is not None:
+    assert len(platforms) == 1, "--log needs exactly one platform"
+    log_frames = recorded_frames(args.log)
+
+  report = {
+    "meta": {"python": sys.version.split()[0], "machine": host_platform.machine(), "source": args.log or "synthetic",
+             "cycles": args.cycles, "warm_up": args.warm_up, "engaged": not args.disengaged},
+    "platforms": {},
+  }
+  for name in platforms:
+    try:
+      CarInterface = interfaces[name]
+    except ModuleNotFoundError as e:
+      report["platforms"][name] = {"error": str(e)}
+      continue
+
+    CP = CarInterface.get_non_essential_params(name)
+    if args.log is not None and len(log_frames) <= args.warm_up:
+      report["platforms"][name] = {"error": f"only {len(log_frames)} frames, not more than --warm-up"}
+      continue
+
+    # a platform whose CarState can't handle the traffic is reported, not fatal to the whole run
+    try:
+      if args.log is not None:
+        frames = log_frames[:args.warm_up + args.cycles]
+      else:
+        frames = synthetic_frames(CarInterface(CP), args.warm_up + args.cycles)
+      result = benchmark(CarInterface, CP, frames, args.warm_up, not args.disengaged)
+    except Exception as e:
+      report["platforms"][name] = {"error": f"{type(e).__name__}: {e}"}
+      continue
+    report["platforms"][name] = result
+    us = result["us"]
+    print(f"{name:<40} mean {us['mean']:7.1f} us, p99 {us['p99']:7.1f} us, {result['alloc_bytes']['mean'] / 1024:6.1f} KiB allocated/cycle, " +
+          f"canValid {result['can_valid']:.0%}")
+
+  errors = {name: r["error"] for name, r in report["platforms"].items() if "error" in r}
+  for name, error in errors.items():
+    print(f"{name:<40} skipped: {error}")
+
+  if args.json:
+    with open(args.json, "w") as f:
+      json.dump(report, f, indent=2, default=float)
+
+  if args.baseline:
+    with open(args.baseline) as f:
+      slower = regressions(report, json.load(f), args.max_regression)
+    for line in slower:
+      print(f"regression: {line}")
+    if slower:
+      return 1
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import argparse
+import random
+import time
+
+from opendbc.car import mirrors, structs
+from opendbc.car.tests.test_mirrors import is_mirror, random_fill
+
+
+def value_fields(m) -> list[str]:
+  return [name for name in m.__dataclass_fields__ if not is_mirror(getattr(m, name)) and not isinstance(getattr(m, name), list)]
+
+
+def timed(fn, n: int) -> float:
+  """us per call"""
+  t = time.perf_counter()
+  for _ in range(n):
+    fn()
+  return (time.perf_counter() - t) / n * 1e6
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Compares capnp structs with their mirrors for the CarState and CarControl access patterns")
+  parser.add_argument("-n", type=int, default=5000, help="iterations of each case")
+  args = parser.parse_args()
+
+  src = mirrors.CarState()
+  random_fill(src, random.Random(0))
+  names = value_fields(src)
+  values = [(name, getattr(src, name)) for name in names]
+  cruise_values = [(name, getattr(src.cruiseState, name)) for name in value_fields(src.cruiseState)]
+
+  # CarState.update sets every field, then CarInterfaceBase and the CarController read them
+  def write_capnp():
+    CS = structs.CarState()
+    for name, value in values:
+      setattr(CS, name, value)
+    cs = CS.cruiseState
+    for name, value in cruise_values:
+      setattr(cs, name, value)
+    return CS
+
+  def write_mirror():
+    CS = mirrors.CarState()
+    for name, value in values:
+      setattr(CS, name, value)
+    cs = CS.cruiseState
+    for name, value in cruise_values:
+      setattr(cs, name, value)
+    return CS
+
+  capnp_cs, mirror_cs = write_capnp(), write_mirror()
+
+  def read(CS):
+    def fn():
+      for name in names:
+        getattr(CS, name)
+    return fn
+
+  # controllers go through CC.actuators for every actuator they read
+  def read_actuators(CC):
+    def fn():
+      for name in actuator_names:
+        getattr(CC.actuators, name)
+    return fn
+
+  CC = mirrors.CarControl()
+  random_fill(CC, random.Random(1))
+  cc_reader = mirrors.to_capnp(CC).as_reader()
+  actuator_names = value_fields(CC.actuators)
+
+  cases = [
+    ("CarState: set fields", timed(write_capnp, args.n), timed(write_mirror, args.n)),
+    ("CarState: read fields", timed(read(capnp_cs), args.n), timed(read(mirror_cs), args.n)),
+    ("CarState: to capnp", None, timed(lambda: mirrors.to_capnp(mirror_cs), args.n)),
+    ("CarState: from capnp", None, timed(lambda: mirrors.from_capnp(capnp_cs.as_reader()), args.n)),
+    ("CarControl: read actuators", timed(read_actuators(cc_reader), args.n), timed(read_actuators(CC), args.n)),
+    ("CarControl: from capnp", None, timed(lambda: mirrors.from_capnp(cc_reader), args.n)),
+  ]
+
+  print(f"{len(names)} CarState fields, {len(actuator_names)} actuators")
+  print(f"{'case':<28} {'capnp':>9} {'mirror':>9}  (us)")
+  for name, capnp_us, mirror_us in cases:
+    capnp_col = "-" if capnp_us is None else f"{capnp_us:.2f}"
+    print(f"{name:<28} {capnp_col:>9} {mirror_us:>9.2f}")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+import argparse
+import importlib
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from opendbc.can import CANPacker
+from opendbc.car import Bus, structs
+from opendbc.car.ford.values import RADAR as FORD_RADAR
+from opendbc.car.tests.test_radar_tracks import random_values
+from opendbc.car.values import BRANDS
+
+
+def brand_platform(brand):
+  """First platform of brand with a radar parser, and its radar interface class"""
+  RadarInterface = importlib.import_module(f"{brand.__module__.rsplit('.', 1)[0]}.radar_interface").RadarInterface
+  for platform in brand:
+    if Bus.radar not in platform.config.dbc_dict:
+      continue
+    CP = structs.CarParams(carFingerprint=platform, flags=int(platform.config.flags))
+    if RadarInterface(CP).rcp is not None:
+      return CP, RadarInterface
+  return None, RadarInterface
+
+
+def random_frames(CP, RadarInterface, cycles: int, seed: int = 0):
+  rng = random.Random(seed)
+  rcp = RadarInterface(CP).rcp
+  if rcp.dbc_name == FORD_RADAR.DELPHI_MRR:
+    # random scan indices would leave the MRR radar unavailable, send ordered scans instead
+    from opendbc.car.ford.tests.benchmark_radar import synthetic_frames
+    return synthetic_frames(CP, 15, cycles, seed)
+
+  packer = CANPacker(rcp.dbc_name)
+  msgs = [packer.dbc.addr_to_msg[addr] for addr in sorted(rcp.message_states)]
+  return [(cycle * 50_000_000, [packer.make_can_msg(msg.address, rcp.bus, random_values(rng, msg)) for msg in msgs]) for cycle in range(cycles)]
+
+
+def benchmark(CP, RadarInterface, frames):
+  """Time in ms and peak bytes allocated for each update that published RadarData"""
+  radar = RadarInterface(CP)
+  times = []
+  for frame in frames:
+    t = time.perf_counter()
+    rr = radar.update([frame])
+    dt = time.perf_counter() - t
+    if rr is not None:
+      times.append(dt * 1e3)
+
+  # a second pass under tracemalloc, which slows down every allocation
+  radar = RadarInterface(CP)
+  allocated = []
+  tracemalloc.start()
+  for frame in frames:
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    rr = radar.update([frame])
+    if rr is not None:
+      allocated.append(tracemalloc.get_traced_memory()[1] - before)
+  tracemalloc.stop()
+  return np.array(times), np.array(allocated)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Benchmarks each brand's radar interface on random radar tracks")
+  parser.add_argument("brands", nargs="*", help="brands to benchmark, defaults to all with a radar")
+  parser.add_argument("--cycles", type=int, default=1000, help="radar frames per brand")
+  parser.add_argument("--max-ms", type=float, help="fail if any brand's mean time per update is above this")
+  args = parser.parse_args()
+
+  over = False
+  for brand in BRANDS:
+    name = brand.__module__.split('.')[-2]
+    if args.brands and name not in args.brands:
+      continue
+    try:
+      CP, RadarInterface = brand_platform(brand)
+    except ModuleNotFoundError:
+      continue
+    if CP is None:
+      continue
+
+    times, allocated = benchmark(CP, RadarInterface, random_frames(CP, RadarInterface, args.cycles))
+    print(f"{name:<12} {CP.carFingerprint:<32} {len(times):5d} updates, mean {times.mean():.3f} ms, max {times.max():.3f} ms, " +
+          f"{allocated.mean() / 1024:7.1f} KiB allocated/update")
+    over |= args.max_ms is not None and times.mean() > args.max_ms
+
+  return 1 if over else 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+import argparse
+import random
+import time
+
+from opendbc.car.secoc import SecOCSigner, add_mac, build_sync_mac
+
+
+def macs_per_sec(fn, n: int) -> float:
+  t = time.perf_counter()
+  for _ in range(n):
+    fn()
+  return n / (time.perf_counter() - t)
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Compares SecOCSigner with add_mac and build_sync_mac")
+  parser.add_argument("-n", type=int, default=20000, help="MACs per case")
+  args = parser.parse_args()
+
+  rng = random.Random(0)
+  key = rng.randbytes(16)
+  msg = (0x2e4, rng.randbytes(8), 0)  # STEERING_LKA
+  signer = SecOCSigner(key)
+
+  print(f"{'case':<16} {'add_mac':>12} {'SecOCSigner':>12}  (MACs/s)")
+  for name, fn, signer_fn in (
+    ("add_mac", lambda: add_mac(key, 1234, 56789, 12, msg), lambda: signer.add_mac(1234, 56789, 12, msg)),
+    ("build_sync_mac", lambda: build_sync_mac(key, 1234, 56789), lambda: signer.build_sync_mac(1234, 56789)),
+  ):
+    assert fn() == signer_fn()
+    before, after = macs_per_sec(fn, args.n), macs_per_sec(signer_fn, args.n)
+    print(f"{name:<16} {before:>12,.0f} {after:>12,.0f}  {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+  main()
@@ -20,6 +20,7 @@ from opendbc.car import structs
 from opendbc.car.can_definitions import CanData
 from opendbc.car.car_helpers import can_fingerprint, interfaces
 from opendbc.car.logreader import LogReader, decompress_stream
+from opendbc.car.profiler import PROFILER, CycleProfiler
 
 
 TOLERANCE = 1e-4
@@ -81,10 +82,16 @@ def replay_segment(platform: str, can_msgs: list[Any]) -> tuple[structs.CarParam
 
 
 def process_segment(args: tuple) -> Result:
-  platform, seg, ref_path, update = args
+  platform, seg, ref_path, update, profile = args
   try:
     can_msgs = load_can_messages(seg)
+    if profile:
+      PROFILER.reset()
+      PROFILER.enable()
     CP, states, timestamps = replay_segment(platform, can_msgs)
+    if profile:
+      PROFILER.disable()
+      PROFILER.save(str(profile_path(ref_path, platform, seg)))
     ref_file = Path(ref_path) / f"{platform}_{seg.replace('/', '_')}.zst"
 
     if update:
@@ -109,6 +116,10 @@ def process_segment(args: tuple) -> Result:
     return (platform, seg, [], None, None, traceback.format_exc())
 
 
+def profile_path(ref_path: Path, platform: str, seg: str) -> Path:
+  return Path(ref_path) / f"{platform}_{seg.replace('/', '_')}.profile.json"
+
+
 def get_changed_platforms(cwd: Path, database: dict[str, Any], interfaces: dict[str, Any]) -> list[str]:
   git_ref = os.environ.get("GIT_REF", "origin/master")
   changed = subprocess.check_output(["git", "diff", "--name-only", f"{git_ref}...HEAD"], cwd=cwd, encoding='utf8').strip()
@@ -131,8 +142,9 @@ def download_refs(ref_path: Path, platforms: list[str], segments: dict[str, list
         (Path(ref_path) / filename).write_bytes(resp.read())
 
 
-def run_replay(platforms: list[str], segments: dict[str, list[str]], ref_path: Path, update: bool, workers: int = 4) -> list[Result]:
-  work = [(platform, seg, ref_path, update)
+def run_replay(platforms: list[str], segments: dict[str, list[str]], ref_path: Path, update: bool, workers: int = 4,
+               profile: bool = False) -> list[Result]:
+  work = [(platform, seg, ref_path, update, profile)
           for platform in platforms for seg in segments.get(platform, [])]
   return process_map(process_segment, work, max_workers=workers)
 
@@ -247,7 +259,21 @@ def format_diff(diffs: list[Diff], ref: list[Ref], states: list[structs.CarState
   return format_numeric_diffs(diffs)
 
 
-def main(platform: str | None = None, segments_per_platform: int = 10, update_refs: bool = False, all_platforms: bool = False) -> int:
+def format_profiles(ref_path: Path, segments: dict[str, list[str]]) -> list[str]:
+  lines = []
+  for platform, segs in segments.items():
+    profiler = CycleProfiler()
+    for seg in segs:
+      path = profile_path(ref_path, platform, seg)
+      if path.exists():
+        profiler.merge(CycleProfiler.load(str(path)))
+    if profiler.histograms:
+      lines += [f"\n{platform}", profiler.report()]
+  return lines
+
+
+def main(platform: str | None = None, segments_per_platform: int = 10, update_refs: bool = False, all_platforms: bool = False,
+         profile: bool = False) -> int:
   from comma_car_segments import get_comma_car_segments_database
   cwd = Path(__file__).resolve().parents[3]
   ref_path = cwd / DIFF_BUCKET
@@ -284,7 +310,7 @@ def main(platform: str | None = None, segments_per_platform: int = 10, update_re
     return 0
 
   download_refs(ref_path, platforms, segments)
-  results = run_replay(platforms, segments, ref_path, update=False)
+  results = run_replay(platforms, segments, ref_path, update=False, profile=profile)
   with_diffs = [(platform, seg, diffs, ref, states)
                 for platform, seg, diffs, ref, states, err in results if diffs]
   errors = [(platform, seg, err) for platform, seg, diffs, ref, states, err in results if err]
@@ -312,6 +338,12 @@ def main(platform: str | None = None, segments_per_platform: int = 10, update_re
           print(line)
     print("```\n</details>")
 
+  if profile:
+    print("<details><summary><b>Show cycle times</b></summary>\n\n```")
+    for line in format_profiles(ref_path, segments):
+      print(line)
+    print("```\n</details>")
+
   return 1 if errors else 0
 
 
@@ -321,5 +353,6 @@ if __name__ == "__main__":
   parser.add_argument("--segments-per-platform", type=int, default=10, help="number of segments to diff per platform")
   parser.add_argument("--update-refs", action="store_true", help="update refs based on current commit")
   parser.add_argument("--all", action="store_true", help="run diff on all platforms")
+  parser.add_argument("--profile", action="store_true", help="report per-stage cycle times of each platform's replay")
   args = parser.parse_args()
-  sys.exit(main(args.platform, args.segments_per_platform, args.update_refs, args.all))
+  sys.exit(main(args.platform, args.segments_per_platform, args.update_refs, args.all, args.profile))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+import argparse
+import subprocess
+import sys
+
+from opendbc.car.values import BRANDS
+
+COMMON_MODULE = "opendbc.car.interfaces"
+
+
+def brand_names() -> list[str]:
+  return sorted({brand.__module__.split('.')[-2] for brand in BRANDS})
+
+
+def _top_level_imports(code: str) -> dict[str, int]:
+  # -X importtime lines look like "import time: self [us] | cumulative | imported package",
+  # nested imports are indented under their parent so only count the outermost ones
+  stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True).stderr
+  ret = {}
+  for line in stderr.splitlines():
+    if not line.startswith("import time:"):
+      continue
+    _, cumulative, name = line.split(":", 1)[1].split("|")
+    if cumulative.strip().isdigit() and not name.startswith("  "):
+      ret[name.strip()] = int(cumulative)
+  return ret
+
+
+def import_time_ms(module: str, runs: int = 3) -> float:
+  """Time to import module in a fresh interpreter, excluding the interpreter's own startup imports"""
+  startup = _top_level_imports("pass")
+  best = None
+  for _ in range(runs):
+    imports = _top_level_imports(f"import {module}")
+    total = sum(us for name, us in imports.items() if name not in startup) / 1000
+    best = total if best is None else min(best, total)
+  return best
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Measures the import time of each brand's CarInterface in a fresh interpreter")
+  parser.add_argument("brands", nargs="*", default=brand_names(), help="brands to measure, defaults to all")
+  parser.add_argument("--runs", type=int, default=3, help="the fastest of this many imports is reported")
+  parser.add_argument("--max-ms", type=float, help="fail if any brand takes longer than this to import")
+  args = parser.parse_args()
+
+  common = import_time_ms(COMMON_MODULE, args.runs)
+  print(f"{'common (' + COMMON_MODULE + ')':<40} {common:8.1f} ms")
+
+  failed, over = [], []
+  for brand in args.brands:
+    try:
+      ms = import_time_ms(f"opendbc.car.{brand}.interface", args.runs)
+    except subprocess.CalledProcessError as e:
+      print(f"{brand:<40} import failed: {e.stderr.strip().splitlines()[-1]}")
+      failed.append(brand)
+      continue
+    print(f"{brand:<40} {ms:8.1f} ms  ({ms - common:+.1f} ms over common)")
+    if args.max_ms is not None and ms > args.max_ms:
+      over.append(brand)
+
+  if failed:
+    print(f"\nFailed to import: {', '.join(failed)}")
+  if over:
+    print(f"\nOver the {args.max_ms} ms bound: {', '.join(over)}")
+  return 1 if failed or over else 0
+
+if __name__ == "__main__":
+  raise SystemExit(main())
@@ -1,11 +1,15 @@
 import math
+import subprocess
+import sys
 import unittest
+from unittest import mock
 
-from opendbc.car import DT_CTRL, CanData, structs
-from opendbc.car.car_helpers import interfaces
+from opendbc.car import DT_CTRL, STD_CARGO_KG, CanData, gen_empty_fingerprint, mirrors, structs
+from opendbc.car.car_helpers import get_all_car_params, interfaces
 from opendbc.car.fingerprints import FW_VERSIONS
 from opendbc.car.fw_versions import FW_QUERY_CONFIGS
 from opendbc.car.interfaces import CarInterfaceBase, get_interface_attr
+from opendbc.car.overrides import VEHICLE_MASS
 from opendbc.car.values import PLATFORMS
 from opendbc.testing import Fuzzy, fuzzy_test
 
@@ -77,7 +81,9 @@ def _make_car_test(car_name):
     CC.longActive = True
     CC = CC.as_reader()
     for _ in range(10):
-      car_interface.update([])
+      CS = car_interface.update([])
+      # the CarController reads the same values that are published
+      assert car_interface.CS.out == mirrors.from_capnp(CS.as_reader())
       car_interface.apply(CC, now_nanos)
       now_nanos += DT_CTRL * 1e9  # 10ms
 
@@ -126,6 +132,50 @@ class TestCarInterfaces(unittest.TestCase):
     none_brands_in_ret = none_brands.intersection(ret)
     assert len(none_brands_in_ret) == 0, f'Brands with None values in ignore_none=True result: {none_brands_in_ret}'
 
+  def test_lazy_interfaces(self):
+    """Brand interfaces are only imported when first accessed"""
+    assert set(interfaces) == set(PLATFORMS)
+    assert interfaces[next(iter(PLATFORMS))] is not None
+
+    code = """
+import sys
+from opendbc.car.car_helpers import interfaces
+loaded = lambda: sorted(m for m in sys.modules if m.startswith('opendbc.car.') and m.endswith('.interface'))
+assert loaded() == [], loaded()
+interfaces['HONDA_CIVIC']
+assert loaded() == ['opendbc.car.honda.interface'], loaded()
+"""
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+  def test_template_params(self):
+    all_params = get_all_car_params()
+    assert list(all_params) == [str(p) for p in PLATFORMS]
+    # copies are compacted, so compare them as text rather than bytes
+    for car_name, CP in all_params.items():
+      with self.subTest(car_name=car_name):
+        CarInterface = interfaces[car_name]
+        assert str(CP) == str(CarInterface.get_params(car_name, gen_empty_fingerprint(), [], False, False, False))
+
+    # docs params are cached separately, with a placeholder FW version
+    CarInterface = interfaces['TOYOTA_RAV4']
+    docs_params = CarInterface.get_params('TOYOTA_RAV4', gen_empty_fingerprint(), [structs.CarParams.CarFw(ecu=structs.CarParams.Ecu.unknown)],
+                                          True, True, True)
+    assert str(CarInterface.get_template_params('TOYOTA_RAV4', True, True, True)) == str(docs_params)
+
+    # every call gets its own copy
+    CP = CarInterface.get_non_essential_params('TOYOTA_RAV4')
+    CP.mass = 1.
+    CP.lateralTuning.torque.friction = 10.
+    assert CarInterface.get_non_essential_params('TOYOTA_RAV4').mass == all_params['TOYOTA_RAV4'].mass != 1.
+    assert CarInterface.get_non_essential_params('TOYOTA_RAV4').lateralTuning.torque.friction != 10.
+
+  def test_template_params_mass_override(self):
+    CarInterface = interfaces['HONDA_CIVIC']
+    mass = CarInterface.get_non_essential_params('HONDA_CIVIC').mass
+    with mock.patch.object(VEHICLE_MASS, 'poll'), mock.patch.object(VEHICLE_MASS, 'value', 1000.):
+      assert CarInterface.get_non_essential_params('HONDA_CIVIC').mass == 1000. + STD_CARGO_KG
+    assert CarInterface.get_non_essential_params('HONDA_CIVIC').mass == mass
+
 
 for car_name in sorted(PLATFORMS):
   setattr(TestCarInterfaces, f'test_car_interfaces_{car_name}', _make_car_test(car_name))
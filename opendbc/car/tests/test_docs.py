@@ -1,8 +1,11 @@
 from collections import defaultdict
+import os
+import tempfile
 import unittest
 
 from opendbc.car.car_helpers import interfaces
-from opendbc.car.docs import get_all_car_docs
+from opendbc.car.docs import EXTRA_CARS_MD_TEMPLATE, EXTRA_PLATFORMS, _read_docs_cache, _render_cars_md, _write_docs_cache, generate_cars_md, \
+                             get_all_car_docs, get_cars_table_rows
 from opendbc.car.docs_definitions import Cable, Column, PartType, Star, SupportType
 from opendbc.car.honda.values import CAR as HONDA
 from opendbc.car.values import PLATFORMS
@@ -77,3 +80,34 @@ class TestCarDocs(unittest.TestCase):
         assert car_part_type.count(PartType.connector) == 1, f"Need to specify one harness connector: {car.name}"
         assert car_part_type.count(PartType.mount) == 1, f"Need to specify one mount: {car.name}"
         assert Cable.obd_c_cable_2ft in car_parts, f"Need to specify an OBD-C cable (2ft): {car.name}"
+
+
+class TestCarsMdCache(unittest.TestCase):
+  def test_cached_rows(self):
+    expected = generate_cars_md(get_all_car_docs(), EXTRA_CARS_MD_TEMPLATE)
+    with tempfile.TemporaryDirectory() as tmp:
+      cache_path = os.path.join(tmp, "docs_cache.db")
+      rows, rebuilt = get_cars_table_rows(cache_path)
+      assert _render_cars_md(rows, EXTRA_CARS_MD_TEMPLATE) == expected
+      assert rebuilt == list(EXTRA_PLATFORMS)
+
+      rows, rebuilt = get_cars_table_rows(cache_path)
+      assert _render_cars_md(rows, EXTRA_CARS_MD_TEMPLATE) == expected
+      assert rebuilt == []
+
+      # only the platform whose sources changed is rebuilt
+      entries = _read_docs_cache(cache_path)
+      platform = str(HONDA.HONDA_CIVIC)
+      entries[platform] = (b"stale", entries[platform][1])
+      _write_docs_cache(cache_path, entries)
+      rows, rebuilt = get_cars_table_rows(cache_path)
+      assert _render_cars_md(rows, EXTRA_CARS_MD_TEMPLATE) == expected
+      assert rebuilt == [platform]
+
+  def test_invalid_cache(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      cache_path = os.path.join(tmp, "docs_cache.db")
+      with open(cache_path, "wb") as f:
+        f.write(b"not a cache")
+      assert _read_docs_cache(cache_path) == {}
+      assert get_cars_table_rows(cache_path)[1] == list(EXTRA_PLATFORMS)
@@ -0,0 +1,49 @@
+import math
+import random
+import unittest
+
+import numpy as np
+
+from opendbc.car.common.fastmath import Interp, clip, interp
+
+
+def random_table(rng: random.Random) -> tuple[list[float], list[float]]:
+  n = rng.randint(1, 6)
+  # repeated breakpoints make steps
+  xp = sorted(rng.choice([rng.uniform(-50., 50.), float(rng.randint(-5, 5))]) for _ in range(n))
+  return xp, [rng.uniform(-10., 10.) for _ in range(n)]
+
+
+class TestFastMath(unittest.TestCase):
+  def test_interp(self):
+    rng = random.Random(0)
+    for _ in range(5000):
+      xp, fp = random_table(rng)
+      table = Interp(xp, fp)
+      for x in (rng.uniform(-60., 60.), rng.choice(xp), xp[0] - 1., xp[-1] + 1.):
+        expected = float(np.interp(x, xp, fp))
+        assert interp(x, xp, fp) == expected, (x, xp, fp)
+        assert table(x) == expected, (x, xp, fp)
+
+    assert math.isnan(interp(math.nan, [0., 1.], [0., 1.]))
+    assert math.isnan(Interp([0., 1.], [0., 1.])(math.nan))
+
+  def test_interp_table(self):
+    with self.assertRaises(AssertionError):
+      Interp([1., 0.], [0., 1.])
+    with self.assertRaises(AssertionError):
+      Interp([0., 1.], [0.])
+    assert Interp([0, 10], [1, 3])(5) == 2.
+
+  def test_clip(self):
+    rng = random.Random(1)
+    for _ in range(5000):
+      x, lo, hi = (rng.uniform(-10., 10.) for _ in range(3))
+      assert clip(x, lo, hi) == float(np.clip(x, lo, hi)), (x, lo, hi)
+
+    assert clip(5, 0, 3) == 3 and isinstance(clip(5, 0, 3), int)
+    assert math.isnan(clip(math.nan, 0., 1.))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+from opendbc.car.fingerprint_db import _source_files, build_db, combine_brands, load_db, read_db, write_db
+from opendbc.car.interfaces import get_interface_attr
+
+
+class TestFingerprintDB(unittest.TestCase):
+  def test_matches_source_modules(self):
+    db = load_db()
+    for attr in ("FW_VERSIONS", "FINGERPRINTS"):
+      with self.subTest(attr=attr):
+        brands = get_interface_attr(attr, ignore_none=True)
+        assert db[attr] == brands
+        assert list(combine_brands(db[attr])) == list(get_interface_attr(attr, combine_brands=True, ignore_none=True))
+
+        # platforms keep their enum types
+        for brand, data in brands.items():
+          assert [type(p) for p in db[attr][brand]] == [type(p) for p in data]
+
+  def test_source_files(self):
+    # platforms are defined in values.py, so renaming one there must invalidate the database too
+    names = {os.path.basename(fn) for fn in _source_files()}
+    assert names == {"fingerprints.py", "values.py"}
+
+  def test_round_trip(self):
+    db = build_db()
+    with tempfile.TemporaryDirectory() as tmp:
+      path = os.path.join(tmp, "fingerprints.db")
+      assert read_db(path) is None
+
+      write_db(db, path)
+      assert read_db(path) == db
+
+  def test_stale(self):
+    db = build_db()
+    with tempfile.TemporaryDirectory() as tmp:
+      path = os.path.join(tmp, "fingerprints.db")
+      write_db(db, path, digest=b"\x00" * 32)
+      assert read_db(path) is None
+
+      # rebuilt from the sources in memory, only the build writes the database
+      assert load_db(path) == load_db()
+      assert read_db(path) is None
+
+      write_db(db, path)
+
+      with open(path, "r+b") as f:
+        f.truncate(100)
+      assert read_db(path) is None
+
+
+if __name__ == "__main__":
+  unittest.main()
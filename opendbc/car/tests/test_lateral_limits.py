@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
+import math
 import unittest
 import importlib
-from opendbc.testing import parameterized_class
 
 from opendbc.car import DT_CTRL
 from opendbc.car.car_helpers import interfaces
 from opendbc.car.interfaces import get_torque_params
-from opendbc.car.lateral import ISO_LATERAL_ACCEL
+from opendbc.car.lateral import ISO_LATERAL_ACCEL, AngleSteeringLimitsVM, apply_std_steer_angle_limits, apply_steer_angle_limits_vm
+from opendbc.car.lateral_envelope import compute_envelope
 from opendbc.car.values import PLATFORMS
+from opendbc.car.vehicle_model import VehicleModel
 
 # ISO 11270 - allowed up jerk is strictly lower than recommended limits
 MAX_LAT_JERK_UP = 2.5            # m/s^3
@@ -18,52 +20,116 @@ MAX_LAT_JERK_UP_TOLERANCE = 0.5  # m/s^3
 JERK_MEAS_T = 0.5
 
 
-@parameterized_class('car_model', [(c,) for c in sorted(PLATFORMS)])
-class TestLateralLimits(unittest.TestCase):
-  car_model: str
+def control_params(platform: str):
+  CP = interfaces[platform].get_non_essential_params(platform)
+  CarControllerParams = importlib.import_module(f'opendbc.car.{CP.brand}.values').CarControllerParams
+  return CarControllerParams(CP)
 
-  @classmethod
-  def setUpClass(cls):
-    if 'car_model' not in cls.__dict__:
-      raise unittest.SkipTest('Base class')
 
-    CarInterface = interfaces[cls.car_model]
-    CP = CarInterface.get_non_essential_params(cls.car_model)
+def calculate_0_5s_jerk(control_params, torque_params):
+  steer_step = control_params.STEER_STEP
+  max_lat_accel = torque_params['MAX_LAT_ACCEL_MEASURED']
 
-    if cls.car_model == 'MOCK':
-      raise unittest.SkipTest('Mock car')
+  # Steer up/down delta per 10ms frame, in percentage of max torque
+  steer_up_per_frame = control_params.STEER_DELTA_UP / control_params.STEER_MAX / steer_step
+  steer_down_per_frame = control_params.STEER_DELTA_DOWN / control_params.STEER_MAX / steer_step
+
+  # Lateral acceleration reached in 0.5 seconds, clipping to max torque
+  accel_up_0_5_sec = min(steer_up_per_frame * JERK_MEAS_T / DT_CTRL, 1.0) * max_lat_accel
+  accel_down_0_5_sec = min(steer_down_per_frame * JERK_MEAS_T / DT_CTRL, 1.0) * max_lat_accel
+
+  # Convert to m/s^3
+  return accel_up_0_5_sec / JERK_MEAS_T, accel_down_0_5_sec / JERK_MEAS_T
 
-    # TODO: test all platforms
-    if CP.steerControlType != 'torque':
-      raise unittest.SkipTest
 
-    if CP.notCar:
-      raise unittest.SkipTest
+def limit_stepper(platform: str, control_type: str):
+  """The limit helper a platform's controller runs each step, and the lateral accel of its output"""
+  CP = interfaces[platform].get_non_essential_params(platform)
+  CarControllerParams = importlib.import_module(f'opendbc.car.{CP.brand}.values').CarControllerParams
+  params = CarControllerParams() if CarControllerParams.__init__ is object.__init__ else CarControllerParams(CP)
+  steer_step = getattr(params, "STEER_STEP", 1)
+  VM = VehicleModel(CP)
 
-    CarControllerParams = importlib.import_module(f'opendbc.car.{CP.brand}.values').CarControllerParams
-    cls.control_params = CarControllerParams(CP)
-    cls.torque_params = get_torque_params()[cls.car_model]
+  if control_type == "curvature":
+    def apply(target, last, v_ego):
+      return params.CURVATURE_LIMITS.apply_limits(target, last, v_ego, 0., True, steer_step)
+  elif isinstance(params.ANGLE_LIMITS, AngleSteeringLimitsVM):
+    def apply(target, last, v_ego):
+      return apply_steer_angle_limits_vm(target, last, v_ego, 0., True, params, VM)
+  else:
+    def apply(target, last, v_ego):
+      return apply_std_steer_angle_limits(target, last, v_ego, 0., True, params.ANGLE_LIMITS)
 
-  @staticmethod
-  def calculate_0_5s_jerk(control_params, torque_params):
-    steer_step = control_params.STEER_STEP
-    max_lat_accel = torque_params['MAX_LAT_ACCEL_MEASURED']
+  def lat_accel(value, v_ego):
+    curvature = value if control_type == "curvature" else VM.calc_curvature(math.radians(value), v_ego, 0.)
+    return abs(curvature) * v_ego ** 2
 
-    # Steer up/down delta per 10ms frame, in percentage of max torque
-    steer_up_per_frame = control_params.STEER_DELTA_UP / control_params.STEER_MAX / steer_step
-    steer_down_per_frame = control_params.STEER_DELTA_DOWN / control_params.STEER_MAX / steer_step
+  return apply, lat_accel, steer_step
 
-    # Lateral acceleration reached in 0.5 seconds, clipping to max torque
-    accel_up_0_5_sec = min(steer_up_per_frame * JERK_MEAS_T / DT_CTRL, 1.0) * max_lat_accel
-    accel_down_0_5_sec = min(steer_down_per_frame * JERK_MEAS_T / DT_CTRL, 1.0) * max_lat_accel
 
-    # Convert to m/s^3
-    return accel_up_0_5_sec / JERK_MEAS_T, accel_down_0_5_sec / JERK_MEAS_T
+class TestLateralLimits(unittest.TestCase):
+  @classmethod
+  def setUpClass(cls):
+    # every platform in one pass, rather than one test class per platform
+    cls.envelope = compute_envelope()
+
+  def torque_platforms(self):
+    # TODO: test all platforms
+    return [(i, platform) for i, platform in enumerate(self.envelope.platforms) if self.envelope.control_types[i] == "torque"]
 
   def test_jerk_limits(self):
-    up_jerk, down_jerk = self.calculate_0_5s_jerk(self.control_params, self.torque_params)
-    assert up_jerk <= MAX_LAT_JERK_UP + MAX_LAT_JERK_UP_TOLERANCE
-    assert down_jerk <= MAX_LAT_JERK_DOWN
+    # computed here from the controller and torque params, independently of the envelope
+    for i, platform in self.torque_platforms():
+      with self.subTest(platform=platform):
+        up_jerk, down_jerk = calculate_0_5s_jerk(control_params(platform), get_torque_params()[platform])
+        assert up_jerk <= MAX_LAT_JERK_UP + MAX_LAT_JERK_UP_TOLERANCE
+        assert down_jerk <= MAX_LAT_JERK_DOWN
+
+        assert all(math.isclose(jerk, up_jerk) for jerk in self.envelope.max_jerk_up[i])
+        assert all(math.isclose(jerk, down_jerk) for jerk in self.envelope.max_jerk_down[i])
 
   def test_max_lateral_accel(self):
-    assert self.torque_params["MAX_LAT_ACCEL_MEASURED"] <= ISO_LATERAL_ACCEL
+    for i, platform in self.torque_platforms():
+      with self.subTest(platform=platform):
+        max_lat_accel = get_torque_params()[platform]["MAX_LAT_ACCEL_MEASURED"]
+        assert max_lat_accel <= ISO_LATERAL_ACCEL
+        assert all(math.isclose(accel, max_lat_accel) for accel in self.envelope.max_lat_accel[i])
+
+  def test_all_platforms(self):
+    for platform in sorted(PLATFORMS):
+      CP = interfaces[platform].get_non_essential_params(platform)
+      if platform != "MOCK" and not CP.notCar and CP.steerControlType == "torque":
+        assert platform in self.envelope.platforms, platform
+    assert self.envelope.max_lat_accel.shape == (len(self.envelope.platforms), len(self.envelope.speeds))
+
+  def test_matches_limit_helpers(self):
+    # the vectorized envelope against stepping the controllers' limit helpers for JERK_MEAS_T
+    for i, platform in enumerate(self.envelope.platforms):
+      control_type = self.envelope.control_types[i]
+      if control_type == "torque":
+        continue
+
+      apply, lat_accel, steer_step = limit_stepper(platform, control_type)
+
+      for j, v_ego in enumerate(self.envelope.speeds):
+        v_ego = float(v_ego)
+        with self.subTest(platform=platform, v_ego=v_ego):
+          # wind up from straight, then back down from the max
+          up = 0.
+          for _ in range(round(JERK_MEAS_T / (DT_CTRL * steer_step))):
+            up = apply(1e3, up, v_ego)
+          max_value = up
+          while (value := apply(1e3, max_value, v_ego)) != max_value:
+            max_value = value
+          down = max_value
+          for _ in range(round(JERK_MEAS_T / (DT_CTRL * steer_step))):
+            down = apply(0., down, v_ego)
+
+          assert math.isclose(self.envelope.max_lat_accel[i, j], lat_accel(max_value, v_ego))
+          assert math.isclose(self.envelope.max_jerk_up[i, j], lat_accel(up, v_ego) / JERK_MEAS_T)
+          assert math.isclose(self.envelope.max_jerk_down[i, j], (lat_accel(max_value, v_ego) - lat_accel(down, v_ego)) / JERK_MEAS_T,
+                              abs_tol=1e-9)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,112 @@
+import math
+import random
+import unittest
+
+from opendbc.car import mirrors, structs
+
+GearShifter = structs.CarState.GearShifter
+ButtonType = structs.CarState.ButtonEvent.Type
+
+
+def random_fill(m, rng: random.Random) -> None:
+  """Sets every field of a mirror to a random value that survives a capnp round trip"""
+  for name, field in m.__dataclass_fields__.items():
+    value = getattr(m, name)
+    if is_mirror(value):
+      random_fill(value, rng)
+    elif isinstance(value, list):
+      continue
+    elif field.type is bool:
+      setattr(m, name, rng.random() > 0.5)
+    elif field.type is float:
+      # exactly representable as a float32
+      setattr(m, name, rng.randint(-1000, 1000) / 8)
+    elif field.type is int:
+      setattr(m, name, rng.randint(0, 3))
+    elif field.type is str:
+      setattr(m, name, rng.choice(["", "abc"]))
+
+
+def is_mirror(value) -> bool:
+  return type(value).__module__ == mirrors.__name__
+
+
+class TestMirrors(unittest.TestCase):
+  def test_fields(self):
+    # every field but deprecated ones, with capnp's defaults
+    for mirror, struct in ((mirrors.CarState, structs.CarState), (mirrors.CarControl, structs.CarControl)):
+      schema_fields = {name for name in struct.schema.fieldnames if name != 'deprecated' and not name.endswith('DEPRECATED')}
+      assert set(mirror.__dataclass_fields__) == schema_fields
+
+      m, defaults = mirror(), struct.new_message()
+      for name in schema_fields:
+        value = getattr(m, name)
+        if not is_mirror(value) and not isinstance(value, list):
+          default = getattr(defaults, name)
+          default = default.raw if hasattr(default, 'raw') else default
+          assert value == default or (math.isnan(value) and math.isnan(default)), name
+
+  def test_slots(self):
+    CS = mirrors.CarState()
+    with self.assertRaises(AttributeError):
+      CS.notAField = 1
+    assert CS.cruiseState is not mirrors.CarState().cruiseState
+
+  def test_round_trip(self):
+    rng = random.Random(0)
+    for mirror in (mirrors.CarState, mirrors.CarControl):
+      for _ in range(20):
+        m = mirror()
+        random_fill(m, rng)
+        assert mirrors.from_capnp(mirrors.to_capnp(m).as_reader()) == m
+
+  def test_to_capnp(self):
+    CS = mirrors.CarState(vEgo=1.5, gearShifter=GearShifter.drive, canValid=True)
+    CS.cruiseState.speed = 20.
+    CS.buttonEvents = [mirrors.CarState.ButtonEvent(pressed=True, type=ButtonType.accelCruise),
+                       mirrors.CarState.ButtonEvent(pressed=False, type=ButtonType.accelCruise)]
+    CS.wheelSpeeds.fl = 2.
+
+    msg = mirrors.to_capnp(CS)
+    assert msg.schema.node.id == structs.CarState.schema.node.id
+    assert msg.vEgo == 1.5 and msg.gearShifter == GearShifter.drive and msg.canValid
+    assert msg.cruiseState.speed == 20. and msg.wheelSpeeds.fl == 2.
+    assert [(b.pressed, b.type.raw) for b in msg.buttonEvents] == [(True, ButtonType.accelCruise), (False, ButtonType.accelCruise)]
+
+    CC = mirrors.CarControl(enabled=True, orientationNED=[0., 0.5, 1.])
+    CC.actuators.accel = -1.
+    msg = mirrors.to_capnp(CC)
+    assert msg.enabled and list(msg.orientationNED) == [0., 0.5, 1.] and msg.actuators.accel == -1.
+
+  def test_round_float32(self):
+    # after rounding, the mirror holds what a capnp round trip gives, the values a CarController reads from CS.out
+    CS = mirrors.CarState(vEgo=0.1, steeringAngleDeg=-12.345, gearShifter=GearShifter.drive)
+    CS.cruiseState.speed = 1e39
+    CS.buttonEvents = [mirrors.CarState.ButtonEvent(pressed=True, type=ButtonType.accelCruise)]
+    CC = mirrors.CarControl(orientationNED=[0.1, 0.2, 0.3])
+    CC.actuators.accel = 1 / 3
+    for m in (CS, CC):
+      assert mirrors.from_capnp(mirrors.to_capnp(m).as_reader()) != m
+      mirrors.round_float32(m)
+      assert mirrors.from_capnp(mirrors.to_capnp(m).as_reader()) == m
+    assert CS.vEgo != 0.1 and CS.cruiseState.speed == math.inf
+
+    # enums are ints, equal to the capnp enum constants
+    reader = mirrors.to_capnp(CS).as_reader()
+    assert CS.gearShifter == GearShifter.drive == reader.gearShifter.raw
+    assert reader.gearShifter == 'drive' and CS.gearShifter != 'drive'
+
+  def test_from_capnp(self):
+    msg = structs.CarState.new_message(vEgo=3., gearShifter='reverse')
+    msg.cruiseState.available = True
+    CS = mirrors.from_capnp(msg.as_reader())
+    assert type(CS) is mirrors.CarState
+    assert CS.vEgo == 3. and CS.gearShifter == GearShifter.reverse and CS.cruiseState.available
+
+    # nested structs convert on their own
+    actuators = mirrors.from_capnp(structs.CarControl.Actuators.new_message(torque=0.5))
+    assert type(actuators) is mirrors.CarControl.Actuators and actuators.torque == 0.5
+
+
+if __name__ == "__main__":
+  unittest.main()
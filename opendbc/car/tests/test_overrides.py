@@ -0,0 +1,100 @@
+import os
+import tempfile
+import time
+import unittest
+
+from opendbc.car.overrides import OverrideRegistry, positive_float
+
+
+def wait_for(override, value, timeout=2.):
+  deadline = time.monotonic() + timeout
+  while override.value != value and time.monotonic() < deadline:
+    time.sleep(0.002)
+  return override.value
+
+
+class TestOverrides(unittest.TestCase):
+  def setUp(self):
+    self.tmp = tempfile.TemporaryDirectory()
+    self.addCleanup(self.tmp.cleanup)
+
+  def _path(self, name):
+    return os.path.join(self.tmp.name, name)
+
+  def _write(self, name, contents):
+    with open(self._path(name), "w") as f:
+      f.write(contents)
+
+  def test_parse(self):
+    registry = OverrideRegistry()
+    self._write("mass.txt", "1500\n")
+    mass = registry.register("mass", self._path("mass.txt"), positive_float, None)
+    # registering doesn't read the file
+    assert mass.value is None
+    registry.poll()
+    assert mass.value == 1500.
+    assert registry.register("mass", self._path("mass.txt"), positive_float, None) is mass
+    assert "mass" in registry and registry["mass"] is mass
+
+    # invalid contents keep the current value, a removed file goes back to the default
+    for contents in ("", "-5", "heavy"):
+      self._write("mass.txt", contents)
+      registry.poll()
+      assert mass.value == 1500.
+    os.unlink(self._path("mass.txt"))
+    registry.poll()
+    assert mass.value is None
+
+  def test_sticky(self):
+    registry = OverrideRegistry()
+    bits = registry.register("bits", self._path("bits.txt"), int, 7, sticky=True)
+    assert bits.value == 7
+    self._write("bits.txt", "2")
+    registry.poll()
+    assert bits.value == 2
+    os.unlink(self._path("bits.txt"))
+    registry.poll()
+    assert bits.value == 2
+
+  def _test_watcher(self, use_inotify):
+    registry = OverrideRegistry(use_inotify=use_inotify)
+    self._write("bits.txt", "3")
+    bits = registry.register("bits", self._path("bits.txt"), int, 7)
+    registry.start()
+    registry.start()
+    self.addCleanup(registry.stop)
+    # loaded by the time start returns
+    assert bits.value == 3
+
+    for value in (1, 5, 5, 0):
+      self._write("bits.txt", str(value))
+      assert wait_for(bits, value) == value
+    os.unlink(self._path("bits.txt"))
+    assert wait_for(bits, 7) == 7
+
+    # overrides registered while running are watched too, including ones in directories that don't exist
+    lock = registry.register("lock", self._path("lock.txt"), int, 0)
+    missing = registry.register("missing", self._path("missing/lock.txt"), int, 0)
+    self._write("lock.txt", "30")
+    assert wait_for(lock, 30) == 30
+    os.mkdir(self._path("missing"))
+    self._write("missing/lock.txt", "20")
+    assert wait_for(missing, 20) == 20
+
+  def test_inotify_watcher(self):
+    self._test_watcher(True)
+
+  def test_mtime_watcher(self):
+    self._test_watcher(False)
+
+  def test_stop(self):
+    registry = OverrideRegistry()
+    registry.stop()
+    registry.start()
+    thread = registry._thread
+    registry.stop()
+    assert not thread.is_alive()
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,59 @@
+import random
+import unittest
+
+import numpy as np
+
+from opendbc.car.common.pid import PIDController
+
+K_P = ([0., 5., 20., 35.], [1.2, 1.0, 0.6, 0.5])
+K_I = ([0., 10., 30.], [0.3, 0.2, 0.1])
+K_D = ([0., 30.], [0.05, 0.])
+
+
+class TestPIDController(unittest.TestCase):
+  def test_gains_cached_per_speed(self):
+    pid = PIDController(K_P, K_I, k_d=K_D)
+    pid.update(1., speed=5.)
+    assert pid.k_p == 1.0 and pid.gains() is pid.gains()
+
+    gains = pid.gains()
+    pid.update(1., speed=12.5)
+    assert pid.gains() is not gains
+    assert pid.k_p == float(np.interp(12.5, *K_P)) and pid.k_i == float(np.interp(12.5, *K_I)) and pid.k_d == float(np.interp(12.5, *K_D))
+
+    # speed set directly also picks new gains
+    pid.speed = 35.
+    assert pid.k_p == 0.5
+
+  def test_update_many_matches_update(self):
+    rng = random.Random(0)
+    n = 500
+    for limits in ((1e308, -1e308), (1.5, -2.0)):
+      for override_rate, freeze_rate in ((0., 0.), (0.05, 0.1)):
+        errors = [rng.uniform(-2., 2.) for _ in range(n)]
+        speeds = [rng.uniform(0., 40.) for _ in range(n)]
+        error_rates = [rng.uniform(-1., 1.) for _ in range(n)]
+        feedforwards = [rng.uniform(-1., 1.) for _ in range(n)]
+        overrides = [rng.random() < override_rate for _ in range(n)]
+        freezes = [rng.random() < freeze_rate for _ in range(n)]
+
+        pid = PIDController(K_P, K_I, k_f=0.8, k_d=K_D, pos_limit=limits[0], neg_limit=limits[1])
+        expected = [pid.update(*args) for args in zip(errors, error_rates, speeds, overrides, feedforwards, freezes, strict=True)]
+
+        batch = PIDController(K_P, K_I, k_f=0.8, k_d=K_D, pos_limit=limits[0], neg_limit=limits[1])
+        controls = batch.update_many(errors, speeds, error_rates, overrides, feedforwards, freezes)
+        np.testing.assert_array_equal(controls, expected)
+        assert (batch.p, batch.i, batch.d, batch.f, batch.control, batch.speed) == (pid.p, pid.i, pid.d, pid.f, pid.control, pid.speed)
+
+        # and continues like the controller it replaced
+        assert batch.update(0.5, speed=10.) == pid.update(0.5, speed=10.)
+
+  def test_update_many_broadcasts(self):
+    pid = PIDController(K_P, K_I)
+    controls = pid.update_many(np.full(10, 0.5), 20.)
+    assert controls.shape == (10,)
+    assert len(PIDController(K_P, K_I).update_many([], [])) == 0
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,86 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from opendbc.car import structs
+from opendbc.car.honda.interface import CarInterface
+from opendbc.car.honda.values import CAR
+from opendbc.car.profiler import PROFILER, CycleProfiler, LatencyHistogram
+
+
+class TestLatencyHistogram(unittest.TestCase):
+  def test_buckets(self):
+    # buckets are contiguous and every value lands in the bucket that covers it, within 1/SUB_BUCKETS
+    prev_high = -1
+    for bucket in range(LatencyHistogram.N_BUCKETS):
+      high = LatencyHistogram.bucket_value(bucket)
+      assert LatencyHistogram.bucket(prev_high + 1) == bucket
+      assert LatencyHistogram.bucket(high) == bucket
+      assert high - prev_high <= max(1, (prev_high + 1) / LatencyHistogram.SUB_BUCKETS)
+      prev_high = high
+    # larger values than the histogram covers go in the last bucket
+    assert LatencyHistogram.bucket(1 << 50) == LatencyHistogram.N_BUCKETS - 1
+
+  def test_percentiles(self):
+    rng = random.Random(0)
+    values = [int(rng.lognormvariate(13, 1)) for _ in range(20000)]
+    histogram = LatencyHistogram()
+    for v in values:
+      histogram.record(v)
+
+    assert (histogram.count, histogram.min, histogram.max, histogram.total) == (len(values), min(values), max(values), sum(values))
+    for q in (1, 50, 90, 99, 99.9):
+      expected = np.percentile(values, q, method="inverted_cdf")
+      assert expected <= histogram.percentile(q) <= expected * (1 + 1 / LatencyHistogram.SUB_BUCKETS), q
+    assert histogram.percentile(100) == max(values)
+
+  def test_merge(self):
+    a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i, v in enumerate(range(1000, 200000, 997)):
+      (a if i % 3 else b).record(v)
+      both.record(v)
+    a.merge(LatencyHistogram.from_dict(b.to_dict()))
+    assert a.to_dict() == both.to_dict()
+
+
+class TestCycleProfiler(unittest.TestCase):
+  def setUp(self):
+    PROFILER.reset()
+    self.addCleanup(PROFILER.disable)
+    self.addCleanup(PROFILER.reset)
+
+  def _run(self, frames=20):
+    CP = CarInterface.get_non_essential_params(CAR.HONDA_CIVIC)
+    CI = CarInterface(CP)
+    CC = structs.CarControl().as_reader()
+    for i in range(frames):
+      CI.update([(i * 10_000_000, [])])
+      CI.apply(CC, i * 10_000_000)
+
+  def test_disabled(self):
+    self._run()
+    assert PROFILER.histograms == {}
+
+  def test_stages(self):
+    PROFILER.enable()
+    self._run()
+    stages = PROFILER.summary()
+    for stage in ("CarInterface.update", "can_parse", "CarState.update", "can_valid", "CarInterface.apply", "CANParser.update",
+                  "CANPacker.make_can_msg"):
+      assert stages[stage]["count"] > 0, stage
+    assert stages["CarInterface.update"]["count"] == stages["CarInterface.apply"]["count"] == 20
+    assert "CarInterface.update" in PROFILER.report()
+
+    with tempfile.TemporaryDirectory() as tmp:
+      path = os.path.join(tmp, "profile.json")
+      PROFILER.save(path)
+      profiler = CycleProfiler()
+      profiler.merge(CycleProfiler.load(path))
+      assert profiler.dump() == PROFILER.dump()
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,210 @@
+import math
+import random
+import unittest
+
+from opendbc.can import CANPacker
+from opendbc.car import Bus, structs
+from opendbc.car.hyundai.radar_interface import RadarInterface as HyundaiRadarInterface
+from opendbc.car.hyundai.values import CAR as HYUNDAI, DBC as HYUNDAI_DBC
+from opendbc.car.radar_tracks import RadarPoint, RadarPointPool, RadarTrackTable, set_points
+from opendbc.car.tesla.radar_interface import RadarInterface as TeslaRadarInterface
+from opendbc.car.tesla.values import CAR as TESLA, DBC as TESLA_DBC
+from opendbc.car.toyota.radar_interface import RadarInterface as ToyotaRadarInterface
+from opendbc.car.toyota.values import CAR as TOYOTA, ToyotaFlags
+
+
+# the per-track implementations the array based ones replaced, used as a reference
+
+class ToyotaReference(ToyotaRadarInterface):
+  def __init__(self, CP):
+    super().__init__(CP)
+    self.valid_cnt = {key: 0 for key in self.RADAR_A_MSGS}
+
+  def _update(self, updated_messages):
+    ret = structs.RadarData()
+    for ii in sorted(updated_messages):
+      if ii in self.RADAR_A_MSGS:
+        cpt = self.rcp.vl[ii]
+        if cpt['LONG_DIST'] >= 255 or cpt['NEW_TRACK']:
+          self.valid_cnt[ii] = 0
+        if cpt['VALID'] and cpt['LONG_DIST'] < 255:
+          self.valid_cnt[ii] += 1
+        else:
+          self.valid_cnt[ii] = max(self.valid_cnt[ii] - 1, 0)
+
+        score = self.rcp.vl[ii+16]['SCORE']
+        if cpt['VALID'] or (score > 50 and cpt['LONG_DIST'] < 255 and self.valid_cnt[ii] > 0):
+          if ii not in self.pts or cpt['NEW_TRACK']:
+            self.pts[ii] = structs.RadarData.RadarPoint()
+            self.pts[ii].trackId = self.track_id
+            self.track_id += 1
+          self.pts[ii].dRel = cpt['LONG_DIST']
+          self.pts[ii].yRel = -cpt['LAT_DIST']
+          self.pts[ii].vRel = cpt['REL_SPEED']
+        elif ii in self.pts:
+          del self.pts[ii]
+
+    ret.points = list(self.pts.values())
+    return ret
+
+
+class HyundaiReference(HyundaiRadarInterface):
+  def _update(self, updated_messages):
+    ret = structs.RadarData()
+    for addr in self.addrs:
+      msg = self.rcp.vl[f"RADAR_TRACK_{addr:x}"]
+      if addr not in self.pts:
+        self.pts[addr] = structs.RadarData.RadarPoint()
+        self.pts[addr].trackId = self.track_id
+        self.track_id += 1
+
+      if msg['STATE'] in (3, 4):
+        azimuth = math.radians(msg['AZIMUTH'])
+        self.pts[addr].dRel = math.cos(azimuth) * msg['LONG_DIST']
+        self.pts[addr].yRel = 0.5 * -math.sin(azimuth) * msg['LONG_DIST']
+        self.pts[addr].vRel = msg['REL_SPEED']
+      else:
+        del self.pts[addr]
+
+    ret.points = list(self.pts.values())
+    return ret
+
+
+class TeslaReference(TeslaRadarInterface):
+  def _update(self, updated_messages):
+    ret = structs.RadarData()
+    for i in self.indices:
+      msg_a = self.rcp.vl[f'RadarPoint{i}_A']
+      msg_b = self.rcp.vl[f'RadarPoint{i}_B']
+      if msg_a['Index'] != msg_b['Index2']:
+        continue
+
+      if not msg_a['Tracked']:
+        if i in self.pts:
+          del self.pts[i]
+        continue
+
+      if i not in self.pts:
+        self.pts[i] = structs.RadarData.RadarPoint()
+        self.pts[i].trackId = self.track_id
+        self.track_id += 1
+
+      self.pts[i].dRel = msg_a['LongDist']
+      self.pts[i].yRel = msg_a['LatDist']
+      self.pts[i].vRel = msg_a['LongSpeed']
+
+    ret.points = list(self.pts.values())
+    return ret
+
+
+# signals that pick between a few values so every branch is hit
+CHOICES = {
+  'VALID': (0, 1), 'NEW_TRACK': (0, 0, 0, 1), 'LONG_DIST': (10.0, 80.0, 255.0, 300.0), 'SCORE': (0, 40, 60, 100),
+  'STATE': (0, 3, 4, 5), 'Tracked': (0, 1, 1), 'Index': (0, 1), 'Index2': (0, 1),
+}
+
+
+def random_values(rng, msg, choices=CHOICES):
+  values = {}
+  for sig in msg.sigs.values():
+    if sig.name in ('COUNTER', 'CHECKSUM'):
+      continue
+    if sig.name in choices:
+      values[sig.name] = rng.choice(choices[sig.name])
+    else:
+      lo, hi = (-(1 << (sig.size - 1)), (1 << (sig.size - 1)) - 1) if sig.is_signed else (0, (1 << sig.size) - 1)
+      values[sig.name] = rng.randint(lo, hi) * sig.factor + sig.offset
+  return values
+
+
+def point_tuples(rr):
+  return [(p.trackId, p.dRel, p.yRel, p.vRel) for p in rr.points]
+
+
+class TestRadarTracks(unittest.TestCase):
+  def _compare(self, RadarInterface, Reference, CP, frame_msgs, extra_msgs, cycles=200, seed=0):
+    rng = random.Random(seed)
+    ri, ref = RadarInterface(CP), Reference(CP)
+    packer = CANPacker(ri.rcp.dbc_name)
+
+    t = 0
+    updates = 0
+    for _ in range(cycles):
+      t += 50_000_000
+      msgs = [m for m in frame_msgs if rng.random() < 0.8] + extra_msgs
+      frames = []
+      for name_or_addr in msgs:
+        msg = packer.dbc.name_to_msg[name_or_addr] if isinstance(name_or_addr, str) else packer.dbc.addr_to_msg[name_or_addr]
+        frames.append(packer.make_can_msg(msg.address, 1, random_values(rng, msg)))
+
+      rr, rr_ref = ri.update([(t, frames)]), ref.update([(t, frames)])
+      assert (rr is None) == (rr_ref is None)
+      if rr is not None:
+        updates += 1
+        assert point_tuples(rr) == point_tuples(rr_ref)
+    assert updates > 0
+    assert ri.track_id == ref.track_id > 0
+
+  def test_toyota(self):
+    for flags in (0, ToyotaFlags.TSS2):
+      with self.subTest(flags=flags):
+        CP = structs.CarParams(carFingerprint=TOYOTA.TOYOTA_RAV4_TSS2 if flags else TOYOTA.TOYOTA_AVALON, flags=int(flags))
+        ri = ToyotaRadarInterface(CP)
+        self._compare(ToyotaRadarInterface, ToyotaReference, CP, ri.RADAR_A_MSGS + ri.RADAR_B_MSGS[:-1], [ri.trigger_msg, 'STATUS_MSG'])
+
+  def test_hyundai(self):
+    CP = structs.CarParams(carFingerprint=HYUNDAI.HYUNDAI_SANTA_FE)
+    assert Bus.radar in HYUNDAI_DBC[CP.carFingerprint]
+    ri = HyundaiRadarInterface(CP)
+    self._compare(HyundaiRadarInterface, HyundaiReference, CP, ri.addrs[:-1], [ri.trigger_msg])
+
+  def test_tesla(self):
+    CP = structs.CarParams(carFingerprint=TESLA.TESLA_MODEL_3)
+    assert Bus.radar in TESLA_DBC[CP.carFingerprint]
+    msgs = [f'RadarPoint{i}_{ab}' for i in range(40) for ab in 'AB']
+    self._compare(TeslaRadarInterface, TeslaReference, CP, msgs[:-1], [msgs[-1], 'RadarStatus'])
+
+  def test_track_table(self):
+    CP = structs.CarParams(carFingerprint=TOYOTA.TOYOTA_AVALON)
+    ri = ToyotaRadarInterface(CP)
+    table = RadarTrackTable(ri.rcp, ri.RADAR_B_MSGS, ('SCORE',))
+    ri.rcp.vl[ri.RADAR_B_MSGS[3]]['SCORE'] = 42.
+    vals = table.read()
+    assert list(vals) == ['SCORE']
+    assert vals['SCORE'].shape == (len(ri.RADAR_B_MSGS),)
+    assert vals['SCORE'][3] == 42.
+
+  def test_point_pool(self):
+    pool = RadarPointPool()
+    pt = pool.get(1)
+    pt.dRel, pt.yRel, pt.vRel = 1., 2., 3.
+    pool.put(pt)
+    assert len(pool) == 1
+
+    # dropped points are reused, and start out like new ones
+    reused = pool.get(2)
+    assert reused is pt and len(pool) == 0
+    assert (reused.trackId, reused.dRel, reused.yRel, reused.vRel) == (2, 0., 0., 0.)
+
+  def test_set_points(self):
+    ret = structs.RadarData()
+    ret.errors.canError = True
+    set_points(ret, [RadarPoint(3, 10.5, -1.25, 2.), RadarPoint(7, 50., 0.5, -4.)])
+    assert point_tuples(ret) == [(3, 10.5, -1.25, 2.), (7, 50., 0.5, -4.)]
+    assert ret.errors.canError
+
+    set_points(ret, [])
+    assert len(ret.points) == 0
+
+  def test_drop_point_recycles(self):
+    ri = HyundaiRadarInterface(structs.CarParams(carFingerprint=HYUNDAI.HYUNDAI_SANTA_FE))
+    pt = ri._new_point(0x500, 0)
+    assert ri._new_point(0x500, 1) is pt and pt.trackId == 1
+    ri._drop_point(0x500)
+    ri._drop_point(0x500)
+    assert 0x500 not in ri.pts and len(ri.point_pool) == 1
+    assert ri._new_point(0x501, 2) is pt
+
+
+if __name__ == "__main__":
+  unittest.main()
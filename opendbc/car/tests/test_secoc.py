@@ -0,0 +1,99 @@
+import random
+import unittest
+
+from Crypto.Cipher import AES
+from Crypto.Hash import CMAC
+
+from opendbc.car.can_definitions import CanData
+from opendbc.car.secoc import SecOCSigner, add_mac, build_sync_mac
+from opendbc.car.secoc_verifier import SYNC_ADDR, SecOCVerifier, synthetic_frames
+
+KEY = bytes(range(16))
+
+
+class TestSecOCSigner(unittest.TestCase):
+  def test_cmac(self):
+    rng = random.Random(0)
+    for key_len in (16, 32):
+      key = rng.randbytes(key_len)
+      signer = SecOCSigner(key)
+      # empty, partial, whole and multiple blocks
+      for n in (0, 1, 7, 12, 15, 16, 17, 32, 40):
+        data = rng.randbytes(n)
+        assert signer.cmac(data) == CMAC.new(key, data, ciphermod=AES).digest(), (key_len, n)
+
+  def test_rfc4493(self):
+    signer = SecOCSigner(bytes.fromhex("2b7e151628aed2a6abf7158809cf4f3c"))
+    assert signer.cmac(b"").hex() == "bb1d6929e95937287fa37d129b756746"
+    assert signer.cmac(bytes.fromhex("6bc1bee22e409f96e93d7e117393172a")).hex() == "070a16b46b4d4144f79bdd9dd04a287c"
+
+  def test_matches_add_mac(self):
+    rng = random.Random(1)
+    for _ in range(500):
+      key = rng.randbytes(16)
+      signer = SecOCSigner(key)
+      trip_cnt, reset_cnt, msg_cnt = rng.getrandbits(16), rng.getrandbits(20), rng.getrandbits(16)
+      msg = (rng.getrandbits(11), rng.randbytes(8), rng.randint(0, 2))
+      assert signer.add_mac(trip_cnt, reset_cnt, msg_cnt, msg) == add_mac(key, trip_cnt, reset_cnt, msg_cnt, msg)
+      assert signer.build_sync_mac(trip_cnt, reset_cnt) == build_sync_mac(key, trip_cnt, reset_cnt)
+
+  def test_default_key(self):
+    # CarControllerBase's placeholder key is 32 bytes, so AES-256
+    key = b"00" * 16
+    msg = (0x131, bytes(8), 0)
+    assert SecOCSigner(key).add_mac(1, 2, 3, msg) == add_mac(key, 1, 2, 3, msg)
+
+
+class TestSecOCVerifier(unittest.TestCase):
+  def verify(self, frames, key=KEY) -> SecOCVerifier:
+    verifier = SecOCVerifier(key)
+    for nanos, source, can in frames:
+      verifier.update(nanos, can, source)
+    return verifier
+
+  def test_valid_route(self):
+    verifier = self.verify(synthetic_frames(KEY, 25.))
+    assert verifier.sync.frames == verifier.sync.verified == 3
+    assert {addr for _, _, addr in verifier.streams} == {0x2e4, 0x131, 0x183}
+    for stats in verifier.streams.values():
+      assert stats.frames == stats.verified > 0 and stats.failed == stats.desyncs == 0
+    assert not verifier.desyncs
+
+  def test_wrong_key(self):
+    verifier = self.verify(synthetic_frames(KEY, 1.), key=bytes(16))
+    assert verifier.sync.failed == verifier.sync.frames == 1
+    assert all(stats.failed == stats.frames for stats in verifier.streams.values())
+
+  def test_unsynced(self):
+    # frames before the first synchronization message can't be verified
+    frames = [(nanos, source, [c for c in can if c.address != SYNC_ADDR]) for nanos, source, can in synthetic_frames(KEY, 1.)]
+    verifier = self.verify(frames)
+    assert all(stats.unsynced == stats.frames > 0 for stats in verifier.streams.values())
+
+  def test_msg_cnt_desync(self):
+    # drop 6 STEERING_LKA frames, the verifier should find the counter again and resync
+    frames = list(synthetic_frames(KEY, 1.))
+    dropped = frames[:10] + [(nanos, source, [c for c in can if c.address != 0x2e4]) for nanos, source, can in frames[10:16]] + frames[16:]
+    verifier = self.verify(dropped)
+    stats = verifier.streams["can", 0, 0x2e4]
+    assert stats.verified == stats.frames == 94 and stats.desyncs == 1
+    desync = verifier.desyncs[0]
+    assert (desync.kind, desync.addr, desync.expected, desync.actual) == ("msg_cnt", 0x2e4, 10, 16)
+
+  def test_corrupted_and_reset(self):
+    frames = list(synthetic_frames(KEY, 1.))
+    nanos, source, can = frames[50]
+    addr, dat, src = can[0]
+    frames[50] = (nanos, source, [CanData(addr, bytes([dat[0] ^ 1]) + dat[1:], src)] + can[1:])
+
+    # a frame signed with the next reset counter before its synchronization message
+    nanos, source, can = frames[60]
+    addr, dat, src = can[0]
+    frames[60] = (nanos, source, [CanData(*SecOCSigner(KEY).add_mac(1, 2, 60, (addr, dat, src)))] + can[1:])
+
+    stats = self.verify(frames).streams["can", 0, 0x2e4]
+    assert (stats.failed, stats.desyncs, stats.verified) == (2, 1, 98)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,99 @@
+import os
+import struct
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from opendbc.car.shm_channel import ShmChannel
+
+FIELDS = {
+  "lane_d_info": (float, None),
+  "accel_engaged": (int, 0),
+  "cruise_available": (bool, False),
+  "cruise_info": (str, ""),
+}
+
+
+class TestShmChannel(unittest.TestCase):
+  def setUp(self):
+    self.tmp = tempfile.TemporaryDirectory()
+    self.addCleanup(self.tmp.cleanup)
+
+  def _channel(self, fields=FIELDS):
+    ch = ShmChannel("test_channel", fields, directory=self.tmp.name)
+    self.addCleanup(ch.close)
+    return ch
+
+  def test_defaults(self):
+    ch = self._channel()
+    assert {key: ch.get(key) for key in FIELDS} == {key: default for key, (_, default) in FIELDS.items()}
+    assert "accel_engaged" in ch and "missing" not in ch
+
+  def test_shared(self):
+    writer, reader = self._channel(), self._channel()
+    writer.put("lane_d_info", -0.125)
+    writer.put("accel_engaged", 4)
+    writer.put("cruise_available", 1)
+    writer.put("cruise_info", ",1")
+    assert reader.get("lane_d_info") == -0.125
+    assert reader.get("accel_engaged") == 4
+    assert reader.get("cruise_available") is True
+    assert reader.get("cruise_info") == ",1"
+
+    # written values stay set, even to the default
+    writer.put("accel_engaged", 0)
+    writer.put("cruise_info", "")
+    assert reader.get("accel_engaged") == 0 and reader.get("cruise_info") == ""
+    writer.put("lane_d_info", 0.)
+    assert reader.get("lane_d_info") == 0.
+
+    writer.clear("lane_d_info")
+    assert reader.get("lane_d_info") is None
+
+  def test_string_too_long(self):
+    ch = self._channel()
+    with self.assertRaises(AssertionError):
+      ch.put("cruise_info", "123456789")
+
+  def test_layout_change(self):
+    ch = self._channel()
+    ch.put("accel_engaged", 3)
+
+    # a different layout gets its own file, peers still mapping the old one keep working
+    changed = self._channel({"accel_engaged": (float, 0.)})
+    assert changed.path != ch.path
+    assert changed.get("accel_engaged") == 0.
+    changed.put("accel_engaged", 1.5)
+    assert self._channel({"accel_engaged": (float, 0.)}).get("accel_engaged") == 1.5
+    assert ch.get("accel_engaged") == 3
+    assert self._channel().get("accel_engaged") == 3
+    assert sorted(os.listdir(self.tmp.name)) == sorted(os.path.basename(c.path) for c in (ch, changed))
+
+  def test_max_age(self):
+    writer, reader = self._channel(), self._channel()
+    assert reader.age("lane_d_info") is None
+    writer.put("lane_d_info", 0.5)
+    assert 0. <= reader.age("lane_d_info") < 1.
+    assert reader.get("lane_d_info", max_age=1.) == 0.5
+
+    # a writer that stopped leaves a stale value behind
+    with mock.patch.object(time, "monotonic_ns", return_value=time.monotonic_ns() + 2_000_000_000):
+      assert reader.get("lane_d_info") == 0.5
+      assert reader.get("lane_d_info", max_age=1.) is None
+      assert reader.age("lane_d_info") > 1.
+
+  def test_interrupted_writer(self):
+    ch = self._channel()
+    ch.put("accel_engaged", 3)
+
+    # a writer that died mid write leaves the counter odd, readers still return the value
+    offset = ch._fields["accel_engaged"][0]
+    struct.pack_into("<I", ch._mm, offset, 5)
+    assert ch.get("accel_engaged") == 3
+    ch.put("accel_engaged", 4)
+    assert ch.get("accel_engaged") == 4
+
+
+if __name__ == "__main__":
+  unittest.main()
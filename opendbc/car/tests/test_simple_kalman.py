@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from opendbc.car.common.simple_kalman import FILTER_BLOCK, get_kalman_gain
+from opendbc.car.interfaces import SPEED_KF_A, SPEED_KF_C, SPEED_KF_Q, SPEED_KF_R, SPEED_KF_RESET, get_speed_kf, get_speed_kf_gain
+from opendbc.car import DT_CTRL
+
+
+def speed_trace(n, seed=0):
+  rng = np.random.default_rng(seed)
+  v = np.clip(np.cumsum(rng.normal(0., 0.05, n)), 0., None) + rng.normal(0., 0.1, n)
+  # jumps like a car starting at speed, and a wheel speed glitch
+  v[n // 3:] += 10.
+  v[n // 2:n // 2 + 1] += 5.
+  return v
+
+
+class TestKF1D(unittest.TestCase):
+  def test_gain_memoized(self):
+    K = get_kalman_gain(DT_CTRL, np.array(SPEED_KF_A), np.array(SPEED_KF_C), np.array(SPEED_KF_Q), SPEED_KF_R)
+    assert get_speed_kf_gain() is get_speed_kf_gain()
+    np.testing.assert_array_equal(np.array(get_speed_kf_gain()), K)
+
+  def test_filter_matches_update(self):
+    for n in (0, 1, FILTER_BLOCK - 1, FILTER_BLOCK, 10 * FILTER_BLOCK + 7):
+      meas = speed_trace(n)
+      kf = get_speed_kf()
+      kf.set_x([[meas[0] if n else 0.], [0.]])
+      expected = np.array([kf.update(z) for z in meas]).reshape(n, 2)
+
+      batch = get_speed_kf()
+      batch.set_x([[meas[0] if n else 0.], [0.]])
+      np.testing.assert_allclose(batch.filter(meas), expected, rtol=1e-9, atol=1e-9)
+      np.testing.assert_allclose(batch.x, kf.x, rtol=1e-9, atol=1e-9)
+
+  def test_filter_resets(self):
+    # like CarStateBase.update_speed_kf, from standstill
+    meas = speed_trace(5000)
+    kf = get_speed_kf()
+    expected = []
+    for z in meas:
+      if abs(z - kf.x[0][0]) > SPEED_KF_RESET:
+        kf.set_x([[z], [0.0]])
+      expected.append(kf.update(z))
+
+    batch = get_speed_kf()
+    np.testing.assert_allclose(batch.filter(meas, SPEED_KF_RESET), expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(batch.x, kf.x, rtol=1e-9, atol=1e-9)
+
+
+if __name__ == "__main__":
+  unittest.main()
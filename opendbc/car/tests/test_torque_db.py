@@ -0,0 +1,80 @@
+import math
+import os
+import tempfile
+import tomllib
+import unittest
+from unittest import mock
+
+from opendbc.car import torque_db
+from opendbc.car.interfaces import get_torque_params
+from opendbc.car.torque_db import TorqueParams, build_db, load_db, read_db, write_db
+
+
+def same(a, b) -> bool:
+  # the angle control overrides use nan for the parameters they don't have
+  return len(a) == len(b) and all(x == y or (math.isnan(x) and math.isnan(y)) for x, y in zip(a, b, strict=True))
+
+
+class TestTorqueDB(unittest.TestCase):
+  def test_matches_sources(self):
+    db = load_db()
+    with open(torque_db.TORQUE_SUBSTITUTE_PATH, 'rb') as f:
+      sub = tomllib.load(f)
+    for fn in (torque_db.TORQUE_PARAMS_PATH, torque_db.TORQUE_OVERRIDE_PATH):
+      with open(fn, 'rb') as f:
+        for platform, row in tomllib.load(f).items():
+          if platform != 'legend':
+            assert same(db[platform], row), platform
+    for platform, sub_platform in sub.items():
+      if platform != 'legend':
+        assert same(db[platform], db[sub_platform]), platform
+
+    # the dict view keeps its legend names and is only built once
+    assert get_torque_params()["TOYOTA_RAV4"] == db["TOYOTA_RAV4"]._asdict()
+    assert get_torque_params() is get_torque_params()
+
+  def test_round_trip(self):
+    db = build_db()
+    with tempfile.TemporaryDirectory() as tmp:
+      path = os.path.join(tmp, "torque.db")
+      assert read_db(path) is None
+
+      write_db(db, path)
+      read = read_db(path)
+      assert list(read) == list(db)
+      assert all(type(row) is TorqueParams for row in read.values())
+      assert all(same(read[platform], row) for platform, row in db.items())
+
+  def test_stale(self):
+    db = build_db()
+    with tempfile.TemporaryDirectory() as tmp:
+      path = os.path.join(tmp, "torque.db")
+      write_db(db, path, digest=b"\x00" * 32)
+      assert read_db(path) is None
+
+      # rebuilt from the sources in memory, only the build writes the table
+      assert list(load_db(path)) == list(db)
+      assert read_db(path) is None
+
+  def test_validation(self):
+    legend = 'legend = ["LAT_ACCEL_FACTOR", "MAX_LAT_ACCEL_MEASURED", "FRICTION"]\n'
+    cases = [
+      ('legend = ["LAT_ACCEL_FACTOR", "FRICTION"]\n', "", "", ValueError),
+      (legend, legend + '"A" = [1.0, 2.0]\n', legend, ValueError),
+      (legend, legend + '"A" = [1.0, 0.0, 0.1]\n', legend, ValueError),
+      (legend, legend + '"A" = [1.0, 2.0, 0.1]\n', legend + '"A" = [1.0, 2.0, 0.1]\n', RuntimeError),
+      (legend + '"B" = "C"\n', legend + '"A" = [1.0, 2.0, 0.1]\n', legend, NotImplementedError),
+    ]
+    for sub, params, override, exc in cases:
+      with self.subTest(exc=exc), tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name, content in (("substitute", sub), ("params", params), ("override", override)):
+          paths.append(os.path.join(tmp, f"{name}.toml"))
+          with open(paths[-1], "w") as f:
+            f.write(content)
+        with mock.patch.object(torque_db, "_source_files", return_value=paths), self.assertRaises(exc):
+          build_db()
+
+
+if __name__ == "__main__":
+  unittest.main()
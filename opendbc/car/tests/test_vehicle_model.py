@@ -5,7 +5,7 @@ import numpy as np
 
 from opendbc.car.honda.interface import CarInterface
 from opendbc.car.honda.values import CAR
-from opendbc.car.vehicle_model import VehicleModel, dyn_ss_sol, create_dyn_state_matrices
+from opendbc.car.vehicle_model import VehicleModel, calc_slip_factor, dyn_ss_sol, create_dyn_state_matrices
 
 
 class TestVehicleModel(unittest.TestCase):
@@ -65,3 +65,29 @@ class TestVehicleModel(unittest.TestCase):
           x2 = dyn_ss_sol(sa, u, roll, self.VM)
 
           np.testing.assert_almost_equal(x1, x2, decimal=3)
+
+  def test_slip_factor_cache(self):
+    assert self.VM.sf == calc_slip_factor(self.VM)
+    curvature = self.VM.calc_curvature(0.1, 20., 0.)
+    self.VM.update_params(0.8, self.VM.sR)
+    assert self.VM.sf == calc_slip_factor(self.VM)
+    assert self.VM.calc_curvature(0.1, 20., 0.) != curvature
+
+  def test_arrays(self):
+    """The curvature and steer methods take arrays, and steady_state_sol_many matches steady_state_sol per sample"""
+    rng = np.random.default_rng(0)
+    sa = rng.uniform(math.radians(-20), math.radians(20), 500)
+    u = np.concatenate((rng.uniform(0., 0.1, 50), rng.uniform(0.1, 40., 450)))
+    roll = rng.uniform(math.radians(-10), math.radians(10), 500)
+
+    curvatures = self.VM.calc_curvature(sa, u, roll)
+    np.testing.assert_allclose(curvatures, [self.VM.calc_curvature(*args) for args in zip(sa, u, roll, strict=True)], rtol=1e-12)
+    np.testing.assert_allclose(self.VM.get_steer_from_curvature(curvatures, u, roll), sa, rtol=1e-9, atol=1e-12)
+
+    sols = self.VM.steady_state_sol_many(sa, u, roll)
+    assert sols.shape == (500, 2)
+    expected = np.array([self.VM.steady_state_sol(*args)[:, 0] for args in zip(sa, u, roll, strict=True)])
+    np.testing.assert_allclose(sols, expected, rtol=1e-9, atol=1e-12)
+
+    # scalars broadcast
+    np.testing.assert_allclose(self.VM.steady_state_sol_many(0.1, u, 0.)[-1], self.VM.steady_state_sol(0.1, u[-1], 0.)[:, 0], rtol=1e-9)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import marshal
+import math
+import mmap
+import os
+import struct
+import tempfile
+import tomllib
+from functools import cache
+from typing import NamedTuple
+
+from opendbc.car.common.basedir import BASEDIR
+
+# A compiled, validated copy of the torque_data TOML files. Those stay the source of truth: the table is keyed
+# on their content, generated when the package is built (so bad TOML fails the build) and rebuilt in memory
+# whenever it's missing or stale, like the fingerprint database.
+TORQUE_PARAMS_PATH = os.path.join(BASEDIR, 'torque_data/params.toml')
+TORQUE_OVERRIDE_PATH = os.path.join(BASEDIR, 'torque_data/override.toml')
+TORQUE_SUBSTITUTE_PATH = os.path.join(BASEDIR, 'torque_data/substitute.toml')
+DB_PATH = os.environ.get("TORQUE_DB_PATH", os.path.join(BASEDIR, "torque_data", "torque.db"))
+DB_VERSION = 1
+
+# magic, database version, marshal version, sha256 of the TOML sources
+_HEADER = struct.Struct("<4sII32s")
+_MAGIC = b"OPTQ"
+
+
+class TorqueParams(NamedTuple):
+  LAT_ACCEL_FACTOR: float
+  MAX_LAT_ACCEL_MEASURED: float
+  FRICTION: float
+
+
+TorqueDB = dict[str, TorqueParams]
+
+
+def _source_files() -> list[str]:
+  return [TORQUE_SUBSTITUTE_PATH, TORQUE_PARAMS_PATH, TORQUE_OVERRIDE_PATH]
+
+
+def source_hash() -> bytes:
+  h = hashlib.sha256()
+  for fn in _source_files():
+    h.update(os.path.basename(fn).encode())
+    with open(fn, "rb") as f:
+      h.update(f.read())
+  return h.digest()
+
+
+def _header(digest: bytes) -> bytes:
+  return _HEADER.pack(_MAGIC, DB_VERSION, marshal.version, digest)
+
+
+def _load_toml(fn: str) -> dict:
+  with open(fn, 'rb') as f:
+    return tomllib.load(f)
+
+
+def build_db() -> TorqueDB:
+  """Parses and validates the TOML sources, returning {platform: TorqueParams} with substitutes resolved"""
+  sub, params, override = (_load_toml(fn) for fn in _source_files())
+
+  for name, data in (("substitute", sub), ("params", params), ("override", override)):
+    if data.get('legend') != list(TorqueParams._fields):
+      raise ValueError(f"torque {name} legend {data.get('legend')} doesn't match {list(TorqueParams._fields)}")
+
+  db: TorqueDB = {}
+  for candidate in sorted((sub.keys() | params.keys() | override.keys()) - {'legend'}):
+    if sum([candidate in x for x in [sub, params, override]]) > 1:
+      raise RuntimeError(f'{candidate} is defined twice in torque config')
+
+    sub_candidate = sub.get(candidate, candidate)
+
+    if sub_candidate in override:
+      out = override[sub_candidate]
+    elif sub_candidate in params:
+      out = params[sub_candidate]
+    else:
+      raise NotImplementedError(f"Did not find torque params for {sub_candidate}")
+
+    if len(out) != len(TorqueParams._fields) or not all(isinstance(v, (int, float)) for v in out):
+      raise ValueError(f"{sub_candidate} torque params must be {len(TorqueParams._fields)} numbers: {out}")
+    row = TorqueParams(*(float(v) for v in out))
+    if not (math.isfinite(row.MAX_LAT_ACCEL_MEASURED) and row.MAX_LAT_ACCEL_MEASURED > 0.):
+      raise ValueError(f"{sub_candidate} MAX_LAT_ACCEL_MEASURED must be positive: {row.MAX_LAT_ACCEL_MEASURED}")
+
+    db[candidate] = db[sub_candidate] = row
+  return db
+
+
+def write_db(db: TorqueDB, path: str = DB_PATH, digest: bytes | None = None) -> None:
+  if digest is None:
+    digest = source_hash()
+  fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+  try:
+    with os.fdopen(fd, "wb") as f:
+      f.write(_header(digest))
+      f.write(marshal.dumps({platform: tuple(row) for platform, row in db.items()}))
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+  finally:
+    if os.path.exists(tmp_path):
+      os.unlink(tmp_path)
+
+
+def read_db(path: str = DB_PATH, digest: bytes | None = None) -> TorqueDB | None:
+  """Returns the table at path, or None if it's missing or wasn't built from the current sources"""
+  if digest is None:
+    digest = source_hash()
+  try:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      if mm[:_HEADER.size] != _header(digest):
+        return None
+      rows = marshal.loads(memoryview(mm)[_HEADER.size:])
+  except (OSError, ValueError, EOFError):
+    return None
+  return {platform: TorqueParams._make(row) for platform, row in rows.items()}
+
+
+@cache
+def load_db(path: str = DB_PATH) -> TorqueDB:
+  """Returns {platform: TorqueParams}, loaded from the compiled table when it's up to date, otherwise built from the TOML"""
+  db = read_db(path)
+  if db is None:
+    db = build_db()
+  return db
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Validates the torque_data TOML files and builds the torque table")
+  parser.add_argument("--out", default=DB_PATH, help="output path")
+  args = parser.parse_args()
+
+  write_db(build_db(), args.out)
+  print(f"Wrote {args.out} ({os.path.getsize(args.out)} bytes)")
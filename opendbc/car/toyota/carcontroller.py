@@ -1,4 +1,3 @@
-import os
 import math
 import numpy as np
 from opendbc.car import Bus, make_tester_present_msg, rate_limit, structs, ACCELERATION_DUE_TO_GRAVITY, DT_CTRL
@@ -7,10 +6,10 @@ from opendbc.car.can_definitions import CanData
 from opendbc.car.carlog import carlog
 from opendbc.car.common.filter_simple import FirstOrderFilter, HighPassFilter
 from opendbc.car.common.pid import PIDController
-from opendbc.car.secoc import add_mac, build_sync_mac
+from opendbc.car.secoc import SecOCSigner
 from opendbc.car.interfaces import CarControllerBase
 from opendbc.car.toyota import toyotacan
-from opendbc.car.toyota.values import CAR, CarControllerParams, ToyotaFlags
+from opendbc.car.toyota.values import CAR, LANE_D_INFO_MAX_AGE, CarControllerParams, ToyotaFlags, RUN_AUTO_LOCK, shm_channel
 from opendbc.can import CANPacker
 
 Ecu = structs.CarParams.Ecu
@@ -75,6 +74,7 @@ class CarController(CarControllerBase):
     self.steer_rate_counter = 0
     self.prohibit_neg_calculation = True
     self.distance_button = 0
+    self.shm = shm_channel()
 
     # *** start long control state ***
     self.long_pid = get_long_tune(self.CP, self.params)
@@ -92,17 +92,11 @@ class CarController(CarControllerBase):
     self.secoc_lta_message_counter = 0
     self.secoc_acc_message_counter = 0
     self.secoc_prev_reset_counter = 0
+    self.secoc_signer: SecOCSigner | None = None
 
     self.now_gear = structs.CarState.GearShifter.park
     self.lock_flag = False
-    self.lock_speed = 0
-    try:
-      with open('/data/run_auto_lock.txt','r') as fp:
-        lock_speed_str = fp.read() #ロックするスピードをテキストで30みたいに書いておく。ファイルが無いか0でオートロック無し。
-        if lock_speed_str:
-          self.lock_speed = int(lock_speed_str)
-    except Exception as e:
-      pass
+    self.lock_speed = RUN_AUTO_LOCK.value
     self.before_ang = 0
     self.before_ang_ct = 0
     self.new_torques = []
@@ -110,6 +104,13 @@ class CarController(CarControllerBase):
     self.lane_return_power = 100
     self.last_standstill = False
 
+  def creep_blocked(self) -> bool:
+    # クリープしたければ以下を通さない。ワンペダルモードでもeP(一時的な赤信号手前を除く)では通さない
+    if self.shm.get('cruise_info') not in ("1", ",1"):
+      return False
+    accel_engaged = self.shm.get('accel_engaged')
+    return accel_engaged == 3 or (accel_engaged == 4 and self.shm.get('red_signal_eP_iP_set') == 1)
+
   def update(self, CC, CS, now_nanos):
     actuators = CC.actuators
     stopping = actuators.longControlState == LongCtrlState.stopping
@@ -126,13 +127,17 @@ class CarController(CarControllerBase):
 
     # *** handle secoc reset counter increase ***
     if self.CP.flags & ToyotaFlags.SECOC.value:
+      # the key is set after init, so build the signer when it's first needed or changes
+      if self.secoc_signer is None or self.secoc_signer.key != self.secoc_key:
+        self.secoc_signer = SecOCSigner(self.secoc_key)
+
       if CS.secoc_synchronization['RESET_CNT'] != self.secoc_prev_reset_counter:
         self.secoc_lka_message_counter = 0
         self.secoc_lta_message_counter = 0
         self.secoc_acc_message_counter = 0
         self.secoc_prev_reset_counter = CS.secoc_synchronization['RESET_CNT']
 
-        expected_mac = build_sync_mac(self.secoc_key, int(CS.secoc_synchronization['TRIP_CNT']), int(CS.secoc_synchronization['RESET_CNT']))
+        expected_mac = self.secoc_signer.build_sync_mac(int(CS.secoc_synchronization['TRIP_CNT']), int(CS.secoc_synchronization['RESET_CNT']))
         if int(CS.secoc_synchronization['AUTHENTICATOR']) != expected_mac:
           carlog.error("SecOC synchronization MAC mismatch, wrong key?")
 
@@ -160,24 +165,19 @@ class CarController(CarControllerBase):
         new_torque = sum_steer / l
         # with open('/tmp/debug_out_v','w') as fp:
         #   fp.write("ct:%d,%+.2f/%+.2f(%+.3f)" % (int(l),new_torque,new_torque0,new_torque-new_torque0))
-    try:
-      with open('/dev/shm/lane_d_info.txt','r') as fp:
-        lane_d_info_str = fp.read()
-        if lane_d_info_str:
-          lane_d_info = float(lane_d_info_str)
-          # nn_lane_d_info = 0 if new_torque == 0 else lane_d_info / new_torque
-          # with open('/tmp/debug_out_v','w') as fp:
-          #   fp.write('ns:%.7f/%.5f(%.1f%%)' % (new_torque,lane_d_info,nn_lane_d_info*100))
-          #new_torqueはマイナスで右に曲がる。
-          if CS.out.steeringPressed:
-            self.lane_return_power = 0
-          elif self.lane_return_power < 100:
-            self.lane_return_power += 1
-          new_torque -= lane_d_info * self.lane_return_power * 15 #引くとセンターへ車体を戻す。
-          # with open('/tmp/debug_out_v','w') as fp:
-          #   fp.write('lane_return_power:%d' % (self.lane_return_power))
-    except Exception as e:
-      pass
+    lane_d_info = self.shm.get('lane_d_info', max_age=LANE_D_INFO_MAX_AGE)
+    if lane_d_info is not None:
+      # nn_lane_d_info = 0 if new_torque == 0 else lane_d_info / new_torque
+      # with open('/tmp/debug_out_v','w') as fp:
+      #   fp.write('ns:%.7f/%.5f(%.1f%%)' % (new_torque,lane_d_info,nn_lane_d_info*100))
+      #new_torqueはマイナスで右に曲がる。
+      if CS.out.steeringPressed:
+        self.lane_return_power = 0
+      elif self.lane_return_power < 100:
+        self.lane_return_power += 1
+      new_torque -= lane_d_info * self.lane_return_power * 15 #引くとセンターへ車体を戻す。
+      # with open('/tmp/debug_out_v','w') as fp:
+      #   fp.write('lane_return_power:%d' % (self.lane_return_power))
     apply_torque = apply_meas_steer_torque_limits(new_torque, self.last_torque, CS.out.steeringTorqueEps, self.params)
 
     # >100 degree/sec steering fault prevention
@@ -209,11 +209,10 @@ class CarController(CarControllerBase):
     steer_command = toyotacan.create_steer_command(self.packer, apply_torque, apply_steer_req)
     if self.CP.flags & ToyotaFlags.SECOC.value:
       # TODO: check if this slow and needs to be done by the CANPacker
-      steer_command = add_mac(self.secoc_key,
-                              int(CS.secoc_synchronization['TRIP_CNT']),
-                              int(CS.secoc_synchronization['RESET_CNT']),
-                              self.secoc_lka_message_counter,
-                              steer_command)
+      steer_command = self.secoc_signer.add_mac(int(CS.secoc_synchronization['TRIP_CNT']),
+                                                int(CS.secoc_synchronization['RESET_CNT']),
+                                                self.secoc_lka_message_counter,
+                                                steer_command)
       self.secoc_lka_message_counter += 1
     can_sends.append(steer_command)
 
@@ -232,11 +231,10 @@ class CarController(CarControllerBase):
 
       if self.CP.flags & ToyotaFlags.SECOC.value:
         lta_steer_2 = toyotacan.create_lta_steer_command_2(self.packer, self.frame // 2)
-        lta_steer_2 = add_mac(self.secoc_key,
-                              int(CS.secoc_synchronization['TRIP_CNT']),
-                              int(CS.secoc_synchronization['RESET_CNT']),
-                              self.secoc_lta_message_counter,
-                              lta_steer_2)
+        lta_steer_2 = self.secoc_signer.add_mac(int(CS.secoc_synchronization['TRIP_CNT']),
+                                                int(CS.secoc_synchronization['RESET_CNT']),
+                                                self.secoc_lta_message_counter,
+                                                lta_steer_2)
         self.secoc_lta_message_counter += 1
         can_sends.append(lta_steer_2)
 
@@ -268,6 +266,7 @@ class CarController(CarControllerBase):
 
     self.last_standstill = CS.out.standstill
 
+    self.lock_speed = RUN_AUTO_LOCK.value
     if self.lock_speed > 0: #auto door lock , unlock
       gear = CS.out.gearShifter
       if self.now_gear != gear or (CS.out.doorOpen and self.lock_flag == True): #ギアが変わるか、ドアが開くか。
@@ -346,35 +345,17 @@ class CarController(CarControllerBase):
 
         pcm_accel_cmd = float(np.clip(pcm_accel_cmd, self.params.ACCEL_MIN, self.params.ACCEL_MAX))
 
-        try:
-          with open('/dev/shm/cruise_info.txt','r') as fp:
-            cruise_info_str = fp.read()
-            if cruise_info_str:
-              if cruise_info_str == "1" or cruise_info_str == ",1": #クリープしたければ以下を通さない。
-                with open('/dev/shm/accel_engaged.txt','r') as fp:
-                  accel_engaged_str = fp.read()
-                  eP_iP = False
-                  if int(accel_engaged_str) == 4 and os.path.exists('/dev/shm/red_signal_eP_iP_set.txt'):
-                    with open('/dev/shm/red_signal_eP_iP_set.txt','r') as fp:
-                      red_signal_eP_iP_set_str = fp.read()
-                      if red_signal_eP_iP_set_str and int(red_signal_eP_iP_set_str) == 1:
-                        eP_iP = True
-                  if int(accel_engaged_str) == 3 or eP_iP == True: #ワンペダルモードでもeP(一時的な赤信号手前を除く)では通さない
-                    if pcm_accel_cmd > 0:
-                      pcm_accel_cmd = 0
-                      # actuators_accel = 0
-        except Exception as e:
-          pass
+        if self.creep_blocked() and pcm_accel_cmd > 0:
+          pcm_accel_cmd = 0
         main_accel_cmd = 0. if self.CP.flags & ToyotaFlags.SECOC.value else pcm_accel_cmd
         can_sends.append(toyotacan.create_accel_command(self.packer, main_accel_cmd, pcm_cancel_cmd, self.permit_braking, self.standstill_req, lead,
                                                         CS.acc_type, fcw_alert, self.distance_button))
         if self.CP.flags & ToyotaFlags.SECOC.value:
           acc_cmd_2 = toyotacan.create_accel_command_2(self.packer, pcm_accel_cmd)
-          acc_cmd_2 = add_mac(self.secoc_key,
-                              int(CS.secoc_synchronization['TRIP_CNT']),
-                              int(CS.secoc_synchronization['RESET_CNT']),
-                              self.secoc_acc_message_counter,
-                              acc_cmd_2)
+          acc_cmd_2 = self.secoc_signer.add_mac(int(CS.secoc_synchronization['TRIP_CNT']),
+                                                int(CS.secoc_synchronization['RESET_CNT']),
+                                                self.secoc_acc_message_counter,
+                                                acc_cmd_2)
           self.secoc_acc_message_counter += 1
           can_sends.append(acc_cmd_2)
 
@@ -419,25 +400,9 @@ class CarController(CarControllerBase):
         else:
           pcm_accel_cmd = 0.
 
-        try:
-          with open('/dev/shm/cruise_info.txt','r') as fp:
-            cruise_info_str = fp.read()
-            if cruise_info_str:
-              if cruise_info_str == "1" or cruise_info_str == ",1": #クリープしたければ以下を通さない。
-                with open('/dev/shm/accel_engaged.txt','r') as fp:
-                  accel_engaged_str = fp.read()
-                  eP_iP = False
-                  if int(accel_engaged_str) == 4 and os.path.exists('/dev/shm/red_signal_eP_iP_set.txt'):
-                    with open('/dev/shm/red_signal_eP_iP_set.txt','r') as fp:
-                      red_signal_eP_iP_set_str = fp.read()
-                      if red_signal_eP_iP_set_str and int(red_signal_eP_iP_set_str) == 1:
-                        eP_iP = True
-                  if int(accel_engaged_str) == 3 or eP_iP == True: #ワンペダルモードでもeP(一時的な赤信号手前を除く)では通さない
-                    if pcm_accel_cmd > 0:
-                      pcm_accel_cmd = 0
-                      actuators_accel = 0
-        except Exception as e:
-          pass
+        if self.creep_blocked() and pcm_accel_cmd > 0:
+          pcm_accel_cmd = 0
+          actuators_accel = 0
 
         # calculate amount of acceleration PCM should apply to reach target, given pitch.
         # clipped to only include downhill angles, avoids erroneously unsetting PERMIT_BRAKING when stopping on uphills
@@ -456,11 +421,10 @@ class CarController(CarControllerBase):
 
         if self.CP.flags & ToyotaFlags.SECOC.value: #未検証
           acc_cmd_2 = toyotacan.create_accel_command_2(self.packer, pcm_accel_cmd)
-          acc_cmd_2 = add_mac(self.secoc_key,
-                              int(CS.secoc_synchronization['TRIP_CNT']),
-                              int(CS.secoc_synchronization['RESET_CNT']),
-                              self.secoc_acc_message_counter,
-                              acc_cmd_2)
+          acc_cmd_2 = self.secoc_signer.add_mac(int(CS.secoc_synchronization['TRIP_CNT']),
+                                                int(CS.secoc_synchronization['RESET_CNT']),
+                                                self.secoc_acc_message_counter,
+                                                acc_cmd_2)
           self.secoc_acc_message_counter += 1
           can_sends.append(acc_cmd_2)
 
@@ -493,7 +457,8 @@ class CarController(CarControllerBase):
       if self.frame % 20 == 0 or send_ui:
         can_sends.append(toyotacan.create_ui_command(self.packer, steer_alert, pcm_cancel_cmd, hud_control.leftLaneVisible,
                                                      hud_control.rightLaneVisible, hud_control.leftLaneDepart,
-                                                     hud_control.rightLaneDepart, CC.enabled, CS.lkas_hud))
+                                                     hud_control.rightLaneDepart, CC.enabled, CS.lkas_hud,
+                                                     self.shm.get('steer_always'), self.shm.get('cruise_available')))
 
       if (self.frame % 100 == 0 or send_ui) and self.CP.flags & ToyotaFlags.DISABLE_RADAR.value:
         can_sends.append(toyotacan.create_fcw_command(self.packer, fcw_alert))
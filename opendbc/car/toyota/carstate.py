@@ -1,11 +1,11 @@
 import copy
 
 from opendbc.can import CANDefine, CANParser
-from opendbc.car import Bus, DT_CTRL, create_button_events, structs
+from opendbc.car import Bus, DT_CTRL, create_button_events, mirrors, structs
 from opendbc.car.common.conversions import Conversions as CV
 from opendbc.car.common.filter_simple import FirstOrderFilter
 from opendbc.car.interfaces import CarStateBase
-from opendbc.car.toyota.values import ToyotaFlags, CAR, DBC, STEER_THRESHOLD, EPS_SCALE
+from opendbc.car.toyota.values import ToyotaFlags, CAR, DBC, STEER_THRESHOLD, EPS_SCALE, KNIGHT_SCANNER_BIT3, STEER_ALWAYS_PATH, shm_channel
 
 ButtonType = structs.CarState.ButtonEvent.Type
 SteerControlType = structs.CarParams.SteerControlType
@@ -46,6 +46,14 @@ class CarState(CarStateBase):
     self.prev_hazard = -1
 
     self.brake_state = False
+    self.shm = shm_channel()
+    # a new channel (after a reboot) starts from the persisted LKAS button state
+    if self.shm.age('steer_always') is None:
+      try:
+        with open(STEER_ALWAYS_PATH) as fp:
+          self.shm.put('steer_always', int(fp.read() or 0))
+      except (OSError, ValueError):
+        pass
     # self.params = Params()
     # self.flag_eps_TSS2 = True if CP.flags & ToyotaFlags.POWER_STEERING_TSS2.value else False
     self.before_ang = 0
@@ -63,23 +71,15 @@ class CarState(CarStateBase):
     self.gvc = 0.0
     self.secoc_synchronization = None
 
-  def update(self, can_parsers) -> structs.CarState:
+  def update(self, can_parsers) -> mirrors.CarState:
     cp = can_parsers[Bus.pt]
     cp_cam = can_parsers[Bus.cam]
 
-    ret = structs.CarState()
-    if self.knight_scanner_bit3_ct == 0:
-      try:
-        with open('/dev/shm/knight_scanner_bit3.txt','r') as fp:
-          knight_scanner_bit3_str = fp.read()
-          if knight_scanner_bit3_str:
-            self.knight_scanner_bit3  = int(knight_scanner_bit3_str)
-      except Exception as e:
-        # self.knight_scanner_bit3  = 7 #ここでデフォ設定はしない、値を継続させるため。
-        # ⚫︎⚪︎⚪︎　空き,2024/7/31
-        # ⚪︎⚫︎⚪︎　new_steer平滑化,2024/1/14
-        # ⚪︎⚪︎⚫︎　ハンドル高精細化未来予想2024/1/19
-        pass
+    ret = mirrors.CarState()
+    # ⚫︎⚪︎⚪︎　空き,2024/7/31
+    # ⚪︎⚫︎⚪︎　new_steer平滑化,2024/1/14
+    # ⚪︎⚪︎⚫︎　ハンドル高精細化未来予想2024/1/19
+    self.knight_scanner_bit3 = KNIGHT_SCANNER_BIT3.value
     self.knight_scanner_bit3_ct = (self.knight_scanner_bit3_ct + 1) % 101
     cp_acc = cp_cam if ((self.CP.flags & ToyotaFlags.TSS2) and not (self.CP.flags & ToyotaFlags.RADAR_ACC)) or bool(self.CP.flags & ToyotaFlags.DSU_BYPASS.value) else cp
 
@@ -147,8 +147,7 @@ class CarState(CarStateBase):
 
     self.steeringAngleDegOrg = ret.steeringAngleDeg #回転先予想する前のオリジナル値
     if (self.knight_scanner_bit3_ct & 0x3) == 1:
-      with open('/dev/shm/steer_ang_info.txt','w') as fp:
-       fp.write('%f' % (self.steeringAngleDegOrg))
+      self.shm.put('steer_ang_info', self.steeringAngleDegOrg)
     # if self.CP.flags & ToyotaFlags.TSS2:
     if (self.knight_scanner_bit3 & 0x04) and abs(self.steeringAngleDegOrg) < 35: # knight_scanner_bit3.txt ⚪︎⚪︎⚫︎をONで有効, 35度以上急カーブは補正止める
       steeringAngleDeg0 = ret.steeringAngleDeg
@@ -179,8 +178,7 @@ class CarState(CarStateBase):
     hazard = cp.vl["BLINKERS_STATE"]["HAZARD_LIGHT"]
     if self.prev_hazard != hazard:
       self.prev_hazard = hazard
-      with open('/tmp/hazard_light.txt','w') as fp:
-        fp.write("%d" % (hazard))
+      self.shm.put('hazard_light', hazard)
 
     ret.steeringTorque = cp.vl["STEER_TORQUE_SENSOR"]["STEER_TORQUE_DRIVER"]
     ret.steeringTorqueEps = cp.vl["STEER_TORQUE_SENSOR"]["STEER_TORQUE_EPS"] * self.eps_torque_scale
@@ -203,8 +201,7 @@ class CarState(CarStateBase):
     new_brake_state = bool(cp.vl["ESP_CONTROL"]['BRAKE_LIGHTS_ACC'] or cp.vl["BRAKE_MODULE"]["BRAKE_PRESSED"] != 0)
     if self.brake_state != new_brake_state:
       self.brake_state = new_brake_state
-      with open('/dev/shm/brake_light_state.txt','w') as fp:
-        fp.write('%d' % (new_brake_state))
+      self.shm.put('brake_light_state', new_brake_state)
 
     if self.CP.flags & ToyotaFlags.UNSUPPORTED_DSU:
       # TODO: find the bit likely in DSU_CRUISE that describes an ACC fault. one may also exist in CLUTCH
@@ -257,30 +254,19 @@ class CarState(CarStateBase):
       self.lkas_enabled = cp_cam.vl["LKAS_HUD"]["LKAS_STATUS"]
       if self.prev_lkas_enabled is None:
         self.prev_lkas_enabled = self.lkas_enabled
-      steer_always = 0
-      try:
-        with open('/dev/shm/steer_always.txt','r') as fp:
-          steer_always_str = fp.read()
-          if steer_always_str:
-            if int(steer_always_str) >= 1:
-              steer_always = 2
-      except Exception as e:
-        pass
+      steer_always = 2 if self.shm.get('steer_always') >= 1 else 0
       # with open('/tmp/debug_out_v','w') as fp:
       #   fp.write("lkas_enabled:%d,%d,<%d,%d>" % (self.lkas_enabled,self.prev_lkas_enabled,steer_always,ret.cruiseState.available))
-      with open('/dev/shm/cruise_available.txt','w') as fp:
-        fp.write('%d' % (ret.cruiseState.available and ret.gearShifter != structs.CarState.GearShifter.reverse)) #念の為バック時にはfalse
+      self.shm.put('cruise_available', ret.cruiseState.available and ret.gearShifter != structs.CarState.GearShifter.reverse) #念の為バック時にはfalse
 
       #TSS2はLKASボタンがうまくいかないので、ボタンで制御して。
       if not self.prev_lkas_enabled and self.lkas_enabled and steer_always == 0:# and not self.CP.flags & ToyotaFlags.TSS2:# and ret.cruiseState.available:
-        with open('/dev/shm/steer_always.txt','w') as fp:
-         fp.write('%d' % 1)
-        with open('/data/steer_always.txt','w') as fp:
+        self.shm.put('steer_always', 1)
+        with open(STEER_ALWAYS_PATH,'w') as fp:
          fp.write('%d' % 1)
       elif (self.prev_lkas_enabled and not self.lkas_enabled and steer_always != 0):# not self.CP.flags & ToyotaFlags.TSS2:# or not ret.cruiseState.available:
-        with open('/dev/shm/steer_always.txt','w') as fp:
-         fp.write('%d' % 0)
-        with open('/data/steer_always.txt','w') as fp:
+        self.shm.put('steer_always', 0)
+        with open(STEER_ALWAYS_PATH,'w') as fp:
          fp.write('%d' % 0)
       self.prev_lkas_enabled = self.lkas_enabled
 
@@ -14,6 +14,13 @@ SteerControlType = structs.CarParams.SteerControlType
 
 # NowStandStill = False
 
+# toggles _get_params reads
+IGNORE_REROUTE_HARNESS = "IgnoreRerouteHarness"
+FORCE_HYBRID_VEHICLE = "ForceHybridVehicle"
+ACCEL_METHOD_SWITCH = "AccelMethodSwitch"
+PARAMS_TOGGLES = (IGNORE_REROUTE_HARNESS, FORCE_HYBRID_VEHICLE, ACCEL_METHOD_SWITCH)
+
+
 class CarInterface(CarInterfaceBase):
   CarState = CarState
   CarController = CarController
@@ -25,6 +32,11 @@ class CarInterface(CarInterfaceBase):
   def get_pid_accel_limits(CP, current_speed, cruise_speed):
     return CarControllerParams(CP).ACCEL_MIN, CarControllerParams(CP).ACCEL_MAX
 
+  @classmethod
+  def _template_params_key(cls) -> tuple:
+    params = Params()
+    return tuple(params.get_bool(k) for k in PARAMS_TOGGLES)
+
   @staticmethod
   def _get_params(ret: structs.CarParams, candidate, fingerprint, car_fw, alpha_long, is_release, docs) -> structs.CarParams:
     ret.brand = "toyota"
@@ -65,7 +77,7 @@ class CarInterface(CarInterfaceBase):
     # Detect 0x343 on bus 2, if detected on bus 2 and is not TSS 2, it means DSU is bypassed
     if not (ret.flags & ToyotaFlags.SMART_DSU) and 0x343 in fingerprint[2] and ret.flags & ToyotaFlags.TSS2:
       #SMART_DSUと共存できない。
-      if Params().get_bool("IgnoreRerouteHarness") == False: #リルートハーネス装着の区別ができないので、機能にスイッチをつけた。
+      if Params().get_bool(IGNORE_REROUTE_HARNESS) == False: #リルートハーネス装着の区別ができないので、機能にスイッチをつけた。
         ret.flags |= ToyotaFlags.DSU_BYPASS.value
       else:
         #DSUが接続されているTSSP車両
@@ -74,10 +86,10 @@ class CarInterface(CarInterfaceBase):
     # In TSS2 cars, the camera does long control
     found_ecus = [fw.ecu for fw in car_fw]
 
-    if (Ecu.hybrid in found_ecus) or Params().get_bool("ForceHybridVehicle") == True:
+    if (Ecu.hybrid in found_ecus) or Params().get_bool(FORCE_HYBRID_VEHICLE) == True:
       ret.flags |= ToyotaFlags.HYBRID.value
 
-    if Params().get_bool("AccelMethodSwitch") == True: # ichiropilot
+    if Params().get_bool(ACCEL_METHOD_SWITCH) == True: # ichiropilot
       ret.flags |= ToyotaFlags.RAISED_ACCEL_LIMIT.value #公式縦制御
 
     if candidate == CAR.TOYOTA_PRIUS:
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
+import numpy as np
+
 from opendbc.can import CANParser
 from opendbc.car import Bus
 from opendbc.car.structs import RadarData
 from opendbc.car.toyota.values import DBC, ToyotaFlags
 from opendbc.car.interfaces import RadarInterfaceBase
+from opendbc.car.radar_tracks import RadarTrackTable, set_points
 
 
 def _create_radar_can_parser(CP):
@@ -33,12 +36,16 @@ class RadarInterface(RadarInterfaceBase):
       self.RADAR_A_MSGS = list(range(0x210, 0x220))
       self.RADAR_B_MSGS = list(range(0x220, 0x230))
 
-    self.valid_cnt = {key: 0 for key in self.RADAR_A_MSGS}
+    self.valid_cnt = np.zeros(len(self.RADAR_A_MSGS), dtype=np.int64)
 
     self.rcp = None if CP.radarUnavailable else _create_radar_can_parser(CP)
     self.trigger_msg = self.RADAR_B_MSGS[-1]
     self.updated_messages = set()
 
+    if self.rcp is not None:
+      self.tracks_a = RadarTrackTable(self.rcp, self.RADAR_A_MSGS, ('LONG_DIST', 'LAT_DIST', 'REL_SPEED', 'VALID', 'NEW_TRACK'))
+      self.tracks_b = RadarTrackTable(self.rcp, self.RADAR_B_MSGS, ('SCORE',))
+
   def update(self, can_strings):
     if self.rcp is None:
       return super().update(None)
@@ -62,32 +69,23 @@ class RadarInterface(RadarInterfaceBase):
     if self.rcp.vl['STATUS_MSG']['RADAR_STATUS'] != 1 or self.rcp.vl['STATUS_MSG']['RADAR_PRE_FAULT'] != 0:
       ret.errors.radarUnavailableTemporary = True
 
-    for ii in sorted(updated_messages):
-      if ii in self.RADAR_A_MSGS:
-        cpt = self.rcp.vl[ii]
-
-        if cpt['LONG_DIST'] >= 255 or cpt['NEW_TRACK']:
-          self.valid_cnt[ii] = 0    # reset counter
-        if cpt['VALID'] and cpt['LONG_DIST'] < 255:
-          self.valid_cnt[ii] += 1
-        else:
-          self.valid_cnt[ii] = max(self.valid_cnt[ii] - 1, 0)
-
-        score = self.rcp.vl[ii+16]['SCORE']
-        # print ii, self.valid_cnt[ii], score, cpt['VALID'], cpt['LONG_DIST'], cpt['LAT_DIST']
-
-        # radar point only valid if it's a valid measurement and score is above 50
-        if cpt['VALID'] or (score > 50 and cpt['LONG_DIST'] < 255 and self.valid_cnt[ii] > 0):
-          if ii not in self.pts or cpt['NEW_TRACK']:
-            self.pts[ii] = RadarData.RadarPoint()
-            self.pts[ii].trackId = self.track_id
-            self.track_id += 1
-          self.pts[ii].dRel = cpt['LONG_DIST']  # from front of car
-          self.pts[ii].yRel = -cpt['LAT_DIST']  # in car frame's y axis, left is positive
-          self.pts[ii].vRel = cpt['REL_SPEED']
-        else:
-          if ii in self.pts:
-            del self.pts[ii]
-
-    ret.points = list(self.pts.values())
+    a = self.tracks_a.read()
+    score = self.tracks_b.read()['SCORE']
+    updated = np.array([addr in updated_messages for addr in self.RADAR_A_MSGS])
+
+    long_dist = a['LONG_DIST']
+    valid, new_track = a['VALID'] != 0, a['NEW_TRACK'] != 0
+    in_range = long_dist < 255
+
+    # only tracks whose message was updated this cycle change
+    valid_cnt = np.where(~in_range | new_track, 0, self.valid_cnt)
+    valid_cnt = np.where(valid & in_range, valid_cnt + 1, np.maximum(valid_cnt - 1, 0))
+    self.valid_cnt = np.where(updated, valid_cnt, self.valid_cnt)
+
+    # radar point only valid if it's a valid measurement and score is above 50
+    keep = valid | ((score > 50) & in_range & (self.valid_cnt > 0))
+    # dRel is from front of car, yRel is in car frame's y axis, left is positive
+    self._update_points(self.RADAR_A_MSGS, updated, keep, new_track, long_dist, -a['LAT_DIST'], a['REL_SPEED'])
+
+    set_points(ret, self.pts.values())
     return ret
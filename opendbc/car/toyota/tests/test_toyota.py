@@ -1,11 +1,17 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
 
-from opendbc.car import Bus
+from opendbc.car import Bus, structs
 from opendbc.car.structs import CarParams
 from opendbc.car.fw_versions import build_fw_dict
+from opendbc.car.shm_channel import ShmChannel
+from opendbc.car.toyota import carstate, interface
 from opendbc.car.toyota.fingerprints import FW_VERSIONS
+from opendbc.car.toyota.interface import CarInterface
 from opendbc.car.toyota.values import CAR, DBC, ToyotaFlags, FW_QUERY_CONFIG, PLATFORM_CODE_ECUS, \
-                                                  FUZZY_EXCLUDED_PLATFORMS, get_platform_codes
+                                                  FUZZY_EXCLUDED_PLATFORMS, RUN_AUTO_LOCK, SHM_CHANNEL_NAME, SHM_FIELDS, get_platform_codes
 from opendbc.testing import fuzzy_test
 
 Ecu = CarParams.Ecu
@@ -55,6 +61,66 @@ class TestToyotaInterfaces(unittest.TestCase):
         if car_model not in (CAR.TOYOTA_PRIUS_V, CAR.LEXUS_CTH):
           assert Ecu.eps in present_ecus
 
+  def test_steer_always_persisted(self):
+    CP = CarInterface.get_non_essential_params(CAR.TOYOTA_RAV4)
+    with tempfile.TemporaryDirectory() as tmp:
+      path = os.path.join(tmp, "steer_always.txt")
+      with open(path, "w") as f:
+        f.write("1")
+      ch = ShmChannel(SHM_CHANNEL_NAME, SHM_FIELDS, directory=tmp)
+      self.addCleanup(ch.close)
+
+      with mock.patch.object(carstate, "STEER_ALWAYS_PATH", path), mock.patch.object(carstate, "shm_channel", return_value=ch):
+        # a new channel starts from the persisted state, a running one keeps its own
+        carstate.CarState(CP)
+        assert ch.get("steer_always") == 1
+        ch.put("steer_always", 0)
+        carstate.CarState(CP)
+        assert ch.get("steer_always") == 0
+
+  def test_template_params_follow_toggles(self):
+    toggles: dict[str, bool] = {}
+
+    class FakeParams:
+      def get_bool(self, key):
+        return toggles.get(key, False)
+
+    with mock.patch.object(interface, "Params", FakeParams):
+      for _ in range(2):
+        CP = CarInterface.get_non_essential_params(CAR.TOYOTA_RAV4_TSS2)
+        assert not CP.flags & (ToyotaFlags.HYBRID | ToyotaFlags.RAISED_ACCEL_LIMIT)
+
+      # the cached template is rebuilt when a toggle _get_params reads changes
+      toggles[interface.FORCE_HYBRID_VEHICLE] = True
+      CP = CarInterface.get_non_essential_params(CAR.TOYOTA_RAV4_TSS2)
+      assert CP.flags & ToyotaFlags.HYBRID and not CP.flags & ToyotaFlags.RAISED_ACCEL_LIMIT
+      toggles[interface.ACCEL_METHOD_SWITCH] = True
+      CP = CarInterface.get_non_essential_params(CAR.TOYOTA_RAV4_TSS2)
+      assert CP.flags & ToyotaFlags.HYBRID and CP.flags & ToyotaFlags.RAISED_ACCEL_LIMIT
+
+      toggles.clear()
+      CP = CarInterface.get_non_essential_params(CAR.TOYOTA_RAV4_TSS2)
+      assert not CP.flags & (ToyotaFlags.HYBRID | ToyotaFlags.RAISED_ACCEL_LIMIT)
+
+  def test_auto_lock_follows_override(self):
+    CI = CarInterface(CarInterface.get_non_essential_params(CAR.TOYOTA_RAV4))
+    CI.CS.out.gearShifter = structs.CarState.GearShifter.drive
+    CI.CS.out.vEgo = 10.
+    CC = structs.CarControl().as_reader()
+
+    def lock_msgs(frames):
+      # (address, dat, bus)
+      return [msg[1] for _ in range(frames) for msg in CI.apply(CC, 0)[1] if msg[0] == 0x750]
+
+    # the lock speed is read every frame, so changing the file takes effect without a restart
+    with mock.patch.object(RUN_AUTO_LOCK, "value", 0):
+      assert lock_msgs(3) == []
+    with mock.patch.object(RUN_AUTO_LOCK, "value", 30):
+      assert lock_msgs(3) == [b'\x40\x05\x30\x11\x00\x80\x00\x00']
+    with mock.patch.object(RUN_AUTO_LOCK, "value", 60):
+      CI.CS.out.gearShifter = structs.CarState.GearShifter.park
+      assert lock_msgs(1) == [b'\x40\x05\x30\x11\x00\x40\x00\x00']
+
 
 class TestToyotaFingerprint(unittest.TestCase):
   def test_non_essential_ecus(self):
@@ -126,22 +126,10 @@ def create_fcw_command(packer, fcw):
   return packer.make_can_msg("PCS_HUD", 0, values)
 
 
-def create_ui_command(packer, steer, chime, left_line, right_line, left_lane_depart, right_lane_depart, enabled, stock_lkas_hud):
-  steer_always = 0
-  cruise_available = 0
-  try:
-    with open('/dev/shm/steer_always.txt','r') as fp:
-      steer_always_str = fp.read()
-      if steer_always_str:
-        if int(steer_always_str) >= 1:
-          steer_always = 2
-    with open('/dev/shm/cruise_available.txt','r') as fp:
-      cruise_available_str = fp.read()
-      if cruise_available_str:
-        if int(cruise_available_str) >= 1:
-          cruise_available = 1 #ACCボタンがOFFならBARRIERSを有効にしない。
-  except Exception as e:
-    pass
+def create_ui_command(packer, steer, chime, left_line, right_line, left_lane_depart, right_lane_depart, enabled, stock_lkas_hud,
+                      steer_always=0, cruise_available=False):
+  steer_always = 2 if steer_always >= 1 else 0
+  cruise_available = 1 if cruise_available else 0 #ACCボタンがOFFならBARRIERSを有効にしない。
 
   values = {
     "TWO_BEEPS": chime,
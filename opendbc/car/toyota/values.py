@@ -2,6 +2,7 @@ import re
 from collections import defaultdict
 from dataclasses import dataclass, field
 from enum import Enum, IntFlag
+from functools import cache
 
 from opendbc.car import Bus, CarSpecs, PlatformConfig, Platforms
 from opendbc.car.lateral import AngleSteeringLimits
@@ -9,6 +10,8 @@ from opendbc.car.common.conversions import Conversions as CV
 from opendbc.car.structs import CarParams
 from opendbc.car.docs_definitions import CarFootnote, CarDocs, Column, CarParts, CarHarness, SupportType
 from opendbc.car.fw_query_definitions import FwQueryConfig, Request, StdQueries
+from opendbc.car.overrides import OVERRIDES
+from opendbc.car.shm_channel import ShmChannel
 
 Ecu = CarParams.Ecu
 MIN_ACC_SPEED = 19. * CV.MPH_TO_MS
@@ -591,4 +594,35 @@ STEER_THRESHOLD = 100
 EPS_SCALE = defaultdict(lambda: 73,
                         {CAR.TOYOTA_PRIUS: 66, CAR.TOYOTA_COROLLA: 88, CAR.LEXUS_IS: 77, CAR.LEXUS_RC: 77, CAR.LEXUS_CTH: 100, CAR.TOYOTA_PRIUS_V: 100})
 
-DBC = CAR.create_dbc_map()
\ No newline at end of file
+DBC = CAR.create_dbc_map()
+
+# values shared with the UI and planner processes every frame, see ShmChannel
+SHM_CHANNEL_NAME = "opendbc_toyota"
+SHM_FIELDS: dict[str, tuple[type, object]] = {
+  # written by other processes
+  "lane_d_info": (float, None),  # lateral offset to pull back towards the lane center, unused once cleared or stale
+  "cruise_info": (str, ""),
+  "accel_engaged": (int, 0),  # 3: one pedal mode, 4: one pedal mode that allows creep
+  "red_signal_eP_iP_set": (int, 0),  # 1: stop creeping in mode 4 too
+  # written by CarState, steer_always by the UI as well
+  "steer_always": (int, 0),
+  "cruise_available": (bool, False),
+  "steer_ang_info": (float, 0.),
+  "brake_light_state": (bool, False),
+  "hazard_light": (int, 0),
+}
+# lane_d_info is written every model frame, a writer that stops or crashes must not keep pulling the wheel
+LANE_D_INFO_MAX_AGE = 0.5  # s
+# steer_always survives restarts here, CarState seeds the channel from it
+STEER_ALWAYS_PATH = "/data/steer_always.txt"
+
+
+@cache
+def shm_channel() -> ShmChannel:
+  return ShmChannel(SHM_CHANNEL_NAME, SHM_FIELDS)
+
+
+# feature bits, see CarState.update. a removed file keeps the last value
+KNIGHT_SCANNER_BIT3 = OVERRIDES.register("knight_scanner_bit3", "/dev/shm/knight_scanner_bit3.txt", int, 7, sticky=True)
+# ロックするスピード(km/h)をテキストで30みたいに書いておく。ファイルが無いか0でオートロック無し。
+RUN_AUTO_LOCK = OVERRIDES.register("run_auto_lock", "/data/run_auto_lock.txt", int, 0)
\ No newline at end of file
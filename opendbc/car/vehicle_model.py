@@ -43,6 +43,7 @@ class VehicleModel:
     self.cF: float = stiffness_factor * self.cF_orig
     self.cR: float = stiffness_factor * self.cR_orig
     self.sR: float = steer_ratio
+    self.sf: float = calc_slip_factor(self)
 
   def steady_state_sol(self, sa: float, u: float, roll: float) -> np.ndarray:
     """Returns the steady state solution.
@@ -63,8 +64,25 @@ class VehicleModel:
     else:
       return kin_ss_sol(sa, u, self)
 
+  def steady_state_sol_many(self, sa: np.ndarray, u: np.ndarray, roll: np.ndarray) -> np.ndarray:
+    """steady_state_sol over arrays of samples, which broadcast together
+
+    Args:
+      sa: Steering wheel angle [rad]
+      u: Speed [m/s]
+      roll: Road Roll [rad]
+
+    Returns:
+      nx2 array with the steady state solution (lateral speed, rotational speed) of each sample
+    """
+    sa, u, roll = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (sa, u, roll)))
+    dynamic = u > 0.1
+    # the dynamic model divides by the speed, keep low speeds away from zero and take the kinematic solution there
+    return np.where(dynamic[..., None], dyn_ss_sol_many(sa, np.where(dynamic, u, 1.), roll, self), kin_ss_sol_many(sa, u, self))
+
   def calc_curvature(self, sa: float, u: float, roll: float) -> float:
     """Returns the curvature. Multiplied by the speed this will give the yaw rate.
+    Like the other curvature and steer methods, it also takes NumPy arrays and returns one.
 
     Args:
       sa: Steering wheel angle [rad]
@@ -86,8 +104,7 @@ class VehicleModel:
     Returns:
       Curvature factor [1/m]
     """
-    sf = calc_slip_factor(self)
-    return (1. - self.chi) / (1. - sf * u**2) / self.l
+    return (1. - self.chi) / (1. - self.sf * u**2) / self.l
 
   def get_steer_from_curvature(self, curv: float, u: float, roll: float) -> float:
     """Calculates the required steering wheel angle for a given curvature
@@ -113,12 +130,10 @@ class VehicleModel:
     Returns:
       Roll compensation curvature [1/m]
     """
-    sf = calc_slip_factor(self)
-
-    if abs(sf) < 1e-6:
+    if abs(self.sf) < 1e-6:
       return 0
     else:
-      return (ACCELERATION_DUE_TO_GRAVITY * roll) / ((1 / sf) - u**2)
+      return (ACCELERATION_DUE_TO_GRAVITY * roll) / ((1 / self.sf) - u**2)
 
   def get_steer_from_yaw_rate(self, yaw_rate: float, u: float, roll: float) -> float:
     """Calculates the required steering wheel angle for a given yaw_rate
@@ -167,6 +182,11 @@ def kin_ss_sol(sa: float, u: float, VM: VehicleModel) -> np.ndarray:
   return K * sa
 
 
+def kin_ss_sol_many(sa: np.ndarray, u: np.ndarray, VM: VehicleModel) -> np.ndarray:
+  """kin_ss_sol over arrays of samples, returns an nx2 array"""
+  return np.stack((VM.aR / VM.sR / VM.l * u * sa, 1. / VM.sR / VM.l * u * sa), axis=-1)
+
+
 def create_dyn_state_matrices(u: float, VM: VehicleModel) -> tuple[np.ndarray, np.ndarray]:
   """Returns the A and B matrix for the dynamics system
 
@@ -222,6 +242,26 @@ def dyn_ss_sol(sa: float, u: float, roll: float, VM: VehicleModel) -> np.ndarray
   return -solve(A, B) @ inp
 
 
+def dyn_ss_sol_many(sa: np.ndarray, u: np.ndarray, roll: np.ndarray, VM: VehicleModel) -> np.ndarray:
+  """dyn_ss_sol over arrays of samples, returns an nx2 array. Solves each 2x2 system in closed form
+  instead of building the matrices of create_dyn_state_matrices per sample.
+  """
+  # A, only the steering and roll entries of B are non-zero
+  a00 = - (VM.cF + VM.cR) / (VM.m * u)
+  a01 = - (VM.cF * VM.aF - VM.cR * VM.aR) / (VM.m * u) - u
+  a10 = - (VM.cF * VM.aF - VM.cR * VM.aR) / (VM.j * u)
+  a11 = - (VM.cF * VM.aF**2 + VM.cR * VM.aR**2) / (VM.j * u)
+  b00 = (VM.cF + VM.chi * VM.cR) / VM.m / VM.sR
+  b10 = (VM.cF * VM.aF - VM.chi * VM.cR * VM.aR) / VM.j / VM.sR
+  b01 = -ACCELERATION_DUE_TO_GRAVITY
+
+  # x = -A^-1 B [sa, roll]
+  w0 = b00 * sa + b01 * roll
+  w1 = b10 * sa
+  det = a00 * a11 - a01 * a10
+  return np.stack((-(a11 * w0 - a01 * w1) / det, -(a00 * w1 - a10 * w0) / det), axis=-1)
+
+
 def calc_slip_factor(VM: VehicleModel) -> float:
   """The slip factor is a measure of how the curvature changes with speed
   it's positive for Oversteering vehicle, negative (usual case) otherwise.
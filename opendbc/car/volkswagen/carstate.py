@@ -1,5 +1,5 @@
 from opendbc.can import CANParser
-from opendbc.car import Bus, structs
+from opendbc.car import Bus, mirrors, structs
 from opendbc.car.interfaces import CarStateBase
 from opendbc.car.common.conversions import Conversions as CV
 from opendbc.car.volkswagen.values import DBC, CanBus, NetworkLocation, TransmissionType, GearShifter, \
@@ -23,7 +23,7 @@ class CarState(CarStateBase):
     self.travel_assist_available = False
     self.curvature_meas = 0.
 
-  def update_button_enable(self, buttonEvents: list[structs.CarState.ButtonEvent]):
+  def update_button_enable(self, buttonEvents: list[mirrors.CarState.ButtonEvent]):
     if not self.CP.pcmCruise:
       for b in buttonEvents:
         # Enable OP long on falling edge of enable buttons
@@ -37,7 +37,7 @@ class CarState(CarStateBase):
     for button in buttons:
       state = pt_cp.vl[button.can_addr][button.can_msg] in button.values
       if self.button_states[button.event_type] != state:
-        event = structs.CarState.ButtonEvent()
+        event = mirrors.CarState.ButtonEvent()
         event.type = button.event_type
         event.pressed = state
         button_events.append(event)
@@ -45,7 +45,7 @@ class CarState(CarStateBase):
 
     return button_events
 
-  def update(self, can_parsers) -> structs.CarState:
+  def update(self, can_parsers) -> mirrors.CarState:
     pt_cp = can_parsers[Bus.pt]
     cam_cp = can_parsers[Bus.cam]
     ext_cp = pt_cp if self.CP.networkLocation == NetworkLocation.fwdCamera else cam_cp
@@ -60,8 +60,8 @@ class CarState(CarStateBase):
     else:
       return self.update_mqb(pt_cp, cam_cp, ext_cp)
 
-  def update_mqb(self, pt_cp, cam_cp, ext_cp) -> structs.CarState:
-    ret = structs.CarState()
+  def update_mqb(self, pt_cp, cam_cp, ext_cp) -> mirrors.CarState:
+    ret = mirrors.CarState()
 
     if self.CP.transmissionType == TransmissionType.direct:
       ret.gearShifter = self.parse_gear_shifter(self.CCP.shifter_values.get(pt_cp.vl["Motor_EV_01"]["MO_Waehlpos"], None))
@@ -145,8 +145,8 @@ class CarState(CarStateBase):
     self.frame += 1
     return ret
 
-  def update_pq(self, pt_cp, cam_cp, ext_cp) -> structs.CarState:
-    ret = structs.CarState()
+  def update_pq(self, pt_cp, cam_cp, ext_cp) -> mirrors.CarState:
+    ret = mirrors.CarState()
 
     # vEgo obtained from Bremse_1 vehicle speed rather than Bremse_3 wheel speeds because Bremse_3 isn't present on NSF
     ret.vEgoRaw = pt_cp.vl["Bremse_1"]["BR1_Rad_kmh"] * CV.KPH_TO_MS
@@ -235,8 +235,8 @@ class CarState(CarStateBase):
     self.frame += 1
     return ret
 
-  def update_meb(self, pt_cp, cam_cp, ext_cp) -> structs.CarState:
-    ret = structs.CarState()
+  def update_meb(self, pt_cp, cam_cp, ext_cp) -> mirrors.CarState:
+    ret = mirrors.CarState()
 
     self.parse_wheel_speeds(ret,
       pt_cp.vl["ESC_51"]["VL_Radgeschw"],
@@ -320,8 +320,8 @@ class CarState(CarStateBase):
     self.frame += 1
     return ret
 
-  def update_mlb(self, pt_cp, cam_cp, ext_cp, alt_cp) -> structs.CarState:
-    ret = structs.CarState()
+  def update_mlb(self, pt_cp, cam_cp, ext_cp, alt_cp) -> mirrors.CarState:
+    ret = mirrors.CarState()
 
     self.parse_wheel_speeds(ret,
       pt_cp.vl["ESP_03"]["ESP_VL_Radgeschw"],
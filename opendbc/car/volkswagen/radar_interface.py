@@ -1,6 +1,7 @@
 from opendbc.can import CANParser
 from opendbc.car import Bus, structs
 from opendbc.car.interfaces import RadarInterfaceBase
+from opendbc.car.radar_tracks import set_points
 from opendbc.car.volkswagen.values import DBC, VolkswagenFlags, CanBus
 
 NO_OBJECT_ID = 0
@@ -66,10 +67,8 @@ class RadarInterface(RadarInterfaceBase):
       seen_ids.add(obj_id)
 
       if obj_id not in self.pts:
-        pt = structs.RadarData.RadarPoint()
-        pt.trackId = self.track_id
+        pt = self._new_point(obj_id, self.track_id)
         self.track_id += 1
-        self.pts[obj_id] = pt
       else:
         pt = self.pts[obj_id]
 
@@ -79,7 +78,7 @@ class RadarInterface(RadarInterfaceBase):
 
     inactive_ids = self.pts.keys() - seen_ids
     for obj_id in inactive_ids:
-      self.pts.pop(obj_id, None)
+      self._drop_point(obj_id)
 
-    ret.points = list(self.pts.values())
+    set_points(ret, self.pts.values())
     return ret
@@ -39,20 +39,26 @@
 #define GET_BIT(msg, b) ((bool)!!(((msg)->data[((b) / 8U)] >> ((b) % 8U)) & 0x1U))
 #define GET_FLAG(value, mask) (((value) & (mask)) == (mask))
 
-#define BUILD_SAFETY_CFG(rx, tx) ((safety_config){(rx), (sizeof((rx)) / sizeof((rx)[0])), \
-                                                  (tx), (sizeof((tx)) / sizeof((tx)[0])), \
+// length of a config's rx_checks or tx_msgs, failing to compile if it can overflow the addr lookup tables
+#define SAFETY_CFG_LEN(arr, max_len) ((sizeof(char[((sizeof((arr)) / sizeof((arr)[0])) <= (size_t)(max_len)) ? 1 : -1]) * 0U) + \
+                                      (sizeof((arr)) / sizeof((arr)[0])))
+#define RX_CHECKS_LEN(rx) SAFETY_CFG_LEN((rx), ((unsigned int)MAX_RX_LOOKUP / MAX_ADDR_CHECK_MSGS))
+#define TX_MSGS_LEN(tx) SAFETY_CFG_LEN((tx), MAX_TX_LOOKUP)
+
+#define BUILD_SAFETY_CFG(rx, tx) ((safety_config){(rx), RX_CHECKS_LEN((rx)), \
+                                                  (tx), TX_MSGS_LEN((tx)), \
                                                   false})
 #define SET_RX_CHECKS(rx, config) \
   do { \
     (config).rx_checks = (rx); \
-    (config).rx_checks_len = sizeof((rx)) / sizeof((rx)[0]); \
+    (config).rx_checks_len = RX_CHECKS_LEN((rx)); \
     (config).disable_forwarding = false; \
   } while (0);
 
 #define SET_TX_MSGS(tx, config) \
   do { \
     (config).tx_msgs = (tx); \
-    (config).tx_msgs_len = sizeof((tx)) / sizeof((tx)[0]); \
+    (config).tx_msgs_len = TX_MSGS_LEN((tx)); \
     (config).disable_forwarding = false; \
   } while (0);
 
@@ -209,6 +215,17 @@ typedef struct {
   bool disable_forwarding;
 } safety_config;
 
+// sorted (bus, addr) lookup tables for the current safety config, built by set_safety_hooks
+// so the per-message rx/tx/fwd checks don't scan the whole rx_checks and tx_msgs lists
+#define MAX_RX_LOOKUP 64
+#define MAX_TX_LOOKUP 64
+
+typedef struct {
+  uint32_t key;   // (addr << 3) | bus
+  int index;      // index into rx_checks or tx_msgs
+  int msg_index;  // rx checks only, index into RxCheck.msg
+} AddrLookupEntry;
+
 typedef uint32_t (*get_checksum_t)(const CANPacket_t *msg);
 typedef uint32_t (*compute_checksum_t)(const CANPacket_t *msg);
 typedef uint8_t (*get_counter_t)(const CANPacket_t *msg);
@@ -101,6 +101,66 @@ safety_config current_safety_config;
 static void generic_rx_checks(void);
 static void stock_ecu_check(bool stock_ecu_detected);
 
+static AddrLookupEntry rx_lookup[MAX_RX_LOOKUP];
+static int rx_lookup_len = 0;
+static AddrLookupEntry tx_lookup[MAX_TX_LOOKUP];
+static int tx_lookup_len = 0;
+
+static uint32_t addr_lookup_key(unsigned int bus, int addr) {
+  return ((uint32_t)addr << 3U) | (bus & 0x7U);
+}
+
+// returns the index of the first entry with a key >= key
+static int addr_lookup_find(const AddrLookupEntry table[], int len, uint32_t key) {
+  int lo = 0;
+  int hi = len;
+  while (lo < hi) {
+    int mid = lo + ((hi - lo) / 2);
+    if (table[mid].key < key) {
+      lo = mid + 1;
+    } else {
+      hi = mid;
+    }
+  }
+  return lo;
+}
+
+// insertion sort, entries with equal keys keep their insertion order. returns false if the table is full
+static bool addr_lookup_insert(AddrLookupEntry table[], int *len, int max_len, uint32_t key, int index, int msg_index) {
+  bool inserted = false;
+  if (*len < max_len) {
+    int i = *len;
+    while ((i > 0) && (table[i - 1].key > key)) {
+      table[i] = table[i - 1];
+      i--;
+    }
+    table[i] = (AddrLookupEntry){key, index, msg_index};
+    (*len)++;
+    inserted = true;
+  }
+  return inserted;
+}
+
+// returns false if the config doesn't fit in the lookup tables
+static bool build_addr_lookups(const safety_config *cfg) {
+  bool valid = true;
+
+  rx_lookup_len = 0;
+  for (int i = 0; i < cfg->rx_checks_len; i++) {
+    for (uint8_t j = 0U; (j < MAX_ADDR_CHECK_MSGS) && (cfg->rx_checks[i].msg[j].addr != 0); j++) {
+      const CanMsgCheck *m = &cfg->rx_checks[i].msg[j];
+      valid = addr_lookup_insert(rx_lookup, &rx_lookup_len, MAX_RX_LOOKUP, addr_lookup_key(m->bus, m->addr), i, j) && valid;
+    }
+  }
+
+  tx_lookup_len = 0;
+  for (int i = 0; i < cfg->tx_msgs_len; i++) {
+    const CanMsg *m = &cfg->tx_msgs[i];
+    valid = addr_lookup_insert(tx_lookup, &tx_lookup_len, MAX_TX_LOOKUP, addr_lookup_key(m->bus, m->addr), i, 0) && valid;
+  }
+  return valid;
+}
+
 static bool is_msg_valid(RxCheck addr_list[], int index) {
   bool valid = true;
   if (index != -1) {
@@ -112,29 +172,21 @@ static bool is_msg_valid(RxCheck addr_list[], int index) {
   return valid;
 }
 
-static int get_addr_check_index(const CANPacket_t *msg, RxCheck addr_list[], const int len) {
-  int addr = msg->addr;
+static int get_addr_check_index(const CANPacket_t *msg, RxCheck addr_list[]) {
   int length = GET_LEN(msg);
+  uint32_t key = addr_lookup_key(msg->bus, msg->addr);
 
   int index = -1;
-  for (int i = 0; i < len; i++) {
-    // if multiple msgs are allowed, determine which one is present on the bus
-    if (!addr_list[i].status.msg_seen) {
-      for (uint8_t j = 0U; (j < MAX_ADDR_CHECK_MSGS) && (addr_list[i].msg[j].addr != 0); j++) {
-        if ((addr == addr_list[i].msg[j].addr) && (msg->bus == addr_list[i].msg[j].bus) &&
-              (length == addr_list[i].msg[j].len)) {
-          addr_list[i].status.index = j;
-          addr_list[i].status.msg_seen = true;
-          break;
-        }
+  for (int i = addr_lookup_find(rx_lookup, rx_lookup_len, key); (i < rx_lookup_len) && (rx_lookup[i].key == key); i++) {
+    const AddrLookupEntry *e = &rx_lookup[i];
+    if (length == addr_list[e->index].msg[e->msg_index].len) {
+      // if multiple msgs are allowed, determine which one is present on the bus
+      if (!addr_list[e->index].status.msg_seen) {
+        addr_list[e->index].status.index = e->msg_index;
+        addr_list[e->index].status.msg_seen = true;
       }
-    }
-
-    if (addr_list[i].status.msg_seen) {
-      int idx = addr_list[i].status.index;
-      if ((addr == addr_list[i].msg[idx].addr) && (msg->bus == addr_list[i].msg[idx].bus) &&
-          (length == addr_list[i].msg[idx].len)) {
-        index = i;
+      if (addr_list[e->index].status.index == e->msg_index) {
+        index = e->index;
         break;
       }
     }
@@ -162,7 +214,7 @@ static bool rx_msg_safety_check(const CANPacket_t *msg,
                                 const safety_config *cfg,
                                 const safety_hooks *safety_hooks) {
 
-  int index = get_addr_check_index(msg, cfg->rx_checks, cfg->rx_checks_len);
+  int index = get_addr_check_index(msg, cfg->rx_checks);
   update_addr_timestamp(cfg->rx_checks, index);
 
   if (index != -1) {
@@ -197,7 +249,7 @@ bool safety_rx_hook(const CANPacket_t *msg) {
   bool controls_allowed_prev = controls_allowed;
 
   bool valid = rx_msg_safety_check(msg, &current_safety_config, current_hooks);
-  bool whitelisted = get_addr_check_index(msg, current_safety_config.rx_checks, current_safety_config.rx_checks_len) != -1;
+  bool whitelisted = get_addr_check_index(msg, current_safety_config.rx_checks) != -1;
   if (valid && whitelisted) {
     current_hooks->rx(msg);
   }
@@ -208,12 +260,9 @@ bool safety_rx_hook(const CANPacket_t *msg) {
   // the relay malfunction hook runs on all incoming rx messages.
   // check all applicable tx msgs for liveness on sending bus.
   // used to detect a relay malfunction or control messages from disabled ECUs like the radar
-  const int addr = msg->addr;
-  for (int i = 0; i < current_safety_config.tx_msgs_len; i++) {
-    const CanMsg *m = &current_safety_config.tx_msgs[i];
-    if (m->check_relay) {
-      stock_ecu_check((m->addr == addr) && (m->bus == msg->bus));
-    }
+  const uint32_t key = addr_lookup_key(msg->bus, msg->addr);
+  for (int i = addr_lookup_find(tx_lookup, tx_lookup_len, key); (i < tx_lookup_len) && (tx_lookup[i].key == key); i++) {
+    stock_ecu_check(current_safety_config.tx_msgs[tx_lookup[i].index].check_relay);
   }
 
   // reset mismatches on rising edge of controls_allowed to avoid rare race condition
@@ -224,13 +273,13 @@ bool safety_rx_hook(const CANPacket_t *msg) {
   return valid;
 }
 
-static bool tx_msg_safety_check(const CANPacket_t *msg, const CanMsg msg_list[], int len) {
-  int addr = msg->addr;
+static bool tx_msg_safety_check(const CANPacket_t *msg, const CanMsg msg_list[]) {
   int length = GET_LEN(msg);
+  uint32_t key = addr_lookup_key(msg->bus, msg->addr);
 
   bool whitelisted = false;
-  for (int i = 0; i < len; i++) {
-    if ((addr == msg_list[i].addr) && (msg->bus == msg_list[i].bus) && (length == msg_list[i].len)) {
+  for (int i = addr_lookup_find(tx_lookup, tx_lookup_len, key); (i < tx_lookup_len) && (tx_lookup[i].key == key); i++) {
+    if (length == msg_list[tx_lookup[i].index].len) {
       whitelisted = true;
       break;
     }
@@ -239,7 +288,7 @@ static bool tx_msg_safety_check(const CANPacket_t *msg, const CanMsg msg_list[],
 }
 
 bool safety_tx_hook(CANPacket_t *msg) {
-  bool whitelisted = tx_msg_safety_check(msg, current_safety_config.tx_msgs, current_safety_config.tx_msgs_len);
+  bool whitelisted = tx_msg_safety_check(msg, current_safety_config.tx_msgs);
   if ((current_safety_mode == SAFETY_ALLOUTPUT) || (current_safety_mode == SAFETY_ELM327)) {
     whitelisted = true;
   }
@@ -271,9 +320,11 @@ int safety_fwd_hook(int bus_num, int addr) {
   // in the case of selective AEB forwarding
   const int destination_bus = get_fwd_bus(bus_num);
   if (!blocked) {
-    for (int i = 0; i < current_safety_config.tx_msgs_len; i++) {
-      const CanMsg *m = &current_safety_config.tx_msgs[i];
-      if (m->check_relay && !m->disable_static_blocking && (m->addr == addr) && (m->bus == (unsigned int)destination_bus)) {
+    const uint32_t key = addr_lookup_key((unsigned int)destination_bus, addr);
+    for (int i = addr_lookup_find(tx_lookup, tx_lookup_len, key); (i < tx_lookup_len) && (tx_lookup[i].key == key); i++) {
+      const CanMsg *m = &current_safety_config.tx_msgs[tx_lookup[i].index];
+      // key only holds the low bits of the bus, so check it to not match on no destination bus (-1)
+      if (m->check_relay && !m->disable_static_blocking && (m->bus == (unsigned int)destination_bus)) {
         blocked = true;
         break;
       }
@@ -396,6 +447,27 @@ static void reset_sample(struct sample_t *sample) {
   update_sample(sample, 0);
 }
 
+// returns -1 and falls back to no output if cfg doesn't fit in the lookup tables,
+// since the dropped entries would skip their rx, tx and relay malfunction checks
+static int set_safety_config(safety_config cfg) {
+  int status = 0;
+  current_safety_config = cfg;
+  // reset all dynamic fields in addr struct
+  for (int j = 0; j < current_safety_config.rx_checks_len; j++) {
+    current_safety_config.rx_checks[j].status = (RxStatus){0};
+  }
+
+  if (!build_addr_lookups(&current_safety_config)) {
+    current_hooks = &nooutput_hooks;
+    current_safety_mode = SAFETY_NOOUTPUT;
+    current_safety_param = 0U;
+    current_safety_config = (safety_config){NULL, 0, NULL, 0, true};
+    (void)build_addr_lookups(&current_safety_config);
+    status = -1;
+  }
+  return status;
+}
+
 int set_safety_hooks(uint16_t mode, uint16_t param) {
   const safety_hook_config safety_hook_registry[] = {
     {SAFETY_SILENT, &nooutput_hooks},
@@ -471,12 +543,6 @@ int set_safety_hooks(uint16_t mode, uint16_t param) {
   relay_malfunction_reset();
   safety_rx_checks_invalid = false;
 
-  current_safety_config.rx_checks = NULL;
-  current_safety_config.rx_checks_len = 0;
-  current_safety_config.tx_msgs = NULL;
-  current_safety_config.tx_msgs_len = 0;
-  current_safety_config.disable_forwarding = false;
-
   int set_status = -1;  // not set
   int hook_config_count = sizeof(safety_hook_registry) / sizeof(safety_hook_config);
   for (int i = 0; i < hook_config_count; i++) {
@@ -487,19 +553,13 @@ int set_safety_hooks(uint16_t mode, uint16_t param) {
       set_status = 0;  // set
     }
   }
+
+  safety_config cfg = {NULL, 0, NULL, 0, false};
   if ((set_status == 0) && (current_hooks->init != NULL)) {
-    safety_config cfg = current_hooks->init(param);
-    current_safety_config.rx_checks = cfg.rx_checks;
-    current_safety_config.rx_checks_len = cfg.rx_checks_len;
-    current_safety_config.tx_msgs = cfg.tx_msgs;
-    current_safety_config.tx_msgs_len = cfg.tx_msgs_len;
-    current_safety_config.disable_forwarding = cfg.disable_forwarding;
-    // reset all dynamic fields in addr struct
-    for (int j = 0; j < current_safety_config.rx_checks_len; j++) {
-      current_safety_config.rx_checks[j].status = (RxStatus){0};
-    }
+    cfg = current_hooks->init(param);
   }
-  return set_status;
+  int config_status = set_safety_config(cfg);
+  return (config_status != 0) ? config_status : set_status;
 }
 
 // convert a trimmed integer to signed 32 bit int
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import time
+
+from opendbc.car.structs import CarParams
+from opendbc.car.ford.values import FordSafetyFlags
+from opendbc.car.hyundai.values import HyundaiSafetyFlags
+from opendbc.safety.tests.libsafety import libsafety_py
+from opendbc.safety.tests.test_ford import TestFordCANFDLongitudinalSafety
+from opendbc.safety.tests.test_hyundai_canfd import TestHyundaiCanfdLKASteeringLongEV
+from opendbc.safety.tests.test_toyota import TestToyotaSafetyTorque
+
+MODES = [
+  ("toyota", CarParams.SafetyModel.toyota, 73, TestToyotaSafetyTorque.TX_MSGS),
+  ("ford canfd", CarParams.SafetyModel.ford, FordSafetyFlags.LONG_CONTROL | FordSafetyFlags.CANFD, TestFordCANFDLongitudinalSafety.TX_MSGS),
+  ("hyundai canfd", CarParams.SafetyModel.hyundaiCanfd, HyundaiSafetyFlags.CANFD_LKA_STEER_MSG | HyundaiSafetyFlags.LONG | HyundaiSafetyFlags.EV_GAS,
+   TestHyundaiCanfdLKASteeringLongEV.TX_MSGS),
+]
+
+
+def _benchmark(safety, name, mode, param, tx_msgs, n=20000):
+  # per-frame cost for the first and last tx msgs in the allow-list and for an unknown address,
+  # a linear scan gets slower further down the list while the lookup shouldn't
+  results = []
+  for label, (addr, bus) in (("first", tx_msgs[0]), ("last", tx_msgs[-1]), ("unknown", (0x7FF, 1))):
+    for tx in (True, False):
+      buf = bytearray()
+      for i in range(n):
+        libsafety_py.pack_replay_frame(buf, i * 1000, addr, bus, b'\x00' * 8, libsafety_py.REPLAY_FRAME_TX if tx else 0)
+
+      safety.set_safety_hooks(mode, param)
+      safety.init_tests()
+      t1 = time.process_time_ns()
+      libsafety_py.replay_frames(safety, buf)
+      t2 = time.process_time_ns()
+      results.append(f"{label} {'tx' if tx else 'rx+fwd'}: {(t2 - t1) / n:.0f}ns")
+  print(f"[{name}, {len(tx_msgs)} tx msgs] " + ", ".join(results))
+
+
+if __name__ == "__main__":
+  libsafety_py.load(libsafety_py._build_libsafety(profile="perf"))
+  safety = libsafety_py.libsafety
+  for args in MODES:
+    _benchmark(safety, *args)
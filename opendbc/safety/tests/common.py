@@ -956,6 +956,10 @@ class SafetyTest(SafetyTestBase):
     for msg in self.TX_MSGS:
       self.assertTrue(msg[0] in self.SCANNED_ADDRS, f"{msg[0]=:#x}")
 
+  def test_addr_lookups_valid(self):
+    # the safety config must fit in the rx check and tx msg lookup tables
+    self.assertTrue(self.safety.safety_addr_lookups_valid())
+
   def test_fwd_hook(self):
     # some safety modes don't forward anything, while others blacklist msgs
     for bus in range(3):
@@ -1,7 +1,12 @@
 import os
+import re
+import fcntl
+import hashlib
+import struct
 import subprocess
 import tempfile
 from pathlib import Path
+from typing import TextIO
 
 from cffi import FFI
 
@@ -9,31 +14,119 @@ from opendbc.safety import LEN_TO_DLC
 
 libsafety_dir = os.path.dirname(os.path.abspath(__file__))
 
+# builds are cached by a hash of the sources and flags, and shared by all processes.
+# coverage builds must stay under opendbc/safety/ so gcovr finds their .gcda files
+BUILD_DIR = os.environ.get("LIBSAFETY_BUILD_DIR", os.path.join(libsafety_dir, "build"))
 
-def _build_libsafety(release: bool = False) -> str:
-  """Compile libsafety.so to a temp file and return its path."""
+# profile -> (cflags, ldflags)
+BUILD_PROFILES = {
+  # UBSan + gcov, used by the safety tests for the coverage gate
+  "coverage": (['-O0', '-fprofile-arcs', '-ftest-coverage'], ['-fsanitize=undefined', '-fno-sanitize-recover=undefined', '-fprofile-arcs', '-ftest-coverage']),
+  # UBSan without coverage instrumentation
+  "debug": (['-O0'], ['-fsanitize=undefined', '-fno-sanitize-recover=undefined']),
+  # optimized, for safety replays and long fuzzing runs
+  "perf": (['-O2'], []),
+}
+DEFAULT_PROFILE = os.environ.get("LIBSAFETY_PROFILE", "coverage")
+
+
+def _source_hash(cflags: list[str], ldflags: list[str]) -> str:
+  root = Path(libsafety_dir).parents[3]
+  sources = sorted((root / "opendbc" / "safety").rglob("*.h")) + [Path(libsafety_dir) / "safety.c"]
+
+  h = hashlib.sha256()
+  for fn in sources:
+    h.update(str(fn.relative_to(root)).encode())
+    h.update(fn.read_bytes())
+  h.update(" ".join(cflags + ["--"] + ldflags).encode())
+  h.update(subprocess.check_output(['cc', '--version']))
+  return h.hexdigest()[:16]
+
+
+def _lock_file(path: str, operation: int) -> TextIO | None:
+  """Opens and flocks a build's lock file, or returns None if LOCK_NB is set and another process holds it"""
+  while True:
+    lock = open(path, "a")
+    try:
+      fcntl.flock(lock, operation)
+    except BlockingIOError:
+      lock.close()
+      return None
+    # a pruner may have removed the file while we waited for it, lock the new one instead
+    try:
+      if os.fstat(lock.fileno()).st_ino == os.stat(path).st_ino:
+        return lock
+    except FileNotFoundError:
+      pass
+    lock.close()
+
+
+def _prune_stale_builds(name: str) -> None:
+  # gcovr fails when .gcno/.gcda files from older builds of the same sources are lying around,
+  # so remove older builds of this profile along with their lock files. builds another process
+  # holds the lock for are left for a later run
+  prefix, _ = name.rsplit('-', 1)
+  stale = re.compile(re.escape(prefix) + r'-[0-9a-f]{16}')
+  builds: dict[str, list[str]] = {}
+  for fn in os.listdir(BUILD_DIR):
+    stem, ext = os.path.splitext(fn)
+    if stem != name and stale.fullmatch(stem):
+      builds.setdefault(stem, []).append(fn)
+
+  for stem, fns in builds.items():
+    lock_path = os.path.join(BUILD_DIR, f"{stem}.lock")
+    lock = _lock_file(lock_path, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    if lock is None:
+      continue
+    with lock:
+      for fn in fns:
+        if not fn.endswith('.lock') and os.path.exists(os.path.join(BUILD_DIR, fn)):
+          os.unlink(os.path.join(BUILD_DIR, fn))
+      os.unlink(lock_path)
+
+
+def _build_libsafety(release: bool = False, profile: str = DEFAULT_PROFILE) -> str:
+  """Compile libsafety.so into the build cache, if not already there, and return its path."""
   root = str(Path(libsafety_dir).parents[3])
   safety_c = os.path.join(libsafety_dir, "safety.c")
 
+  profile_cflags, profile_ldflags = BUILD_PROFILES[profile]
   cflags = [
     '-Wall', '-Wextra', '-Werror', '-nostdlib', '-fno-builtin',
     '-std=gnu11', '-Wfatal-errors', '-Wno-pointer-to-int-cast',
-    '-g', '-O0', '-fno-omit-frame-pointer',
-  ]
-  ldflags = [
-    '-fsanitize=undefined', '-fno-sanitize-recover=undefined',
+    '-g', '-fno-omit-frame-pointer',
   ]
-  if not release:
-    cflags += ['-DALLOW_DEBUG', '-fprofile-arcs', '-ftest-coverage']
-    ldflags += ['-fprofile-arcs', '-ftest-coverage']
+  ldflags = []
+  if release:
+    # release builds never have debug safety modes or coverage
+    profile_cflags = [f for f in profile_cflags if 'profile-arcs' not in f and 'test-coverage' not in f]
+    profile_ldflags = [f for f in profile_ldflags if 'profile-arcs' not in f and 'test-coverage' not in f]
+  else:
+    cflags.append('-DALLOW_DEBUG')
+  cflags += profile_cflags
+  ldflags += profile_ldflags
 
-  fd, safety_os = tempfile.mkstemp(suffix='.os', dir=libsafety_dir)
-  os.close(fd)
-  fd, libsafety_so = tempfile.mkstemp(suffix='.so')
-  os.close(fd)
+  os.makedirs(BUILD_DIR, exist_ok=True)
+  name = f"libsafety-{profile}{'-release' if release else ''}-{_source_hash(cflags, ldflags)}"
+  libsafety_so = os.path.join(BUILD_DIR, f"{name}.so")
 
-  subprocess.check_call(['cc', '-fPIC', *cflags, '-I', root, '-c', safety_c, '-o', safety_os])
-  subprocess.check_call(['cc', '-shared', safety_os, '-o', libsafety_so, *ldflags])
+  # the lock makes concurrent test workers wait for one build instead of each compiling
+  lock = _lock_file(os.path.join(BUILD_DIR, f"{name}.lock"), fcntl.LOCK_EX)
+  assert lock is not None
+  with lock:
+    if not os.path.exists(libsafety_so):
+      # the object path is stable since gcov places the .gcda next to it
+      safety_os = os.path.join(BUILD_DIR, f"{name}.os")
+      fd, tmp_so = tempfile.mkstemp(suffix='.so', dir=BUILD_DIR)
+      os.close(fd)
+      try:
+        subprocess.check_call(['cc', '-fPIC', *cflags, '-I', root, '-c', safety_c, '-o', safety_os])
+        subprocess.check_call(['cc', '-shared', safety_os, '-o', tmp_so, *ldflags])
+        os.replace(tmp_so, libsafety_so)
+      finally:
+        if os.path.exists(tmp_so):
+          os.unlink(tmp_so)
+    _prune_stale_builds(name)
   return libsafety_so
 
 
@@ -105,6 +198,8 @@ void set_timer(uint32_t t);
 
 void safety_tick_current_safety_config();
 bool safety_config_valid();
+bool safety_addr_lookups_valid(void);
+int set_oversized_safety_config(bool rx);
 
 void init_tests(void);
 
@@ -116,12 +211,45 @@ int get_honda_hw(void);
 
 void mutation_set_active_mutant(int id);
 int mutation_get_active_mutant(void);
+uint8_t *mutation_get_hits(void);
+int mutation_get_hits_len(void);
 
 void ignition_can_hook(const CANPacket_t *msg);
 bool get_ignition_can(void);
 void set_ignition_can(bool c);
 """)
 
+ffi.cdef("""
+typedef struct {
+  uint32_t timestamp;
+  uint32_t addr;
+  uint8_t bus;
+  uint8_t flags;
+  uint8_t data_len_code;
+  uint8_t reserved;
+  uint8_t data[64];
+} ReplayFrame;
+
+typedef struct {
+  uint32_t rx_total;
+  uint32_t rx_invalid;
+  uint32_t tx_total;
+  uint32_t tx_blocked;
+  uint32_t tx_controls;
+  uint32_t tx_controls_blocked;
+  bool safety_tick_rx_invalid;
+} ReplayStats;
+
+void safety_replay_frames(const ReplayFrame *frames, int len, uint8_t *verdicts, ReplayStats *stats);
+""")
+
+# flags for ReplayFrame, see safety.c
+REPLAY_FRAME_TX = 1
+REPLAY_FRAME_TICK = 2
+REPLAY_FRAME_NO_MSG = 4
+REPLAY_FRAME = struct.Struct('<IIBBBx64s')
+assert REPLAY_FRAME.size == ffi.sizeof('ReplayFrame')
+
 class LibSafety:
   pass
 libsafety: LibSafety
@@ -144,3 +272,18 @@ def make_CANPacket(addr: int, bus: int, dat):
   ret[0].bus = bus
   ret[0].data = bytes(dat)
   return ret
+
+
+def pack_replay_frame(buf: bytearray, timestamp: int, addr: int, bus: int, dat, flags: int = 0) -> None:
+  buf += REPLAY_FRAME.pack(timestamp, addr, bus, flags, LEN_TO_DLC[len(dat)], bytes(dat))
+
+def replay_frames(safety: LibSafety, buf, stats=None):
+  """Run a buffer of packed ReplayFrames through the safety hooks in a single call.
+  Returns the per-frame hook verdicts and the aggregate ReplayStats, which accumulate if passed back in."""
+  n = len(buf) // REPLAY_FRAME.size
+  if stats is None:
+    stats = ffi.new('ReplayStats *')
+  verdicts = ffi.new('uint8_t[]', n)
+  frames = ffi.cast('const ReplayFrame *', ffi.from_buffer(buf))
+  safety.safety_replay_frames(frames, n, verdicts, stats)
+  return ffi.buffer(verdicts)[:], stats
@@ -34,6 +34,36 @@ bool safety_config_valid() {
   return true;
 }
 
+bool safety_addr_lookups_valid(void) {
+  // every rx check alternative and tx msg must fit in the lookup tables
+  int rx_len = 0;
+  for (int i = 0; i < current_safety_config.rx_checks_len; i++) {
+    for (uint8_t j = 0U; (j < MAX_ADDR_CHECK_MSGS) && (current_safety_config.rx_checks[i].msg[j].addr != 0); j++) {
+      rx_len++;
+    }
+  }
+  if ((rx_lookup_len != rx_len) || (tx_lookup_len != current_safety_config.tx_msgs_len)) {
+    printf("lookup tables too small: rx %d/%d tx %d/%d\n", rx_lookup_len, rx_len, tx_lookup_len, current_safety_config.tx_msgs_len);
+    return false;
+  }
+  return true;
+}
+
+int set_oversized_safety_config(bool rx) {
+  // one entry more than the lookup tables hold, which set_safety_config must refuse
+  static RxCheck rx_checks[MAX_RX_LOOKUP + 1] = {
+    [0 ... MAX_RX_LOOKUP] = {.msg = {{0x100, 0, 8, 100U, .ignore_checksum = true, .ignore_counter = true}, { 0 }, { 0 }}},
+  };
+  static const CanMsg tx_msgs[MAX_TX_LOOKUP + 1] = {
+    [0 ... MAX_TX_LOOKUP] = {0x100, 0, 8, .check_relay = true},
+  };
+  safety_config cfg = {NULL, 0, tx_msgs, MAX_TX_LOOKUP + 1, false};
+  if (rx) {
+    cfg = (safety_config){rx_checks, MAX_RX_LOOKUP + 1, NULL, 0, false};
+  }
+  return set_safety_config(cfg);
+}
+
 void set_controls_allowed(bool c){
   controls_allowed = c;
 }
@@ -235,3 +265,76 @@ void init_tests(void){
   ignition_can = false;
   ignition_can_cnt = 0U;
 }
+
+
+// ***** batched replay *****
+
+#define REPLAY_FRAME_TX 1U      // frame was sent by openpilot (sendcan), run the tx hook
+#define REPLAY_FRAME_TICK 2U    // run safety_tick before this frame
+#define REPLAY_FRAME_NO_MSG 4U  // frame carries no message, only its timestamp and tick
+
+// flat, bitfield-free frame layout so callers can pack frames without going through cffi per frame
+typedef struct {
+  uint32_t timestamp;  // microseconds
+  uint32_t addr;
+  uint8_t bus;
+  uint8_t flags;
+  uint8_t data_len_code;
+  uint8_t reserved;
+  uint8_t data[CANPACKET_DATA_SIZE_MAX];
+} ReplayFrame;
+
+typedef struct {
+  uint32_t rx_total;
+  uint32_t rx_invalid;
+  uint32_t tx_total;
+  uint32_t tx_blocked;
+  uint32_t tx_controls;
+  uint32_t tx_controls_blocked;
+  bool safety_tick_rx_invalid;
+} ReplayStats;
+
+// Runs frames through the safety hooks in order. verdicts[i] is the tx or rx hook result
+// for frames[i] (1 for REPLAY_FRAME_NO_MSG), and stats accumulates across calls so a route
+// can be replayed in chunks.
+void safety_replay_frames(const ReplayFrame *frames, int len, uint8_t *verdicts, ReplayStats *stats) {
+  CANPacket_t msg = {0};
+  for (int i = 0; i < len; i++) {
+    const ReplayFrame *f = &frames[i];
+    set_timer(f->timestamp);
+
+    if ((f->flags & REPLAY_FRAME_TICK) != 0U) {
+      safety_tick_current_safety_config();
+      stats->safety_tick_rx_invalid |= !safety_config_valid();
+    }
+
+    bool ok = true;
+    if ((f->flags & REPLAY_FRAME_NO_MSG) == 0U) {
+      msg.extended = (f->addr >= 0x800U) ? 1U : 0U;
+      msg.addr = f->addr;
+      msg.bus = f->bus;
+      msg.data_len_code = f->data_len_code;
+      for (int j = 0; j < GET_LEN(&msg); j++) {
+        msg.data[j] = f->data[j];
+      }
+
+      if ((f->flags & REPLAY_FRAME_TX) != 0U) {
+        ok = safety_tx_hook(&msg);
+        if (!ok) {
+          stats->tx_blocked++;
+          stats->tx_controls_blocked += controls_allowed;
+        }
+        stats->tx_controls += controls_allowed;
+        stats->tx_total++;
+      } else {
+        (void)safety_fwd_hook(f->bus, f->addr);
+        ok = safety_rx_hook(&msg);
+        if (!ok) {
+          stats->rx_invalid++;
+        }
+        stats->rx_total++;
+      }
+    }
+    verdicts[i] = ok;
+  }
+}
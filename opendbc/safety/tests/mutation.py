@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
 import io
+import json
 import os
 import re
 import subprocess
@@ -13,6 +15,7 @@ from collections import Counter, namedtuple
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 import tree_sitter_c as ts_c
 import tree_sitter as ts
 
@@ -21,6 +24,20 @@ ROOT = Path(__file__).resolve().parents[3]
 SAFETY_DIR = ROOT / "opendbc" / "safety"
 SAFETY_TESTS_DIR = ROOT / "opendbc" / "safety" / "tests"
 SAFETY_C_REL = Path("opendbc/safety/tests/libsafety/safety.c")
+CACHE_DIR = SAFETY_TESTS_DIR / ".mutation_cache"
+
+# files besides the test modules themselves that can change a test's outcome
+TEST_ENV_GLOBS = [
+  "opendbc/safety/tests/*.py",
+  "opendbc/safety/tests/libsafety/*.py",
+  "opendbc/can/*.py",
+  "opendbc/dbc/**/*",
+  "opendbc/car/structs.py",
+  "opendbc/car/*.capnp",
+  "opendbc/car/*/values.py",
+]
+
+MUTATION_CFLAGS = ["-shared", "-fPIC", "-w", "-fno-builtin", "-std=gnu11", "-g0", "-O0", "-DALLOW_DEBUG"]
 
 ANSI_RESET = "\033[0m"
 ANSI_BOLD = "\033[1m"
@@ -74,6 +91,7 @@ class MutantResult:
   outcome: str  # killed | survived | infra_error
   test_sec: float
   details: str
+  cached: bool = False
 
 
 def colorize(text, color):
@@ -388,6 +406,81 @@ def run_unittest(targets, lib_path, mutant_id, verbose):
   return None
 
 
+def _hash_files(paths):
+  h = hashlib.sha256()
+  for fn in sorted(paths):
+    h.update(str(fn.relative_to(ROOT)).encode())
+    h.update(fn.read_bytes())
+  return h.hexdigest()
+
+
+def _hash_strings(*parts):
+  return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def _test_env_hash():
+  paths = {p for g in TEST_ENV_GLOBS for p in ROOT.glob(g) if p.is_file() and "__pycache__" not in p.parts}
+  return _hash_files(p for p in paths if not p.name.startswith("test_"))
+
+
+def _test_module_file(test_id):
+  module = test_id.rsplit(".", 2)[0]
+  return ROOT / Path(*module.split(".")).with_suffix(".py")
+
+
+def collect_coverage(modules, lib_path):
+  """Run whole test modules against the unmutated library, recording which sites each test reaches."""
+  from opendbc.safety.tests.libsafety import libsafety_py
+  libsafety_py.load(lib_path)
+  safety = libsafety_py.libsafety
+  safety.mutation_set_active_mutant(-1)
+  n = safety.mutation_get_hits_len()
+  hits = libsafety_py.ffi.buffer(safety.mutation_get_hits(), n)
+  empty = bytes(n)
+
+  covered = {}
+
+  class CoverageResult(unittest.TestResult):
+    def startTest(self, test):
+      hits[:] = empty
+      super().startTest(test)
+
+    def stopTest(self, test):
+      super().stopTest(test)
+      site_ids = np.flatnonzero(np.frombuffer(hits[:], dtype=np.uint8)).tolist()
+      covered.setdefault(test.id(), set()).update(site_ids)
+
+  loader = unittest.TestLoader()
+  suite = unittest.TestSuite(loader.loadTestsFromName(m) for m in modules)
+  suite.run(CoverageResult())
+  return covered
+
+
+def build_coverage_map(catalog, lib_path, jobs):
+  """Returns {site_id: set of test ids that reach the site}."""
+  modules = [".".join((SAFETY_TESTS_DIR / name).relative_to(ROOT).with_suffix("").parts) for name in catalog]
+  site_tests = {}
+  with ProcessPoolExecutor(max_workers=jobs) as pool:
+    for covered in pool.map(collect_coverage, [[m] for m in modules], [lib_path] * len(modules)):
+      for test_id, site_ids in covered.items():
+        for site_id in site_ids:
+          site_tests.setdefault(site_id, set()).add(test_id)
+  return site_tests
+
+
+def mutant_cache_key(source_hash, site, targets, test_env_hash):
+  """A mutant's result only depends on the mutated program and the tests run against it."""
+  test_hashes = [_hash_files([f]) for f in sorted({_test_module_file(t) for t in targets})]
+  return _hash_strings(source_hash, str(_site_key(site)), site.mutated_op, test_env_hash, *test_hashes, *targets)
+
+
+def _load_json(path):
+  try:
+    return json.loads(path.read_text())
+  except (FileNotFoundError, json.JSONDecodeError):
+    return {}
+
+
 def _instrument_source(source, sites):
   # Sort by start ascending, end descending (outermost first when same start)
   sorted_sites = sorted(sites, key=lambda s: (s.expr_start, -s.expr_end))
@@ -434,7 +527,8 @@ def _instrument_source(source, sites):
       f"Operator mismatch (site_id={site.site_id}): expected {site.original_op!r} at offset {op_rel}"
     )
     mutated_expr = f"{expr_text[:op_rel]}{site.mutated_op}{expr_text[op_rel + op_len :]}"
-    return f"((__mutation_active_id == {site.site_id}) ? ({mutated_expr}) : ({expr_text}))"
+    # mark the site as reached, used to select the tests that can kill each mutant
+    return f"(__mutation_hits[{site.site_id}] = 1U, ((__mutation_active_id == {site.site_id}) ? ({mutated_expr}) : ({expr_text})))"
 
   result_parts = []
   pos = 0
@@ -449,10 +543,14 @@ def _instrument_source(source, sites):
 def compile_mutated_library(preprocessed_source, sites, output_so):
   instrumented = _instrument_source(preprocessed_source, sites)
 
-  prelude = """
+  n_hits = max(s.site_id for s in sites) + 1
+  prelude = f"""
     static int __mutation_active_id = -1;
-    void mutation_set_active_mutant(int id) { __mutation_active_id = id; }
-    int mutation_get_active_mutant(void) { return __mutation_active_id; }
+    static unsigned char __mutation_hits[{n_hits}];
+    void mutation_set_active_mutant(int id) {{ __mutation_active_id = id; }}
+    int mutation_get_active_mutant(void) {{ return __mutation_active_id; }}
+    unsigned char *mutation_get_hits(void) {{ return __mutation_hits; }}
+    int mutation_get_hits_len(void) {{ return {n_hits}; }}
   """
   marker_re = re.compile(r'^\s*#\s+\d+\s+"[^\n]*\n?', re.MULTILINE)
   instrumented = prelude + marker_re.sub("", instrumented)
@@ -460,11 +558,7 @@ def compile_mutated_library(preprocessed_source, sites, output_so):
   mutation_source = output_so.with_suffix(".c")
   mutation_source.write_text(instrumented)
 
-  subprocess.run([
-    "cc", "-shared", "-fPIC", "-w", "-fno-builtin", "-std=gnu11",
-    "-g0", "-O0", "-DALLOW_DEBUG",
-    str(mutation_source), "-o", str(output_so),
-  ], cwd=ROOT, check=True)
+  subprocess.run(["cc", *MUTATION_CFLAGS, str(mutation_source), "-o", str(output_so)], cwd=ROOT, check=True)
 
 
 def eval_mutant(site, targets, lib_path, verbose):
@@ -485,6 +579,8 @@ def main():
   parser.add_argument("--max-mutants", type=int, default=0, help="optional limit for debugging (0 means all)")
   parser.add_argument("--list-only", action="store_true", help="list discovered candidates and exit")
   parser.add_argument("--verbose", action="store_true", help="print extra debug output")
+  parser.add_argument("--no-cache", action="store_true", help="ignore and don't update the mutant result cache")
+  parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR, help="where compiled mutants, coverage and results are cached")
   args = parser.parse_args()
 
   start = time.perf_counter()
@@ -518,8 +614,18 @@ def main():
       print("Failed to build mutation library: all sites were pruned as build-incompatible", flush=True)
       return 2
 
-    mutation_lib = Path(run_tmp_dir) / "libsafety_mutation.so"
-    compile_mutated_library(preprocessed_source, sites, mutation_lib)
+    # the mutants' behavior is fully determined by the preprocessed source and how it's compiled
+    marker_re = re.compile(r'^\s*#\s+\d+\s+"[^\n]*\n?', re.MULTILINE)
+    source_hash = _hash_strings(marker_re.sub("", preprocessed_source), *MUTATION_CFLAGS)
+    lib_hash = _hash_strings(source_hash, *(str(s.site_id) for s in sites))[:16]
+
+    cache_dir = Path(run_tmp_dir) if args.no_cache else args.cache_dir
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    mutation_lib = cache_dir / f"libsafety_mutation-{lib_hash}.so"
+    if not mutation_lib.exists():
+      tmp_lib = Path(run_tmp_dir) / "libsafety_mutation.so"
+      compile_mutated_library(preprocessed_source, sites, tmp_lib)
+      os.replace(tmp_lib, mutation_lib)
 
     # Discover all tests by importing modules in the main process.
     # Forked workers inherit these imports, eliminating per-worker import cost.
@@ -533,18 +639,52 @@ def main():
       print(f"  failed_test: {baseline_failed}", flush=True)
       return 2
 
+    # Map each site to the tests that reach it, only those can kill its mutant
+    test_env_hash = _test_env_hash()
+    catalog_hash = _hash_files(SAFETY_TESTS_DIR / name for name in catalog)
+    coverage_path = cache_dir / f"coverage-{_hash_strings(lib_hash, test_env_hash, catalog_hash)[:16]}.json"
+    site_tests = {int(k): set(v) for k, v in _load_json(coverage_path).items()}
+    if not site_tests:
+      t0 = time.perf_counter()
+      site_tests = build_coverage_map(catalog, mutation_lib, args.j)
+      coverage_path.write_text(json.dumps({k: sorted(v) for k, v in site_tests.items()}))
+      print(f"Built test coverage map in {time.perf_counter() - t0:.1f}s", flush=True)
+
     # Pre-compute test targets per mutation site
     core_tests = _build_core_tests(catalog)
-    site_targets = {site.site_id: build_priority_tests(site, catalog, core_tests) for site in sites}
+    site_targets = {}
+    for site in sites:
+      # prioritized tests first, then any other test that reaches the site
+      reaching = site_tests.get(site.site_id, set())
+      priority = [t for t in build_priority_tests(site, catalog, core_tests) if t in reaching]
+      site_targets[site.site_id] = priority + sorted(reaching - set(priority))
+
+    results_path = cache_dir / "results.json"
+    cached_results = {} if args.no_cache else _load_json(results_path)
+    cache_keys = {site.site_id: mutant_cache_key(source_hash, site, site_targets[site.site_id], test_env_hash) for site in sites}
 
     results = []
     counts = Counter()
+    pending = []
+    for site in sites:
+      cached = cached_results.get(cache_keys[site.site_id])
+      if cached is not None:
+        results.append(MutantResult(site, cached["outcome"], 0.0, cached["details"], cached=True))
+      elif not site_targets[site.site_id]:
+        # no test executes this code, so nothing can tell the mutant apart
+        results.append(MutantResult(site, "survived", 0.0, "not reached by any test"))
+      else:
+        pending.append(site)
+        continue
+      counts[results[-1].outcome] += 1
+    print(f"{len(sites) - len(pending)} mutants resolved from cache or coverage, running {len(pending)}", flush=True)
 
     with ProcessPoolExecutor(max_workers=args.j) as pool:
       future_map = {
-        pool.submit(eval_mutant, site, site_targets[site.site_id], mutation_lib, args.verbose): site for site in sites
+        pool.submit(eval_mutant, site, site_targets[site.site_id], mutation_lib, args.verbose): site for site in pending
       }
-      print_live_status(render_progress(0, len(sites), 0, 0, 0, 0.0))
+      print_live_status(render_progress(len(results), len(sites), counts["killed"], counts["survived"], counts["infra_error"], 0.0),
+                        final=not pending)
       try:
         for fut in as_completed(future_map):
           try:
@@ -561,13 +701,22 @@ def main():
       except Exception:
         # Pool broken — mark all unfinished mutants as killed (crash = behavioral change detected)
         completed_ids = {r.site.site_id for r in results}
-        for site in sites:
+        for site in pending:
           if site.site_id not in completed_ids:
             results.append(MutantResult(site, "killed", 0.0, "pool broken"))
             counts["killed"] += 1
         elapsed_now = time.perf_counter() - start
         print_live_status(render_progress(len(results), len(sites), counts["killed"], counts["survived"], counts["infra_error"], elapsed_now), final=True)
 
+    if not args.no_cache:
+      for r in results:
+        # a crash takes down the whole pool, so those results can't be attributed to a single mutant
+        if r.outcome != "infra_error" and r.details not in ("worker process crashed", "pool broken"):
+          cached_results[cache_keys[r.site.site_id]] = {"outcome": r.outcome, "details": r.details}
+      tmp_results = results_path.with_suffix(".tmp")
+      tmp_results.write_text(json.dumps(cached_results))
+      os.replace(tmp_results, results_path)
+
     survivors = sorted((r for r in results if r.outcome == "survived"), key=lambda r: r.site.site_id)
     if survivors:
       print("", flush=True)
@@ -597,8 +746,9 @@ def main():
     print(f"  killed: {colorize(str(counts['killed']), ANSI_GREEN)}", flush=True)
     print(f"  survived: {colorize(str(counts['survived']), ANSI_RED)}", flush=True)
     print(f"  infra_error: {colorize(str(counts['infra_error']), ANSI_YELLOW)}", flush=True)
+    print(f"  cached: {sum(r.cached for r in results)}", flush=True)
     print(f"  test_time_sum: {total_test_sec:.2f}s", flush=True)
-    print(f"  avg_test_per_mutant: {total_test_sec / len(results):.3f}s", flush=True)
+    print(f"  avg_test_per_mutant: {total_test_sec / max(len(pending), 1):.3f}s", flush=True)
     print(f"  mutants_per_second: {len(sites) / elapsed:.2f}", flush=True)
     print(f"  elapsed: {elapsed:.2f}s", flush=True)
 
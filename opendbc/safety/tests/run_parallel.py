@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from opendbc.safety.tests.libsafety import libsafety_py
+
+ROOT = Path(__file__).resolve().parents[3]
+SAFETY_TESTS_DIR = ROOT / "opendbc" / "safety" / "tests"
+
+
+def _iter_tests(suite):
+  for t in suite:
+    if isinstance(t, unittest.TestSuite):
+      yield from _iter_tests(t)
+    else:
+      yield t
+
+
+def _class_skipped(cls) -> bool:
+  """The abstract base test classes skip themselves in setUpClass"""
+  if getattr(cls, "__unittest_skip__", False):
+    return True
+  try:
+    cls.setUpClass()
+  except unittest.SkipTest:
+    return True
+  except Exception:
+    # let the worker report it
+    return False
+  cls.tearDownClass()
+  return False
+
+
+def discover_classes(pattern):
+  """Returns {test class id: number of tests}, leaving out skipped classes and tests"""
+  loader = unittest.TestLoader()
+  suite = loader.discover(str(SAFETY_TESTS_DIR), pattern=pattern, top_level_dir=str(ROOT))
+  if loader.errors:
+    raise ImportError("\n".join(map(str, loader.errors)))
+
+  # classes imported into several test modules are discovered more than once, only run them once
+  classes = {}
+  skipped = {}
+  for test in {t.id(): t for t in _iter_tests(suite)}.values():
+    cls_id = test.id().rsplit(".", 1)[0]
+    if cls_id not in skipped:
+      skipped[cls_id] = _class_skipped(type(test))
+    if skipped[cls_id]:
+      continue
+    if not getattr(getattr(test, test._testMethodName), "__unittest_skip__", False):
+      classes[cls_id] = classes.get(cls_id, 0) + 1
+  return classes
+
+
+def shard_classes(classes, n):
+  """Greedily assign the largest classes first to the least loaded shard"""
+  shards = [[] for _ in range(n)]
+  loads = [0] * n
+  for cls_id, count in sorted(classes.items(), key=lambda kv: (-kv[1], kv[0])):
+    i = loads.index(min(loads))
+    shards[i].append(cls_id)
+    loads[i] += count
+  return [s for s in shards if s]
+
+
+def main():
+  parser = argparse.ArgumentParser(description="Run the safety tests sharded by test class across processes")
+  parser.add_argument("-j", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+  parser.add_argument("-p", "--pattern", default="test*.py", help="test module pattern")
+  parser.add_argument("--verbose", action="store_true", help="print each worker's output")
+  args = parser.parse_args()
+
+  start = time.perf_counter()
+
+  # build once up front, the workers then all load the cached library.
+  # they each dlopen their own copy, so the global safety state isn't shared. since all copies come
+  # from the same object file, libgcov merges every worker's counters into one .gcda on exit
+  libsafety_py._build_libsafety()
+
+  classes = discover_classes(args.pattern)
+  shards = shard_classes(classes, max(args.j, 1))
+  print(f"Running {sum(classes.values())} tests in {len(classes)} classes with {len(shards)} workers", flush=True)
+
+  # output goes to files rather than pipes so a chatty worker can't block on a full pipe
+  procs = []
+  for shard in shards:
+    log = tempfile.TemporaryFile(mode="w+", encoding="utf8")
+    procs.append((subprocess.Popen([sys.executable, "-m", "unittest", *shard], cwd=ROOT, stdout=log, stderr=subprocess.STDOUT), log))
+
+  failed = 0
+  for i, (proc, log) in enumerate(procs):
+    proc.wait()
+    log.seek(0)
+    out = log.read()
+    log.close()
+    if proc.returncode != 0:
+      failed += 1
+      print(f"\n*** worker {i} failed ***\n{out}", flush=True)
+    elif args.verbose:
+      print(f"\n*** worker {i} ***\n{out}", flush=True)
+
+  elapsed = time.perf_counter() - start
+  if failed:
+    print(f"\nFAILED: {failed}/{len(shards)} workers had failures ({elapsed:.1f}s)", flush=True)
+    return 1
+  print(f"\nOK ({elapsed:.1f}s)", flush=True)
+  return 0
+
+
+if __name__ == "__main__":
+  raise SystemExit(main())
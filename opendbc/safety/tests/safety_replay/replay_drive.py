@@ -5,7 +5,7 @@ from tqdm import tqdm
 
 from opendbc.car.carlog import carlog
 from opendbc.safety.tests.libsafety import libsafety_py
-from opendbc.safety.tests.safety_replay.helpers import package_can_msg, init_segment
+from opendbc.safety.tests.safety_replay.helpers import init_segment
 
 
 # replay a drive to check for safety violations
@@ -19,44 +19,61 @@ def replay_drive(msgs, safety_mode, param, alternative_experience):
 
   init_segment(safety, msgs, safety_mode, param)
 
-  rx_tot, rx_invalid, tx_tot, tx_blocked, tx_controls, tx_controls_blocked = 0, 0, 0, 0, 0, 0
-  safety_tick_rx_invalid = False
   blocked_addrs = Counter()
   invalid_addrs = set()
 
   can_msgs = [m for m in msgs if m.which() in ('can', 'sendcan')]
   start_t = can_msgs[0].logMonoTime
   end_t = can_msgs[-1].logMonoTime
-  for msg in tqdm(can_msgs):
-    safety.set_timer((msg.logMonoTime // 1000) % 0xFFFFFFFF)
+
+  # pack the whole route up front so it runs through safety in a few C calls
+  buf = bytearray()
+  frames = []
+  for msg in can_msgs:
+    timestamp = (msg.logMonoTime // 1000) % 0xFFFFFFFF
 
     # skip start and end of route, warm up/down period
+    flags = 0
     if msg.logMonoTime - start_t > 1e9 and end_t - msg.logMonoTime > 1e9:
-      safety.safety_tick_current_safety_config()
-      safety_tick_rx_invalid |= not safety.safety_config_valid() or safety_tick_rx_invalid
+      flags |= libsafety_py.REPLAY_FRAME_TICK
 
     if msg.which() == 'sendcan':
-      for canmsg in msg.sendcan:
-        _msg = package_can_msg(canmsg)
-        sent = safety.safety_tx_hook(_msg)
-        if not sent:
-          tx_blocked += 1
-          tx_controls_blocked += safety.get_controls_allowed()
-          blocked_addrs[canmsg.address] += 1
-
-          carlog.debug("blocked bus %d msg %d at %f" % (canmsg.src, canmsg.address, (msg.logMonoTime - start_t) / 1e9))
-        tx_controls += safety.get_controls_allowed()
-        tx_tot += 1
-    elif msg.which() == 'can':
+      flags |= libsafety_py.REPLAY_FRAME_TX
+      canmsgs = msg.sendcan
+    else:
       # ignore msgs we sent
-      for canmsg in filter(lambda m: m.src < 128, msg.can):
-        safety.safety_fwd_hook(canmsg.src, canmsg.address)
-        _msg = package_can_msg(canmsg)
-        recv = safety.safety_rx_hook(_msg)
-        if not recv:
-          rx_invalid += 1
-          invalid_addrs.add(canmsg.address)
-        rx_tot += 1
+      canmsgs = [m for m in msg.can if m.src < 128]
+
+    for canmsg in canmsgs:
+      libsafety_py.pack_replay_frame(buf, timestamp, canmsg.address, canmsg.src % 4, canmsg.dat, flags)
+      frames.append((msg.logMonoTime, canmsg.address, canmsg.src, bool(flags & libsafety_py.REPLAY_FRAME_TX)))
+      flags &= ~libsafety_py.REPLAY_FRAME_TICK
+
+    # every event ticks, even if all of its messages were filtered out
+    if flags & libsafety_py.REPLAY_FRAME_TICK:
+      libsafety_py.pack_replay_frame(buf, timestamp, 0, 0, b'', flags | libsafety_py.REPLAY_FRAME_NO_MSG)
+      frames.append((msg.logMonoTime, 0, 0, False))
+
+  verdicts = bytearray()
+  stats = libsafety_py.ffi.new('ReplayStats *')
+  chunk = 10000 * libsafety_py.REPLAY_FRAME.size
+  for i in tqdm(range(0, len(buf), chunk)):
+    chunk_verdicts, stats = libsafety_py.replay_frames(safety, memoryview(buf)[i:i + chunk], stats)
+    verdicts += chunk_verdicts
+
+  for (log_mono_time, address, src, tx), ok in zip(frames, verdicts, strict=True):
+    if ok:
+      continue
+    if tx:
+      blocked_addrs[address] += 1
+      carlog.debug("blocked bus %d msg %d at %f" % (src, address, (log_mono_time - start_t) / 1e9))
+    else:
+      invalid_addrs.add(address)
+
+  rx_tot, rx_invalid = stats.rx_total, stats.rx_invalid
+  tx_tot, tx_blocked = stats.tx_total, stats.tx_blocked
+  tx_controls, tx_controls_blocked = stats.tx_controls, stats.tx_controls_blocked
+  safety_tick_rx_invalid = stats.safety_tick_rx_invalid
 
   print("\nRX")
   print("total rx msgs:", rx_tot)
@@ -82,8 +99,10 @@ if __name__ == "__main__":
   parser.add_argument("--mode", type=int, help="Override the safety mode from the log")
   parser.add_argument("--param", type=int, help="Override the safety param from the log")
   parser.add_argument("--alternative-experience", type=int, help="Override the alternative experience from the log")
+  parser.add_argument("--profile", default="perf", choices=libsafety_py.BUILD_PROFILES, help="libsafety build profile")
   args = parser.parse_args()
 
+  libsafety_py.load(libsafety_py._build_libsafety(profile=args.profile))
   lr = LogReader(args.route_or_segment_name[0])
 
   if None in (args.mode, args.param, args.alternative_experience):
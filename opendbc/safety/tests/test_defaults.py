@@ -70,5 +70,25 @@ class TestAllOutputPassthrough(TestAllOutput):
     self.safety.init_tests()
 
 
+class TestAddrLookupOverflow(unittest.TestCase):
+  def setUp(self):
+    self.safety = libsafety_py.libsafety
+    self.safety.set_safety_hooks(CarParams.SafetyModel.allOutput, 0)
+    self.safety.init_tests()
+
+  def test_fails_closed(self):
+    # a config that doesn't fit the lookup tables falls back to no output instead of dropping entries
+    for rx in (True, False):
+      with self.subTest(rx=rx):
+        self.safety.set_safety_hooks(CarParams.SafetyModel.allOutput, 0)
+        self.assertEqual(self.safety.set_oversized_safety_config(rx), -1)
+        self.assertEqual(self.safety.get_current_safety_mode(), CarParams.SafetyModel.noOutput)
+        self.assertEqual(self.safety.get_current_safety_param(), 0)
+        self.assertTrue(self.safety.safety_addr_lookups_valid())
+        for bus in range(3):
+          self.assertFalse(self.safety.safety_tx_hook(common.make_msg(bus, 0x100, 8)))
+          self.assertEqual(self.safety.safety_fwd_hook(bus, 0x100), -1)
+
+
 if __name__ == "__main__":
   unittest.main()
@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
+import fcntl
+import os
+import tempfile
 import unittest
+from unittest import mock
 
-from opendbc.safety.tests.libsafety.libsafety_py import _build_libsafety
+from opendbc.safety.tests.libsafety import libsafety_py
+from opendbc.safety.tests.libsafety.libsafety_py import BUILD_PROFILES, _build_libsafety
 
 
 class TestBuild(unittest.TestCase):
@@ -11,6 +16,33 @@ class TestBuild(unittest.TestCase):
   def test_release_build(self):
     _build_libsafety(release=True)
 
+  def test_profiles(self):
+    paths = {profile: _build_libsafety(profile=profile) for profile in BUILD_PROFILES}
+    self.assertEqual(len(set(paths.values())), len(BUILD_PROFILES))
+
+  def test_build_cache(self):
+    path = _build_libsafety(profile="perf")
+    mtime = os.stat(path).st_mtime_ns
+    self.assertEqual(path, _build_libsafety(profile="perf"))
+    self.assertEqual(mtime, os.stat(path).st_mtime_ns)
+
+  def test_prune_stale_builds(self):
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.object(libsafety_py, "BUILD_DIR", tmp):
+      current, in_use, stale = ("libsafety-perf-" + c * 16 for c in "abc")
+      other = "libsafety-debug-" + "d" * 16
+      for stem in (current, in_use, stale, other):
+        for ext in (".so", ".os", ".lock"):
+          open(os.path.join(tmp, stem + ext), "w").close()
+
+      with open(os.path.join(tmp, in_use + ".lock")) as lock:
+        fcntl.flock(lock, fcntl.LOCK_SH)
+        libsafety_py._prune_stale_builds(current)
+
+      # the stale build goes with its lock file, one another process holds and other profiles stay
+      remaining = {os.path.splitext(fn)[0] for fn in os.listdir(tmp)}
+      self.assertEqual(remaining, {current, in_use, other})
+      self.assertEqual(len(os.listdir(tmp)), 9)
+
 
 if __name__ == "__main__":
   unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+import random
+import unittest
+
+from opendbc.can import CANPacker
+from opendbc.car.structs import CarParams
+from opendbc.safety.tests.libsafety import libsafety_py
+
+
+class TestBatchedReplay(unittest.TestCase):
+  """The batched replay entrypoint must match calling the hooks one frame at a time"""
+
+  def setUp(self):
+    self.safety = libsafety_py.libsafety
+    self.packer = CANPacker("toyota_nodsu_pt_generated")
+
+  def _reset(self):
+    self.safety.set_safety_hooks(CarParams.SafetyModel.toyota, 73)
+    self.safety.init_tests()
+
+  def _make_frames(self):
+    rng = random.Random(0)
+    frames = []
+    t = 0
+    for i in range(2000):
+      t += rng.randint(0, 20000)
+      tx = rng.random() < 0.3
+      if rng.random() < 0.5:
+        addr, dat, bus = self.packer.make_can_msg(rng.choice(["PCM_CRUISE", "STEER_TORQUE_SENSOR", "WHEEL_SPEEDS", "STEERING_LKA", "ACC_CONTROL"]),
+                                                  0, {"CRUISE_ACTIVE": rng.randint(0, 1), "STEER_TORQUE_CMD": rng.randint(-1500, 1500),
+                                                      "STEER_REQUEST": 1, "ACCEL_CMD": rng.uniform(-3.5, 2.0)})
+      else:
+        addr, bus = rng.choice([0x2E4, 0x343, 0x260, 0x1D2, 0xAA, 0x224, 0x750, 0x18DAB0F1]), rng.randint(0, 2)
+        dat = bytes(rng.getrandbits(8) for _ in range(rng.choice([1, 8, 12, 64])))
+      # events whose messages were all filtered out still tick
+      if i % 100 == 50:
+        addr, bus, dat, tx = 0, 0, None, False
+      frames.append((t, addr, bus, dat, tx, i % 50 == 0))
+    return frames
+
+  def test_matches_per_frame_hooks(self):
+    frames = self._make_frames()
+
+    self._reset()
+    expected = []
+    for t, addr, bus, dat, tx, tick in frames:
+      self.safety.set_timer(t)
+      if tick:
+        self.safety.safety_tick_current_safety_config()
+      if dat is None:
+        expected.append((True, None))
+        continue
+      msg = libsafety_py.make_CANPacket(addr, bus, dat)
+      if tx:
+        expected.append((self.safety.safety_tx_hook(msg), self.safety.get_controls_allowed()))
+      else:
+        self.safety.safety_fwd_hook(bus, addr)
+        expected.append((self.safety.safety_rx_hook(msg), None))
+    expected_controls_allowed = self.safety.get_controls_allowed()
+
+    self._reset()
+    buf = bytearray()
+    for t, addr, bus, dat, tx, tick in frames:
+      flags = (libsafety_py.REPLAY_FRAME_TX if tx else 0) | (libsafety_py.REPLAY_FRAME_TICK if tick else 0)
+      if dat is None:
+        flags |= libsafety_py.REPLAY_FRAME_NO_MSG
+      libsafety_py.pack_replay_frame(buf, t, addr, bus, dat or b'', flags)
+
+    # replay in two chunks to check stats accumulate across calls
+    split = len(frames) // 3 * libsafety_py.REPLAY_FRAME.size
+    verdicts, stats = libsafety_py.replay_frames(self.safety, buf[:split])
+    verdicts_2, stats = libsafety_py.replay_frames(self.safety, buf[split:], stats)
+    verdicts += verdicts_2
+
+    self.assertEqual([ok for ok, _ in expected], [bool(v) for v in verdicts])
+    self.assertEqual(expected_controls_allowed, self.safety.get_controls_allowed())
+
+    tx_results = [(ok, controls) for (ok, controls), f in zip(expected, frames, strict=True) if f[4]]
+    rx_results = [ok for (ok, _), f in zip(expected, frames, strict=True) if not f[4] and f[3] is not None]
+    self.assertEqual(stats.tx_total, len(tx_results))
+    self.assertEqual(stats.tx_blocked, sum(not ok for ok, _ in tx_results))
+    self.assertEqual(stats.tx_controls, sum(int(controls) for _, controls in tx_results))
+    self.assertEqual(stats.tx_controls_blocked, sum(int(controls) for ok, controls in tx_results if not ok))
+    self.assertEqual(stats.rx_total, len(rx_results))
+    self.assertEqual(stats.rx_invalid, sum(not ok for ok in rx_results))
+    self.assertGreater(stats.rx_invalid, 0)
+    self.assertGreater(stats.rx_total - stats.rx_invalid, 0)
+
+  def test_tick_only_frame(self):
+    # a frame-less tick still runs safety_tick at its timestamp, so rx checks time out without any messages
+    self._reset()
+    buf = bytearray()
+    libsafety_py.pack_replay_frame(buf, 0, 0, 0, b'', libsafety_py.REPLAY_FRAME_TICK | libsafety_py.REPLAY_FRAME_NO_MSG)
+    libsafety_py.pack_replay_frame(buf, 5_000_000, 0, 0, b'', libsafety_py.REPLAY_FRAME_TICK | libsafety_py.REPLAY_FRAME_NO_MSG)
+    verdicts, stats = libsafety_py.replay_frames(self.safety, buf)
+    self.assertEqual(verdicts, b'\x01\x01')
+    self.assertEqual((stats.rx_total, stats.tx_total), (0, 0))
+    self.assertTrue(stats.safety_tick_rx_invalid)
+
+  def test_invalid_length(self):
+    with self.assertRaises(KeyError):
+      libsafety_py.pack_replay_frame(bytearray(), 0, 0x2E4, 0, b'\x00' * 9)
+
+    # a valid DLC with the wrong length for the address is blocked on the C side, like the per-frame hook
+    self._reset()
+    self.safety.set_controls_allowed(True)
+    buf = bytearray()
+    for dat in (b'\x00' * 5, b'\x00' * 8):
+      libsafety_py.pack_replay_frame(buf, 0, 0x2E4, 0, dat, libsafety_py.REPLAY_FRAME_TX)
+      self.assertEqual(self.safety.safety_tx_hook(libsafety_py.make_CANPacket(0x2E4, 0, dat)), len(dat) == 5)
+    verdicts, stats = libsafety_py.replay_frames(self.safety, buf)
+    self.assertEqual(verdicts, b'\x01\x00')
+    self.assertEqual((stats.tx_total, stats.tx_blocked, stats.tx_controls_blocked), (2, 1, 1))
+
+
+if __name__ == "__main__":
+  unittest.main()
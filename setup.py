@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+from setuptools import setup
+from setuptools.command.build_py import build_py
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# databases generated from the package sources at build time, {generator module: path in the package}
+GENERATED = {
+  "opendbc.car.fingerprint_db": "opendbc/car/fingerprints.db",
+  "opendbc.car.torque_db": "opendbc/car/torque_data/torque.db",
+}
+
+
+class BuildPy(build_py):
+  def run(self):
+    super().run()
+    # editable installs use the source tree, where setup.sh generates them
+    if self.editable_mode:
+      return
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    for module, path in GENERATED.items():
+      subprocess.run([sys.executable, "-m", module, "--out", os.path.join(self.build_lib, path)], cwd=ROOT, env=env, check=True)
+
+  def get_outputs(self, include_bytecode=True):
+    outputs = super().get_outputs(include_bytecode)
+    if not self.editable_mode:
+      outputs += [os.path.join(self.build_lib, path) for path in GENERATED.values()]
+    return outputs
+
+
+setup(cmdclass={"build_py": BuildPy})
@@ -20,3 +20,7 @@ fi
 export UV_PROJECT_ENVIRONMENT="$BASEDIR/.venv"
 uv sync --all-extras --all-groups --inexact
 source "$PYTHONPATH/.venv/bin/activate"
+
+# *** generated databases, see setup.py ***
+python -m opendbc.car.fingerprint_db
+python -m opendbc.car.torque_db